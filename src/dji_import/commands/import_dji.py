@@ -1,62 +1,44 @@
-import shutil
-from datetime import datetime
 from pathlib import Path
+from typing import List, Optional
 import typer
+from dji_import.ingest import ingest_cards
 
 def import_dji_files(
     source_dir: str,
-    target_dir: str
+    target_dir: str,
+    card: List[str] = typer.Option([], "--card", help="Weitere Speicherkarte, die gleichzeitig eingelesen wird (mehrfach angeben)"),
+    previews: bool = typer.Option(True, "--previews/--no-previews", help="Vorschaubilder und Kontaktbogen aus den .LRF-Dateien erstellen"),
+    preview_dir: Optional[str] = typer.Option(None, "--preview-dir", help="Zielverzeichnis der Vorschaubilder. Standard: target_dir/Vorschau"),
+    verify: bool = typer.Option(True, "--verify/--no-verify", help="Kopien vor dem Löschen der Quelle per Prüfsumme verifizieren")
 ):
     """
-    Importiert Medien von einer DJI Action Kamera und organisiert sie in einem strukturierten Verzeichnis.
+    Importiert Medien von einer oder mehreren DJI Action Kameras und organisiert sie in einem strukturierten Verzeichnis.
 
-    - Quelle: Dateien aus `source_dir` werden analysiert.
-    - Ziel: Dateien werden nach ISO-Datum in `target_dir` organisiert.
-    - `.LRF`-Dateien werden nach erfolgreicher Integration gelöscht.
+    - Quelle: Dateien aus `source_dir` und allen mit `--card` angegebenen Speicherkarten werden analysiert.
+      Die Karten werden gleichzeitig gelesen, mit einer Kopier-Spur pro Karte.
+    - Ziel: Dateien werden nach ISO-Datum in `target_dir` organisiert. Das Datum stammt aus dem Dateinamen.
+    - Die `.LRF`-Dateien werden mit dem Video verschoben, daraus entstehen parallel Vorschaubilder und Kontaktbogen, danach werden sie gelöscht.
+      Andere Begleitdateien (z.B. `.SRT`) werden mit dem Video verschoben.
 
     :param source_dir: Quellverzeichnis mit den DJI-Dateien.
     :param target_dir: Zielverzeichnis für organisierte Dateien.
     """
-    source_path = Path(source_dir)
-    target_path = Path(target_dir)
-
-    if not source_path.exists():
-        typer.echo(f"Quellverzeichnis {source_path} existiert nicht.")
-        raise typer.Exit(1)
-
-    # Erstelle Zielverzeichnis falls es nicht existiert
-    target_path.mkdir(parents=True, exist_ok=True)
-
-    # Verarbeite alle MP4-Dateien
-    for mp4_file in source_path.glob("*.MP4"):
-        # Extrahiere Datum/Zeit aus dem Dateinamen
-        filename_parts = mp4_file.stem.split("_")
-        if len(filename_parts) < 3:
-            typer.echo(f"Ungültiges Dateiformat: {mp4_file.name}")
-            continue
-
-        # Datum/Zeit in ISO-Format umwandeln
-        try:
-            timestamp = datetime.strptime(filename_parts[1], "%Y%m%d%H%M%S")
-            iso_date = timestamp.strftime("%Y-%m-%d")
-            new_filename = timestamp.strftime("%Y-%m-%d_%H-%M-%S.mov")
-        except ValueError:
-            typer.echo(f"Konnte Datum/Zeit aus {mp4_file.name} nicht extrahieren.")
-            continue
-
-        # Zielverzeichnis erstellen
-        daily_target_path = target_path / iso_date
-        daily_target_path.mkdir(parents=True, exist_ok=True)
-
-        # Datei verschieben
-        new_file_path = daily_target_path / new_filename
-        typer.echo(f"Verschiebe {mp4_file} nach {new_file_path}")
-        shutil.move(str(mp4_file), new_file_path)
-
-        # Lösche zugehörige .LRF-Datei, falls vorhanden
-        lrf_file = mp4_file.with_suffix(".LRF")
-        if lrf_file.exists():
-            typer.echo(f"Lösche zugehörige .LRF-Datei: {lrf_file}")
-            lrf_file.unlink()
+    card_dirs = [Path(source_dir)] + [Path(path) for path in card]
+    for card_dir in card_dirs:
+        if not card_dir.exists():
+            typer.echo(f"Quellverzeichnis {card_dir} existiert nicht.")
+            raise typer.Exit(1)
+
+    results, created = ingest_cards(
+        [str(card_dir) for card_dir in card_dirs], target_dir,
+        preview_dir=preview_dir, previews=previews, verify=verify
+    )
+    for result in results:
+        if result.ok:
+            typer.echo(f"Verschiebe {result.source} nach {result.destination}")
+        else:
+            typer.secho(f"Fehler beim Verschieben von {result.source}: {result.error}", fg=typer.colors.RED)
+    if previews:
+        typer.echo(f"{created} Vorschaubild(er) erstellt.")
 
     typer.echo("Import abgeschlossen.")
@@ -0,0 +1,201 @@
+# src/dji_import/ingest.py
+
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import zip_longest
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+from original_media_integrator.media_groups import MediaGroup, companion_destination, group_media_files
+from original_media_integrator.media_manager import scan_source_tree
+from original_media_integrator.move_pipeline import MoveResult, device_of, move_files
+from video_compressor.probe import probe_video
+
+logger = logging.getLogger(__name__)
+
+# Eine Kopier-Spur pro Speicherkarte; mehr parallele Zugriffe machen SD-Karten nur langsamer
+CARD_LANES = 1
+DEFAULT_PREVIEW_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+PREVIEW_DIR_NAME = "Vorschau"
+
+THUMBNAIL_WIDTH = 480
+CONTACT_SHEET_COLUMNS = 4
+CONTACT_SHEET_ROWS = 4
+CONTACT_SHEET_TILE_WIDTH = 320
+
+@dataclass
+class PlannedClip:
+    """Ein Video einer Speicherkarte mit seinen Begleitdateien und dem geplanten Ziel."""
+    group: MediaGroup
+    timestamp: datetime
+    destination: str
+
+    @property
+    def proxy(self) -> Optional[str]:
+        """Die .LRF-Datei (niedrig aufgelöste Kopie des Videos), falls vorhanden."""
+        return next((companion for companion in self.group.companions if companion.upper().endswith(".LRF")), None)
+
+def timestamp_from_filename(file_name: str) -> Optional[datetime]:
+    """Liest die Aufnahmezeit aus einem DJI-Dateinamen wie DJI_20240501143000_0001_D.MP4, ohne die Datei zu öffnen."""
+    parts = Path(file_name).stem.split("_")
+    if len(parts) < 3:
+        return None
+    try:
+        return datetime.strptime(parts[1], "%Y%m%d%H%M%S")
+    except ValueError:
+        return None
+
+def plan_card(card_dir: str, target_dir: str, reserved: Dict[str, int]) -> List[PlannedClip]:
+    """
+    Liest eine Speicherkarte mit einem einzigen Durchlauf ein und plant das Ziel jedes Videos:
+    `target_dir/JJJJ-MM-TT/JJJJ-MM-TT_hh-mm-ss.mov`. Gleichzeitige Aufnahmen mehrerer Kameras erhalten
+    einen Zähler statt sich gegenseitig zu überschreiben.
+    """
+    groups = [group for group in group_media_files(scan_source_tree(card_dir).files) if group.primary.upper().endswith(".MP4")]
+    clips = []
+    for group in sorted(groups, key=lambda group: os.path.basename(group.primary)):
+        timestamp = timestamp_from_filename(os.path.basename(group.primary))
+        if timestamp is None:
+            logger.warning(f"Konnte Datum/Zeit aus {group.primary} nicht extrahieren.")
+            continue
+        base = os.path.join(target_dir, timestamp.strftime("%Y-%m-%d"), timestamp.strftime("%Y-%m-%d_%H-%M-%S"))
+        reserved[base] = reserved.get(base, 0) + 1
+        suffix = f"-{reserved[base]}" if reserved[base] > 1 else ""
+        clips.append(PlannedClip(group, timestamp, f"{base}{suffix}.mov"))
+    return clips
+
+def interleave(cards: List[List[PlannedClip]]) -> List[PlannedClip]:
+    """Abwechselnd je ein Video pro Karte, damit alle Karten gleichzeitig gelesen werden."""
+    return [clip for batch in zip_longest(*cards) for clip in batch if clip is not None]
+
+def render_previews(proxy: str, preview_base: str) -> List[str]:
+    """
+    Erstellt aus der .LRF-Datei ein Vorschaubild und einen Kontaktbogen. Die Proxy-Datei ist nur wenige
+    hundert Pixel gross und lässt sich um ein Vielfaches schneller dekodieren als das 4K-Original.
+
+    Returns:
+        List[str]: Die erstellten Bilder.
+    """
+    info = probe_video(proxy)
+    duration = (info or {}).get('duration') or 0.0
+    tiles = CONTACT_SHEET_COLUMNS * CONTACT_SHEET_ROWS
+    thumbnail = f"{preview_base}.jpg"
+    contact_sheet = f"{preview_base}-Kontaktbogen.jpg"
+    commands = [
+        (thumbnail, [
+            'ffmpeg', '-v', 'error', '-y', '-ss', f"{min(duration * 0.1, 3.0):.2f}", '-i', proxy,
+            '-frames:v', '1', '-vf', f"scale={THUMBNAIL_WIDTH}:-2", '-q:v', '3', thumbnail
+        ]),
+    ]
+    if duration > 0:
+        # Nur Schlüsselbilder dekodieren und gleichmässig über die Dauer verteilt in ein Raster setzen
+        commands.append((contact_sheet, [
+            'ffmpeg', '-v', 'error', '-y', '-skip_frame', 'nokey', '-i', proxy,
+            '-vf', f"fps={tiles / duration:.6f},scale={CONTACT_SHEET_TILE_WIDTH}:-2,tile={CONTACT_SHEET_COLUMNS}x{CONTACT_SHEET_ROWS}",
+            '-frames:v', '1', '-q:v', '4', contact_sheet
+        ]))
+
+    os.makedirs(os.path.dirname(preview_base), exist_ok=True)
+    created = []
+    for output, cmd in commands:
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if result.returncode != 0:
+            logger.error(f"Vorschau {output} konnte nicht erstellt werden: {result.stderr.strip()}")
+            continue
+        created.append(output)
+    return created
+
+def _render_previews_safe(proxy: str, preview_base: str) -> List[str]:
+    """Wie `render_previews`, ein Fehler (z.B. fehlendes ffmpeg) betrifft aber nur dieses Video."""
+    try:
+        return render_previews(proxy, preview_base)
+    except Exception as e:
+        logger.error(f"Vorschau für {proxy} konnte nicht erstellt werden: {e}")
+        return []
+
+def ingest_cards(
+    card_dirs: List[str],
+    target_dir: str,
+    preview_dir: Optional[str] = None,
+    previews: bool = True,
+    preview_workers: int = DEFAULT_PREVIEW_WORKERS,
+    verify: bool = True
+) -> Tuple[List[MoveResult], int]:
+    """
+    Importiert die Videos mehrerer Speicherkarten gleichzeitig, mit einer Kopier-Spur pro Karte.
+
+    - Die Aufnahmezeit stammt aus dem Dateinamen, es wird keine Datei geöffnet.
+    - Begleitdateien erhalten den neuen Namen des Videos und werden in derselben Spur wie die Videos verschoben,
+      auch die .LRF-Proxies. Jede Karte wird so nur von einem Zugriff gleichzeitig gelesen.
+    - Die Vorschaubilder und Kontaktbogen entstehen parallel aus den bereits verschobenen .LRF-Dateien.
+      Erst danach wird eine .LRF-Datei gelöscht; schlägt die Vorschau fehl, bleibt sie neben dem Video liegen.
+
+    Returns:
+        Tuple[List[MoveResult], int]: Ergebnisse aller Verschiebungen und die Anzahl erstellter Vorschaubilder.
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    preview_dir = preview_dir or os.path.join(target_dir, PREVIEW_DIR_NAME)
+
+    reserved: Dict[str, int] = {}
+    cards = [plan_card(card_dir, target_dir, reserved) for card_dir in card_dirs]
+    for card_dir, clips in zip(card_dirs, cards):
+        logger.info(f"{len(clips)} Video(s) auf {card_dir}.")
+    clips = interleave(cards)
+
+    # Eine Spur pro Karte; das Ziel nimmt alle Karten gleichzeitig auf
+    device_limits = {device_of(target_dir): max(1, len(card_dirs))}
+    results = move_files(
+        [(clip.group.primary, clip.destination) for clip in clips],
+        workers=max(1, len(card_dirs)), per_device=CARD_LANES, verify=verify, device_limits=device_limits
+    )
+
+    companion_moves = []
+    moved_proxies = {}
+    unused_proxies = []
+    for clip, result in zip(clips, results):
+        if not result.ok:
+            continue
+        for companion in clip.group.companions:
+            if companion == clip.proxy and not previews:
+                unused_proxies.append(companion)
+                continue
+            destination = companion_destination(clip.group.primary, clip.destination, companion)
+            companion_moves.append((companion, destination))
+            if companion == clip.proxy:
+                moved_proxies[destination] = clip
+    if companion_moves:
+        results += move_files(companion_moves, workers=max(1, len(card_dirs)), per_device=CARD_LANES, verify=verify, device_limits=device_limits)
+
+    for proxy in unused_proxies:
+        logger.info(f"Lösche zugehörige .LRF-Datei: {proxy}")
+        os.remove(proxy)
+    if not previews:
+        return results, 0
+
+    # Nur Proxies, die jetzt im Ziel liegen; die Karten werden dafür nicht mehr gelesen
+    proxies = [
+        (result.destination, moved_proxies[result.destination])
+        for result in results if result.ok and result.destination in moved_proxies
+    ]
+    with ThreadPoolExecutor(max_workers=max(1, preview_workers), thread_name_prefix="preview") as pool:
+        rendered_previews = pool.map(
+            lambda item: _render_previews_safe(
+                item[0], os.path.join(preview_dir, os.path.splitext(os.path.relpath(item[1].destination, target_dir))[0])
+            ),
+            proxies
+        )
+        created = 0
+        for (proxy, clip), rendered in zip(proxies, rendered_previews):
+            if not rendered:
+                logger.warning(f"Keine Vorschau für {clip.destination} erstellt, behalte {proxy}.")
+                continue
+            created += len(rendered)
+            logger.info(f"Lösche zugehörige .LRF-Datei: {proxy}")
+            try:
+                os.remove(proxy)
+            except OSError as e:
+                logger.error(f"{proxy} konnte nicht gelöscht werden: {e}")
+    return results, created
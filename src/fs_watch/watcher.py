@@ -0,0 +1,214 @@
+# src/fs_watch/watcher.py
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Ereignismasken aus <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+DEFAULT_POLL_INTERVAL = 5.0
+DEFAULT_SETTLE_SECONDS = 30.0
+
+def has_sidecar_files(file_path: str) -> bool:
+    """
+    Prüft, ob zu der Datei .sb-* Dateien existieren, d.h. ob sie noch geschrieben wird
+    (z.B. beim Sichern durch macOS oder beim Synchronisieren durch iCloud).
+    """
+    path = Path(file_path)
+    return any(path.parent.glob(f"{path.name}.sb-*"))
+
+class InotifyWatcher:
+    """
+    Überwacht ein Verzeichnis mit inotify (Linux), angesprochen über ctypes ohne zusätzliche Abhängigkeit.
+    """
+
+    def __init__(self, directory: str, recursive: bool = False):
+        libc_name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 fehlgeschlagen: {os.strerror(errno)}")
+        self._recursive = recursive
+        self._watches: Dict[int, str] = {}
+        self._add_watch(directory)
+        if recursive:
+            for root, dirs, _ in os.walk(directory):
+                dirs[:] = [d for d in dirs if not d.startswith(".")]
+                for d in dirs:
+                    self._add_watch(os.path.join(root, d))
+
+    def _add_watch(self, directory: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            logger.warning(f"Verzeichnis {directory} kann nicht überwacht werden: {os.strerror(errno)}")
+            return
+        self._watches[wd] = directory
+
+    def poll(self, timeout: float) -> Set[str]:
+        """
+        Wartet höchstens `timeout` Sekunden auf Ereignisse.
+
+        Returns:
+            Set[str]: Pfade der Dateien, die erstellt, geändert oder verschoben wurden.
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed: Set[str] = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + name_length].rstrip(b"\0")
+            offset += name_length
+
+            if mask & IN_Q_OVERFLOW:
+                logger.warning("inotify-Warteschlange übergelaufen, Ereignisse gingen verloren.")
+                continue
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & IN_ISDIR:
+                if self._recursive and mask & (IN_CREATE | IN_MOVED_TO) and not os.path.basename(path).startswith("."):
+                    self._add_watch(path)
+                continue
+            changed.add(path)
+        return changed
+
+    def close(self):
+        """Gibt den inotify-Deskriptor frei."""
+        os.close(self._fd)
+
+class PollingWatcher:
+    """
+    Überwacht ein Verzeichnis durch regelmässiges Einlesen (Fallback, wenn inotify nicht verfügbar ist, z.B. auf macOS).
+    """
+
+    def __init__(self, directory: str, recursive: bool = False, interval: float = DEFAULT_POLL_INTERVAL):
+        self._directory = directory
+        self._recursive = recursive
+        self._interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot: Dict[str, Tuple[int, int]] = {}
+        pending = [self._directory]
+        while pending:
+            current = pending.pop()
+            try:
+                entries = list(os.scandir(current))
+            except OSError as e:
+                logger.warning(f"Verzeichnis {current} kann nicht gelesen werden: {e}")
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if self._recursive and not entry.name.startswith("."):
+                            pending.append(entry.path)
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                except OSError:
+                    continue
+        return snapshot
+
+    def poll(self, timeout: float) -> Set[str]:
+        """
+        Wartet höchstens `timeout` Sekunden (bzw. das Abfrageintervall) und vergleicht dann mit dem letzten Stand.
+
+        Returns:
+            Set[str]: Pfade der Dateien, die neu sind oder sich geändert haben.
+        """
+        time.sleep(min(timeout, self._interval))
+        snapshot = self._scan()
+        changed = {path for path, identity in snapshot.items() if self._snapshot.get(path) != identity}
+        self._snapshot = snapshot
+        return changed
+
+    def close(self):
+        """Nichts freizugeben; vorhanden für eine einheitliche Schnittstelle."""
+
+def create_watcher(directory: str, recursive: bool = False, poll_interval: float = DEFAULT_POLL_INTERVAL):
+    """
+    Erstellt einen inotify-Watcher unter Linux und fällt sonst oder bei Fehlern auf Polling zurück.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            watcher = InotifyWatcher(directory, recursive)
+            logger.info(f"Überwache {directory} mit inotify.")
+            return watcher
+        except (OSError, AttributeError) as e:
+            logger.warning(f"inotify nicht verfügbar ({e}), verwende Polling.")
+    logger.info(f"Überwache {directory} durch Polling alle {poll_interval:.0f} Sekunden.")
+    return PollingWatcher(directory, recursive, poll_interval)
+
+class StabilityTracker:
+    """
+    Entprellt Dateiereignisse: Eine Datei gilt erst als fertig, wenn sich Grösse und Änderungszeit
+    während `settle_seconds` nicht verändert haben und keine .sb-* Dateien mehr existieren.
+    """
+
+    def __init__(self, settle_seconds: float = DEFAULT_SETTLE_SECONDS):
+        self.settle_seconds = settle_seconds
+        self._candidates: Dict[str, Tuple[Optional[Tuple[int, int]], float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._candidates)
+
+    def track(self, file_path: str):
+        """Merkt eine Datei vor oder setzt ihre Wartezeit nach einer Änderung zurück."""
+        self._candidates[file_path] = (None, time.monotonic())
+
+    def pop_stable(self) -> List[str]:
+        """
+        Gibt die Dateien zurück, die inzwischen stabil sind, und entfernt sie aus der Beobachtung.
+        Gelöschte Dateien werden stillschweigend verworfen.
+        """
+        now = time.monotonic()
+        stable = []
+        for file_path, (last_identity, last_change) in list(self._candidates.items()):
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                del self._candidates[file_path]
+                continue
+            identity = (stat.st_size, stat.st_mtime_ns)
+            if identity != last_identity:
+                self._candidates[file_path] = (identity, last_change if last_identity is None else now)
+                continue
+            if now - last_change < self.settle_seconds or stat.st_size == 0 or has_sidecar_files(file_path):
+                continue
+            del self._candidates[file_path]
+            stable.append(file_path)
+        return stable
@@ -6,10 +6,11 @@ import unicodedata
 import typer
 from pathlib import Path
 from typing import List, Optional
-import shutil
 from datetime import datetime
 import json
 import logging
+from iclouddrive_integrator.delta_sync import DEFAULT_MANIFEST_PATH, REASON_CONFLICT, SyncManifest, copy_atomic, decide
+from iclouddrive_integrator.icloud_scan import DEFAULT_DOWNLOAD_WORKERS, download_files, scan_directories
 
 app = typer.Typer()
 
@@ -136,28 +137,28 @@ def delete_source_files_after_integration(video_file: Path, sanitized_title: str
     """
     delete_associated_audio_files(video_file, sanitized_title)
 
-def integrate_homemovie_to_icloud(
+def sync_homemovie(
     video_file: Path,
     icloud_dir: Path,
     overwrite_existing: bool,
-    delete_source: bool
-) -> None:
+    manifest: SyncManifest,
+    bandwidth_limit: float = 0.0
+) -> str:
     """
-    Integrates a single homemovie into iCloud Drive.
+    Kopiert ein Video nach iCloud Drive, sofern es dort fehlt oder sich verändert hat.
 
-    :param video_file: Path to the video file.
-    :param icloud_dir: Path to the iCloud directory.
-    :param overwrite_existing: Whether to overwrite existing files.
-    :param delete_source: Whether to delete the source file after integration.
-    """
-    typer.secho(f"Integriere Video '{video_file}' in iCloud...", fg=typer.colors.BLUE)
-    logger.info(f"Beginne Integration von: {video_file}")
+    Unveränderte Videos werden anhand des Manifests erkannt, ohne ihre Metadaten zu lesen. Weicht ein
+    bestehendes Ziel ab, das nicht von uns stammt oder in iCloud verändert wurde, wird ohne
+    `overwrite_existing` nachgefragt.
 
-    # Schritt 1: Überprüfe, ob die Datei gerade verarbeitet wird
-    if is_file_being_processed(video_file):
-        typer.secho(f"Überspringe Datei, die gerade verarbeitet wird: '{video_file}'", fg=typer.colors.YELLOW)
-        logger.info(f"Überspringe Datei, die gerade verarbeitet wird: '{video_file}'")
-        return  # Überspringe die Verarbeitung dieser Datei
+    Returns:
+        str: Der bereinigte Titel des Videos (für das Löschen der zugehörigen Audiodateien).
+    """
+    synced_target = manifest.find_unchanged_target(video_file)
+    if synced_target:
+        typer.secho(f"Video '{video_file}' ist bereits aktuell in '{synced_target}'.", fg=typer.colors.GREEN)
+        logger.info(f"Unverändert, übersprungen: '{video_file}' -> '{synced_target}'.")
+        return re.sub(r" \([^()]*\)$", "", synced_target.stem)
 
     # Schritt 2: Extrahiere Metadaten
     metadata = extract_metadata(video_file)
@@ -165,7 +166,7 @@ def integrate_homemovie_to_icloud(
         typer.secho("Essentielle Metadaten 'Title' oder 'CreationDate' fehlen.", fg=typer.colors.RED)
         logger.error("Essentielle Metadaten 'Title' oder 'CreationDate' fehlen.")
         raise typer.Exit(code=1)
-    
+
     ziel_dir = determine_target_directory(icloud_dir, metadata)
     sanitized_title = sanitize_filename(metadata.get('Title'))
     try:
@@ -177,26 +178,74 @@ def integrate_homemovie_to_icloud(
             jahr = str(creation_date.year)
         except ValueError:
             jahr = 'Unknown'
-    
+
     base_filename = f"{sanitized_title} ({jahr})"
-    
-    existing_files = list(ziel_dir.glob(f"{base_filename}*"))
-    if existing_files and not overwrite_existing:
+    video_target = ziel_dir / f"{base_filename}{video_file.suffix}"
+
+    # Schritt 3: Nur neue oder veränderte Inhalte kopieren
+    decision = decide(manifest, video_file, video_target)
+    if not decision.copy:
+        manifest.record(video_file, video_target, decision.content_hash)
+        typer.secho(f"Video '{video_file}' ist bereits aktuell in '{video_target}'.", fg=typer.colors.GREEN)
+        logger.info(f"Unverändert, übersprungen: '{video_file}' -> '{video_target}'.")
+        return sanitized_title
+
+    if decision.reason == REASON_CONFLICT and not overwrite_existing:
         typer.secho(f"Dateien für '{base_filename}' existieren bereits.", fg=typer.colors.YELLOW)
-        if not typer.confirm(f"Bestehende Dateien überschreiben?"):
+        if not typer.confirm("Bestehende Dateien überschreiben?"):
             logger.info(f"Integration abgebrochen: Bestehende Dateien für '{base_filename}' wurden nicht überschrieben.")
             raise typer.Exit(code=1)
-    
-    video_target = ziel_dir / f"{base_filename}{video_file.suffix}"
+
     try:
-        shutil.copy2(video_file, video_target)
-        logger.info(f"Video '{video_file}' kopiert nach '{video_target}'.")
+        content_hash = copy_atomic(video_file, video_target, bandwidth_limit)
+        manifest.record(video_file, video_target, content_hash)
+        logger.info(f"Video '{video_file}' kopiert nach '{video_target}' ({decision.reason}).")
         typer.secho(f"Video '{video_file}' kopiert nach '{video_target}'.", fg=typer.colors.GREEN)
     except Exception as e:
         logger.error(f"Fehler beim Kopieren der Datei: {e}")
         typer.secho(f"Fehler beim Kopieren der Datei: {e}", fg=typer.colors.RED)
         raise typer.Exit(code=1)
-    
+    return sanitized_title
+
+def integrate_homemovie_to_icloud(
+    video_file: Path,
+    icloud_dir: Path,
+    overwrite_existing: bool,
+    delete_source: bool,
+    manifest: Optional[SyncManifest] = None,
+    bandwidth_limit: float = 0.0
+) -> None:
+    """
+    Integrates a single homemovie into iCloud Drive.
+
+    Only new or changed videos are copied: the manifest remembers source identity, content hash and the
+    written target. Copies are written under a temporary .nosync name and renamed atomically.
+
+    :param video_file: Path to the video file.
+    :param icloud_dir: Path to the iCloud directory.
+    :param overwrite_existing: Whether to overwrite existing files.
+    :param delete_source: Whether to delete the source file after integration.
+    :param manifest: Sync manifest; a temporary default manifest is opened if None.
+    :param bandwidth_limit: Maximum copy rate in MiB/s (0 = unlimited).
+    """
+    typer.secho(f"Integriere Video '{video_file}' in iCloud...", fg=typer.colors.BLUE)
+    logger.info(f"Beginne Integration von: {video_file}")
+
+    # Schritt 1: Überprüfe, ob die Datei gerade verarbeitet wird
+    if is_file_being_processed(video_file):
+        typer.secho(f"Überspringe Datei, die gerade verarbeitet wird: '{video_file}'", fg=typer.colors.YELLOW)
+        logger.info(f"Überspringe Datei, die gerade verarbeitet wird: '{video_file}'")
+        return  # Überspringe die Verarbeitung dieser Datei
+
+    own_manifest = manifest is None
+    if own_manifest:
+        manifest = SyncManifest(DEFAULT_MANIFEST_PATH)
+    try:
+        sanitized_title = sync_homemovie(video_file, icloud_dir, overwrite_existing, manifest, bandwidth_limit)
+    finally:
+        if own_manifest:
+            manifest.close()
+
     if delete_source:
         try:
             video_file.unlink()
@@ -256,17 +305,33 @@ def integrate_homemovie(
         False,
         "--delete-source",
         help="Löscht die Quelldateien nach erfolgreicher Integration ohne Rückfrage."
+    ),
+    bandwidth_limit: float = typer.Option(
+        0.0,
+        "--bandwidth-limit",
+        help="Maximale Kopiergeschwindigkeit in MiB/s, z.B. tagsüber (0 = unbegrenzt)."
+    ),
+    manifest_db: Path = typer.Option(
+        DEFAULT_MANIFEST_PATH,
+        "--manifest-db",
+        help="Pfad zur SQLite-Datenbank mit dem Synchronisierungsmanifest."
     )
 ):
     """
-    Integriert eine einzelne Heimvideo-Datei in iCloud Drive.
+    Integriert eine einzelne Heimvideo-Datei in iCloud Drive. Unveränderte Videos werden nicht erneut kopiert.
     """
-    integrate_homemovie_to_icloud(
-        video_file=video_file,
-        icloud_dir=icloud_dir,
-        overwrite_existing=overwrite_existing,
-        delete_source=delete_source
-    )
+    manifest = SyncManifest(manifest_db)
+    try:
+        integrate_homemovie_to_icloud(
+            video_file=video_file,
+            icloud_dir=icloud_dir,
+            overwrite_existing=overwrite_existing,
+            delete_source=delete_source,
+            manifest=manifest,
+            bandwidth_limit=bandwidth_limit
+        )
+    finally:
+        manifest.close()
 
 @app.command()
 def integrate_homemovies(
@@ -306,10 +371,25 @@ def integrate_homemovies(
         False,
         "--delete-source",
         help="Löscht die Quelldateien nach erfolgreicher Integration ohne Rückfrage."
+    ),
+    bandwidth_limit: float = typer.Option(
+        0.0,
+        "--bandwidth-limit",
+        help="Maximale Kopiergeschwindigkeit in MiB/s, z.B. tagsüber (0 = unbegrenzt)."
+    ),
+    manifest_db: Path = typer.Option(
+        DEFAULT_MANIFEST_PATH,
+        "--manifest-db",
+        help="Pfad zur SQLite-Datenbank mit dem Synchronisierungsmanifest."
+    ),
+    download_workers: int = typer.Option(
+        DEFAULT_DOWNLOAD_WORKERS,
+        "--download-workers",
+        help="Maximale Anzahl gleichzeitiger Downloads ausgelagerter iCloud-Dateien."
     )
 ):
     """
-    Integriert mehrere Heimvideo-Dateien in iCloud Drive.
+    Integriert mehrere Heimvideo-Dateien in iCloud Drive. Nur neue oder veränderte Videos werden kopiert.
     """
     typer.secho(f"Gefundene Mediendateien aus '{search_dir}' und '{additional_dir}' werden integriert...", fg=typer.colors.BLUE)
     
@@ -319,21 +399,37 @@ def integrate_homemovies(
         typer.secho(f"Zusätzliches Verzeichnis hinzugefügt: '{additional_dir}'", fg=typer.colors.BLUE)
         logger.info(f"Zusätzliches Verzeichnis hinzugefügt: {additional_dir}")
     
-    # Schritt 1: Sammeln aller unterstützten Videodateien
-    media_files: List[Path] = []
+    # Schritt 1: Sammeln aller unterstützten Videodateien. Ausgelagerte iCloud-Dateien werden dabei nicht gelesen
     for dir_path in directories:
         typer.secho(f"Durchsuche Verzeichnis: '{dir_path}'", fg=typer.colors.BLUE)
         logger.info(f"Durchsuche Verzeichnis: '{dir_path}'")
-        for file_path in dir_path.rglob('*'):
-            if file_path.is_file() and file_path.suffix.lower() in SUPPORTED_VIDEO_FORMATS:
-                # Überprüfe, ob die Datei gerade verarbeitet wird
-                if is_file_being_processed(file_path):
-                    typer.secho(f"Überspringe Datei, die gerade verarbeitet wird: '{file_path}'", fg=typer.colors.YELLOW)
-                    logger.info(f"Überspringe Datei, die gerade verarbeitet wird: '{file_path}'")
-                    continue  # Fahre mit der nächsten Datei fort
-                
-                media_files.append(file_path)
-                logger.debug(f"Hinzufügen von '{file_path}' zur Liste der Mediendateien.")
+    scanned_files = scan_directories(directories, SUPPORTED_VIDEO_FORMATS)
+
+    manifest = SyncManifest(manifest_db)
+    candidates = []
+    for scanned_file in scanned_files:
+        file_path = scanned_file.path
+        # Überprüfe, ob die Datei gerade verarbeitet wird
+        if is_file_being_processed(file_path):
+            typer.secho(f"Überspringe Datei, die gerade verarbeitet wird: '{file_path}'", fg=typer.colors.YELLOW)
+            logger.info(f"Überspringe Datei, die gerade verarbeitet wird: '{file_path}'")
+            continue  # Fahre mit der nächsten Datei fort
+
+        # Nur in iCloud vorhandene Dateien, die bereits synchronisiert sind, nicht herunterladen
+        if not scanned_file.local:
+            synced_target = manifest.find_unchanged_target(
+                file_path, scanned_file.size if scanned_file.placeholder else None
+            )
+            if synced_target:
+                typer.secho(f"Video '{file_path}' ist bereits aktuell in '{synced_target}' (nur in iCloud).", fg=typer.colors.GREEN)
+                logger.info(f"Ausgelagert und unverändert, übersprungen: '{file_path}' -> '{synced_target}'.")
+                continue
+
+        candidates.append(scanned_file)
+        logger.debug(f"Hinzufügen von '{file_path}' zur Liste der Mediendateien.")
+
+    # Nur die tatsächlich benötigten Dateien herunterladen, mit begrenzter Parallelität
+    media_files: List[Path] = [scanned_file.path for scanned_file in download_files(candidates, workers=download_workers)]
     
     typer.secho(f"Gefundene Mediendateien: {len(media_files)}", fg=typer.colors.BLUE)
     logger.info(f"Gefundene Mediendateien: {len(media_files)}")
@@ -341,6 +437,7 @@ def integrate_homemovies(
     if not media_files:
         typer.secho("Keine unterstützten Mediendateien gefunden.", fg=typer.colors.YELLOW)
         logger.warning("Keine unterstützten Mediendateien gefunden.")
+        manifest.close()
         raise typer.Exit()
     
     # Schritt 2: Integration jeder Mediendatei
@@ -350,7 +447,9 @@ def integrate_homemovies(
                 video_file=video_file,
                 icloud_dir=icloud_dir,
                 overwrite_existing=overwrite_existing,
-                delete_source=delete_source
+                delete_source=delete_source,
+                manifest=manifest,
+                bandwidth_limit=bandwidth_limit
             )
         except typer.Exit:
             typer.secho(f"Integration abgebrochen für '{video_file}'.", fg=typer.colors.RED)
@@ -360,6 +459,7 @@ def integrate_homemovies(
             typer.secho(f"Unbekannter Fehler bei der Integration von '{video_file}': {e}", fg=typer.colors.RED)
             logger.error(f"Unbekannter Fehler bei der Integration von '{video_file}': {e}")
             continue  # Fahre mit der nächsten Datei fort
+    manifest.close()
     
     typer.secho("Integration mehrerer Heimvideo-Dateien abgeschlossen.", fg=typer.colors.GREEN)
     logger.info("Integration mehrerer Heimvideo-Dateien abgeschlossen.")
@@ -0,0 +1,219 @@
+# src/iclouddrive_integrator/delta_sync.py
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+import logging
+from iclouddrive_integrator.icloud_scan import is_dataless
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MANIFEST_PATH = Path.home() / "Library/Application Support/Kurmann/Videoschnitt/iclouddrive_integrator.sqlite"
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# Dateien und Ordner mit der Endung .nosync werden von iCloud Drive nicht hochgeladen
+TEMP_SUFFIX = ".nosync"
+
+# Gründe für eine Synchronisierungsentscheidung
+REASON_NEW = "new"
+REASON_CHANGED = "changed"
+REASON_UNCHANGED = "unchanged"
+REASON_CONFLICT = "conflict"
+
+@dataclass
+class ManifestEntry:
+    """Was zuletzt aus welcher Quelle an ein Ziel geschrieben wurde."""
+    target: str
+    source: str
+    source_size: int
+    source_mtime_ns: int
+    content_hash: str
+    target_size: int
+    target_mtime_ns: int
+
+@dataclass
+class SyncDecision:
+    """Ergebnis des Abgleichs einer Quelle mit ihrem Ziel. `content_hash` ist gesetzt, falls er berechnet wurde."""
+    copy: bool
+    reason: str
+    content_hash: Optional[str] = None
+
+class SyncManifest:
+    """
+    Persistentes Manifest der nach iCloud Drive geschriebenen Dateien, abgelegt in einer SQLite-Datenbank.
+
+    Pro Ziel werden die Identität der Quelle (Pfad, Grösse, Änderungszeit), der Inhalts-Hash und die Identität
+    der geschriebenen Zieldatei gespeichert. Unveränderte Quellen werden so ohne Lesen ihres Inhalts erkannt.
+    """
+
+    def __init__(self, db_path: Path = DEFAULT_MANIFEST_PATH):
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(db_path), check_same_thread=False)
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS synced_files (
+                    target TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    source_size INTEGER NOT NULL,
+                    source_mtime_ns INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    target_size INTEGER NOT NULL,
+                    target_mtime_ns INTEGER NOT NULL,
+                    synced_at TEXT NOT NULL
+                )
+                """
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS synced_files_source ON synced_files (source)")
+
+    def close(self):
+        """Schliesst die Datenbankverbindung."""
+        with self._lock:
+            self._connection.close()
+
+    def _entry(self, column: str, value: str) -> Optional[ManifestEntry]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT target, source, source_size, source_mtime_ns, content_hash, target_size, target_mtime_ns "
+                f"FROM synced_files WHERE {column} = ? ORDER BY synced_at DESC LIMIT 1",
+                (value,)
+            ).fetchone()
+        return ManifestEntry(*row) if row else None
+
+    def get(self, target: Path) -> Optional[ManifestEntry]:
+        """Eintrag zu einer Zieldatei."""
+        return self._entry("target", os.path.abspath(target))
+
+    def find_unchanged_target(self, source: Path, placeholder_size: Optional[int] = None) -> Optional[Path]:
+        """
+        Gibt das Ziel einer Quelle zurück, wenn weder die Quelle noch das Ziel seit der letzten Synchronisierung
+        verändert wurden. So lassen sich unveränderte Dateien überspringen, ohne ihre Metadaten zu lesen.
+        Es werden nur Dateiattribute verglichen, ausgelagerte iCloud-Dateien werden also nicht heruntergeladen.
+
+        Args:
+            source (Path): Die Quelldatei.
+            placeholder_size (int): Grösse laut `.icloud`-Platzhalter, falls die Quelle lokal gar nicht existiert.
+                Dann kann nur die Grösse verglichen werden.
+        """
+        entry = self._entry("source", os.path.abspath(source))
+        if entry is None:
+            return None
+        try:
+            target_stat = os.stat(entry.target)
+            if placeholder_size is not None and not source.exists():
+                source_identity = (placeholder_size, entry.source_mtime_ns)
+            else:
+                source_stat = source.stat()
+                source_identity = (source_stat.st_size, source_stat.st_mtime_ns)
+        except OSError:
+            return None
+        if source_identity != (entry.source_size, entry.source_mtime_ns):
+            return None
+        if (target_stat.st_size, target_stat.st_mtime_ns) != (entry.target_size, entry.target_mtime_ns):
+            return None
+        return Path(entry.target)
+
+    def record(self, source: Path, target: Path, content_hash: str):
+        """Hält fest, dass `target` aktuell den Inhalt von `source` enthält."""
+        source_stat = source.stat()
+        target_stat = target.stat()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO synced_files (target, source, source_size, source_mtime_ns, content_hash, "
+                "target_size, target_mtime_ns, synced_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (os.path.abspath(target), os.path.abspath(source), source_stat.st_size, source_stat.st_mtime_ns, content_hash,
+                 target_stat.st_size, target_stat.st_mtime_ns, datetime.now().astimezone().isoformat())
+            )
+
+def hash_file(file_path: Path) -> str:
+    """SHA-256 über den Inhalt einer Datei."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def decide(manifest: SyncManifest, source: Path, target: Path) -> SyncDecision:
+    """
+    Entscheidet, ob `source` nach `target` kopiert werden muss.
+
+    - Kein Ziel: kopieren.
+    - Ziel seit der letzten Synchronisierung unverändert und Quelle mit gleicher Identität: überspringen.
+    - Quelle verändert (neue Änderungszeit), Inhalt aber gleich: nur das Manifest aktualisieren.
+    - Ziel ohne Manifesteintrag oder in iCloud verändert: gleicher Inhalt wird übernommen, sonst ist es ein
+      Konflikt, über den der Aufrufer entscheidet.
+    """
+    if not target.exists():
+        return SyncDecision(True, REASON_NEW)
+
+    entry = manifest.get(target)
+    source_stat = source.stat()
+    target_stat = target.stat()
+    target_unchanged = entry is not None and (target_stat.st_size, target_stat.st_mtime_ns) == (entry.target_size, entry.target_mtime_ns)
+
+    if target_unchanged and (source_stat.st_size, source_stat.st_mtime_ns) == (entry.source_size, entry.source_mtime_ns):
+        return SyncDecision(False, REASON_UNCHANGED, entry.content_hash)
+
+    content_hash = hash_file(source)
+    if target_unchanged:
+        if content_hash == entry.content_hash:
+            return SyncDecision(False, REASON_UNCHANGED, content_hash)
+        return SyncDecision(True, REASON_CHANGED, content_hash)
+
+    # Unbekanntes oder in iCloud verändertes Ziel: nur bei gleicher Grösse lohnt sich der Vergleich des Inhalts.
+    # Ein ausgelagertes Ziel wird dafür nicht heruntergeladen
+    if target_stat.st_size == source_stat.st_size and not is_dataless(target_stat) and hash_file(target) == content_hash:
+        return SyncDecision(False, REASON_UNCHANGED, content_hash)
+    return SyncDecision(True, REASON_CONFLICT, content_hash)
+
+def copy_atomic(source: Path, target: Path, bandwidth_limit: float = 0.0) -> str:
+    """
+    Kopiert eine Datei unter einem temporären .nosync-Namen und benennt sie erst am Ende atomar um, damit
+    iCloud Drive nie eine halbe Datei hochlädt.
+
+    Args:
+        source (Path): Die Quelldatei.
+        target (Path): Die Zieldatei; eine bestehende Datei wird erst beim Umbenennen ersetzt.
+        bandwidth_limit (float): Höchstens so viele MiB pro Sekunde lesen und schreiben (0 = unbegrenzt).
+
+    Returns:
+        str: SHA-256 des kopierten Inhalts.
+    """
+    temp_path = target.with_name(f".{target.name}{TEMP_SUFFIX}")
+    bytes_per_second = bandwidth_limit * 1024 * 1024
+    digest = hashlib.sha256()
+    copied = 0
+    started = time.monotonic()
+    try:
+        with open(source, "rb") as src, open(temp_path, "wb") as dst:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                dst.write(chunk)
+                copied += len(chunk)
+                if bytes_per_second > 0:
+                    # Vorauseilen verhindern: warten, bis die Kopie wieder im erlaubten Durchsatz liegt
+                    ahead = copied / bytes_per_second - (time.monotonic() - started)
+                    if ahead > 0:
+                        time.sleep(ahead)
+            dst.flush()
+            os.fsync(dst.fileno())
+        shutil.copystat(source, temp_path)
+        os.replace(temp_path, target)
+    except BaseException:
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
+
+    elapsed = max(time.monotonic() - started, 1e-6)
+    logger.info(f"{copied / (1024 * 1024):.1f} MiB nach {target} kopiert ({copied / (1024 * 1024) / elapsed:.1f} MiB/s).")
+    return digest.hexdigest()
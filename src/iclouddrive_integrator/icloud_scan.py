@@ -0,0 +1,154 @@
+# src/iclouddrive_integrator/icloud_scan.py
+
+import os
+import plistlib
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Ältere macOS-Versionen ersetzen ausgelagerte Dateien durch einen Platzhalter `.Name.mov.icloud`
+PLACEHOLDER_SUFFIX = ".icloud"
+# Neuere macOS-Versionen behalten den Namen und markieren die Datei als "dataless" (<sys/stat.h>)
+SF_DATALESS = 0x40000000
+
+DEFAULT_DOWNLOAD_WORKERS = 4
+DEFAULT_DOWNLOAD_TIMEOUT = 1800.0
+DOWNLOAD_POLL_INTERVAL = 2.0
+
+@dataclass
+class ScannedFile:
+    """
+    Eine Datei eines iCloud-Drive-Verzeichnisses. `path` ist immer der eigentliche Dateipfad, auch wenn
+    lokal nur ein Platzhalter liegt.
+    """
+    path: Path
+    size: int
+    placeholder: Optional[Path] = None
+    dataless: bool = False
+
+    @property
+    def local(self) -> bool:
+        """True, wenn der Inhalt lokal vorhanden ist und ohne Download gelesen werden kann."""
+        return self.placeholder is None and not self.dataless
+
+def is_dataless(stat: os.stat_result) -> bool:
+    """Erkennt ausgelagerte Dateien anhand der Dateiflags, ohne ihren Inhalt zu lesen (und damit herunterzuladen)."""
+    return bool(getattr(stat, "st_flags", 0) & SF_DATALESS)
+
+def placeholder_name(name: str) -> Optional[str]:
+    """Der eigentliche Dateiname zu einem Platzhalter `.Name.ext.icloud`, sonst None."""
+    if name.startswith(".") and name.endswith(PLACEHOLDER_SUFFIX) and len(name) > len(PLACEHOLDER_SUFFIX) + 1:
+        return name[1:-len(PLACEHOLDER_SUFFIX)]
+    return None
+
+def _placeholder_size(placeholder: Path) -> int:
+    """Die Grösse der ausgelagerten Datei laut Platzhalter (eine kleine Property List), 0 wenn unbekannt."""
+    try:
+        with open(placeholder, "rb") as f:
+            return int(plistlib.load(f).get("NSURLFileSizeKey", 0))
+    except Exception:
+        return 0
+
+def scan_directories(directories: Iterable[Path], extensions: Iterable[str]) -> List[ScannedFile]:
+    """
+    Durchsucht Verzeichnisse rekursiv mit os.scandir nach Dateien mit den angegebenen Endungen.
+
+    Ausgelagerte Dateien werden über ihre Dateiflags bzw. den Platzhalternamen erkannt und nicht gelesen,
+    damit das Durchsuchen keinen Download auslöst.
+    """
+    extensions = tuple(extension.lower() for extension in extensions)
+    scanned: List[ScannedFile] = []
+    pending = [str(directory) for directory in directories]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                entries = list(entries)
+        except OSError as e:
+            logger.warning(f"Verzeichnis {directory} kann nicht gelesen werden: {e}")
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith("."):
+                        pending.append(entry.path)
+                    continue
+                real_name = placeholder_name(entry.name)
+                if real_name:
+                    if real_name.lower().endswith(extensions):
+                        scanned.append(ScannedFile(
+                            Path(directory) / real_name, _placeholder_size(Path(entry.path)), placeholder=Path(entry.path)
+                        ))
+                    continue
+                if entry.name.startswith(".") or not entry.name.lower().endswith(extensions):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                scanned.append(ScannedFile(Path(entry.path), stat.st_size, dataless=is_dataless(stat)))
+            except OSError as e:
+                logger.warning(f"Datei {entry.path} kann nicht gelesen werden: {e}")
+
+    remote = sum(1 for scanned_file in scanned if not scanned_file.local)
+    logger.info(f"{len(scanned)} Datei(en) gefunden, davon {remote} nur in iCloud.")
+    return scanned
+
+def _wait_until_local(scanned_file: ScannedFile, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if not is_dataless(os.stat(scanned_file.path)) and not (scanned_file.placeholder and scanned_file.placeholder.exists()):
+                return True
+        except FileNotFoundError:
+            pass
+        time.sleep(DOWNLOAD_POLL_INTERVAL)
+    return False
+
+def download_file(scanned_file: ScannedFile, timeout: float = DEFAULT_DOWNLOAD_TIMEOUT) -> bool:
+    """
+    Lädt eine ausgelagerte Datei mit `brctl download` herunter und wartet, bis ihr Inhalt lokal vorliegt.
+
+    Returns:
+        bool: True, wenn die Datei lokal verfügbar ist.
+    """
+    if scanned_file.local:
+        return True
+    try:
+        result = subprocess.run(
+            ['brctl', 'download', str(scanned_file.path)], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        )
+    except FileNotFoundError:
+        logger.error("brctl wurde nicht gefunden, ausgelagerte iCloud-Dateien können nicht geladen werden.")
+        return False
+    if result.returncode != 0:
+        logger.error(f"Download von {scanned_file.path} fehlgeschlagen: {result.stderr.strip()}")
+        return False
+    if not _wait_until_local(scanned_file, timeout):
+        logger.error(f"Download von {scanned_file.path} nicht innerhalb von {timeout:.0f} Sekunden abgeschlossen.")
+        return False
+    scanned_file.placeholder = None
+    scanned_file.dataless = False
+    return True
+
+def download_files(
+    scanned_files: List[ScannedFile],
+    workers: int = DEFAULT_DOWNLOAD_WORKERS,
+    timeout: float = DEFAULT_DOWNLOAD_TIMEOUT
+) -> List[ScannedFile]:
+    """
+    Lädt die benötigten ausgelagerten Dateien mit höchstens `workers` gleichzeitigen Downloads herunter.
+
+    Returns:
+        List[ScannedFile]: Die Dateien, deren Inhalt jetzt lokal vorliegt, in der ursprünglichen Reihenfolge.
+    """
+    remote = [scanned_file for scanned_file in scanned_files if not scanned_file.local]
+    if remote:
+        total = sum(scanned_file.size for scanned_file in remote)
+        logger.info(f"Lade {len(remote)} Datei(en) ({total / (1024 * 1024):.1f} MiB) aus iCloud herunter.")
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="icloud-download") as pool:
+            list(pool.map(lambda scanned_file: download_file(scanned_file, timeout), remote))
+    return [scanned_file for scanned_file in scanned_files if scanned_file.local]
@@ -4,18 +4,80 @@ import subprocess
 import json
 import os
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Any, Dict, Optional
 import logging
 
 # Konfiguriere das Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Von get_creation_datetime und der Stapelverarbeitung (original_media_integrator.date_resolution) gelesene Tags
+CREATION_DATE_TAGS = [
+    '-CreationDate',        # Für Videodateien
+    '-ContentCreateDate',   # Für Videodateien
+    '-DateTimeOriginal',    # Für Bilddateien
+    '-OffsetTimeOriginal',  # Zeitzoneninformation
+]
+VIDEO_EXTENSIONS = ['.mov', '.mp4', '.m4v', '.avi', '.hevc']
+
+def parse_creation_datetime(exif_entry: Dict[str, Any], is_video: bool) -> Optional[datetime]:
+    """
+    Wertet die von exiftool (-json) gelieferten Datums-Tags einer Datei aus.
+
+    Args:
+        exif_entry (dict): Ein Eintrag der exiftool-JSON-Ausgabe.
+        is_video (bool): Ob es sich um eine Videodatei handelt (CreationDate statt DateTimeOriginal).
+
+    Returns:
+        datetime | None: Das Erstellungsdatum, gegebenenfalls mit Zeitzone, oder None.
+    """
+    if is_video:
+        # Für Videodateien: Primär CreationDate verwenden
+        creation_time_str = exif_entry.get("CreationDate") or exif_entry.get("ContentCreateDate")
+    else:
+        # Für Bilddateien: DateTimeOriginal verwenden
+        creation_time_str = exif_entry.get("DateTimeOriginal")
+
+    offset_time_original = exif_entry.get("OffsetTimeOriginal")
+
+    logger.debug(f"Ausgelesenes Datum: {creation_time_str}, OffsetTimeOriginal: {offset_time_original}")
+
+    if not creation_time_str:
+        return None
+
+    # Versuche verschiedene Formate zu parsen
+    datetime_formats = [
+        '%Y:%m:%d %H:%M:%S%z',          # Standardformat mit Zeitzone
+        '%Y:%m:%d %H:%M:%S.%f%z',       # Format mit Millisekunden und Zeitzone
+        '%Y:%m:%d %H:%M:%S',            # Standardformat ohne Zeitzone
+        '%Y:%m:%d %H:%M:%S.%f'          # Format mit Millisekunden ohne Zeitzone
+    ]
+
+    for dt_format in datetime_formats:
+        try:
+            if offset_time_original:
+                # Füge Zeitzoneninformationen hinzu, falls vorhanden
+                creation_time_str_with_offset = str(creation_time_str) + offset_time_original
+                datetime_with_timezone = datetime.strptime(creation_time_str_with_offset, dt_format)
+            else:
+                datetime_with_timezone = datetime.strptime(str(creation_time_str), dt_format)
+
+            logger.debug(f"Geparstes Datum mit Zeitzone: {datetime_with_timezone}")
+            return datetime_with_timezone
+        except ValueError:
+            continue
+
+    logger.error("Fehler beim Parsen des Datums: Kein passendes Format gefunden.")
+    return None
+
 def get_creation_datetime(filepath: str) -> Optional[datetime]:
     """
     Bestimmt das Erstellungsdatum für Videodateien (CreationDate) und Bilddateien (DateTimeOriginal).
     Berücksichtigt Zeitzoneninformationen durch OffsetTimeOriginal.
 
+    Für viele Dateien auf einmal ist `original_media_integrator.date_resolution.resolve_dates` vorzuziehen,
+    das exiftool nur einmal pro Stapel startet.
+
     Args:
         filepath (str): Der Pfad zur Mediendatei.
 
@@ -25,18 +87,10 @@ def get_creation_datetime(filepath: str) -> Optional[datetime]:
     try:
         # Erkennung, ob es sich um eine Videodatei handelt
         file_extension = os.path.splitext(filepath)[1].lower()
-        is_video = file_extension in ['.mov', '.mp4', '.m4v', '.avi', '.hevc']
+        is_video = file_extension in VIDEO_EXTENSIONS
 
         # Verwende exiftool, um relevante Metadaten auszulesen
-        cmd = [
-            'exiftool',
-            '-CreationDate',        # Für Videodateien
-            '-ContentCreateDate',   # Für Videodateien
-            '-DateTimeOriginal',    # Für Bilddateien
-            '-OffsetTimeOriginal',  # Zeitzoneninformation
-            '-json',
-            filepath
-        ]
+        cmd = ['exiftool'] + CREATION_DATE_TAGS + ['-json', filepath]
         result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
 
         # Debug-Ausgabe der rohen exiftool-Daten
@@ -46,42 +100,10 @@ def get_creation_datetime(filepath: str) -> Optional[datetime]:
         exif_json = json.loads(exif_metadata)
 
         if exif_json and len(exif_json) > 0:
-            if is_video:
-                # Für Videodateien: Primär CreationDate verwenden
-                creation_time_str = exif_json[0].get("CreationDate") or exif_json[0].get("ContentCreateDate")
-            else:
-                # Für Bilddateien: DateTimeOriginal verwenden
-                creation_time_str = exif_json[0].get("DateTimeOriginal")
-            
-            offset_time_original = exif_json[0].get("OffsetTimeOriginal")
-
-            logger.debug(f"Ausgelesenes Datum: {creation_time_str}, OffsetTimeOriginal: {offset_time_original}")
-
-            if creation_time_str:
-                # Versuche verschiedene Formate zu parsen
-                datetime_formats = [
-                    '%Y:%m:%d %H:%M:%S%z',          # Standardformat mit Zeitzone
-                    '%Y:%m:%d %H:%M:%S.%f%z',       # Format mit Millisekunden und Zeitzone
-                    '%Y:%m:%d %H:%M:%S',            # Standardformat ohne Zeitzone
-                    '%Y:%m:%d %H:%M:%S.%f'          # Format mit Millisekunden ohne Zeitzone
-                ]
-
-                for dt_format in datetime_formats:
-                    try:
-                        if offset_time_original:
-                            # Füge Zeitzoneninformationen hinzu, falls vorhanden
-                            creation_time_str_with_offset = creation_time_str + offset_time_original
-                            datetime_with_timezone = datetime.strptime(creation_time_str_with_offset, dt_format)
-                        else:
-                            datetime_with_timezone = datetime.strptime(creation_time_str, dt_format)
-
-                        logger.debug(f"Geparstes Datum mit Zeitzone: {datetime_with_timezone}")
-                        return datetime_with_timezone
-                    except ValueError:
-                        continue
-
-                logger.error("Fehler beim Parsen des Datums: Kein passendes Format gefunden. Verwende das Änderungsdatum der Datei.")
-        
+            creation_datetime = parse_creation_datetime(exif_json[0], is_video)
+            if creation_datetime:
+                return creation_datetime
+
     except Exception as e:
         logger.error(f"Fehler bei der EXIF-Analyse mit exiftool: {e}. Verwende das Änderungsdatum der Datei.")
 
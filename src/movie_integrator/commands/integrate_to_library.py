@@ -1,68 +1,62 @@
 import typer
-import os
-import shutil
 from pathlib import Path
-from collections import defaultdict
+from movie_integrator.library_plan import DEFAULT_WORKERS, apply_plan, plan_library
 
 app = typer.Typer()
 
-SUPPORTED_IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png']
-
 def integrate_to_library_command(
     source_directory: Path = typer.Argument(..., help="Pfad zum Quellverzeichnis"),
-    target_directory: Path = typer.Argument(..., help="Pfad zum Zielverzeichnis")
+    target_directory: Path = typer.Argument(..., help="Pfad zum Zielverzeichnis"),
+    workers: int = typer.Option(DEFAULT_WORKERS, "--workers", help="Maximale Anzahl gleichzeitiger Dateioperationen"),
+    skip_conflicts: bool = typer.Option(False, "--skip-conflicts", help="Filme mit Konflikten im Quellverzeichnis belassen und die übrigen integrieren"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Nur den Plan anzeigen, keine Dateien verschieben")
 ):
     """
     Gruppiert Dateien im Quellverzeichnis nach Dateinamen (ohne Erweiterung),
-    erstellt ein Unterverzeichnis mit diesem Namen, erstellt 'poster.jpg' und 'fanart.jpg' 
+    erstellt ein Unterverzeichnis mit diesem Namen, erstellt 'poster.jpg' und 'fanart.jpg'
     aus vorhandenen Bilddateien und verschiebt das Unterverzeichnis in das Ziel.
+
+    Die gesamte Zielstruktur wird zuerst geplant. Konflikte mit bestehenden Dateien werden vor dem ersten
+    Verschieben erkannt; danach werden die Dateien parallel verschoben und 'fanart.jpg' als Hardlink angelegt.
     """
     if not source_directory.is_dir():
         typer.secho(f"Das Quellverzeichnis '{source_directory}' existiert nicht.", fg=typer.colors.RED)
         raise typer.Exit(code=1)
 
-    if not target_directory.exists():
-        target_directory.mkdir(parents=True, exist_ok=True)
-
     typer.secho(f"Integriere von '{source_directory}' nach '{target_directory}'\n", fg=typer.colors.BLUE)
 
-    # Gruppiere Dateien nach Basename (Dateiname ohne Erweiterung)
-    file_groups = defaultdict(list)
-    for file_path in source_directory.rglob('*'):
-        if file_path.is_file() and not file_path.name.startswith('.'):
-            file_groups[file_path.stem].append(file_path)
+    plan = plan_library(source_directory, target_directory, workers=workers)
 
-    if not file_groups:
+    if not plan.groups:
         typer.secho("Keine Dateien zum Integrieren gefunden.", fg=typer.colors.YELLOW)
         raise typer.Exit()
 
-    for base_name, file_list in file_groups.items():
-        relative_path = file_list[0].relative_to(source_directory).parent
-        destination_dir = target_directory / relative_path / base_name
+    conflicts = plan.conflicts
+    for conflict in conflicts:
+        typer.secho(f"Konflikt: {conflict}", fg=typer.colors.RED)
+    if conflicts and not skip_conflicts and not dry_run:
+        typer.secho(f"\n{len(conflicts)} Konflikt(e) gefunden, es wurde nichts verschoben. Mit --skip-conflicts werden die übrigen Filme integriert.", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
 
-        # Erstelle das Verzeichnis für die Gruppierung
-        destination_dir.mkdir(parents=True, exist_ok=True)
+    if dry_run:
+        for group in plan.groups:
+            for source, destination in group.moves:
+                typer.secho(f"{source} → {destination}", fg=typer.colors.CYAN)
+        typer.secho(f"\n{len(plan.groups)} Film(e) geplant, {len(conflicts)} Konflikt(e).", fg=typer.colors.BLUE)
+        return
 
-        for file_path in file_list:
-            # Verschiebe die Dateien ins neue Verzeichnis
-            destination_file = destination_dir / file_path.name
-            shutil.move(str(file_path), str(destination_file))
-            typer.secho(f"Datei verschoben: {destination_file.name}", fg=typer.colors.CYAN)
+    if not target_directory.exists():
+        target_directory.mkdir(parents=True, exist_ok=True)
 
-            # Wenn es sich um eine unterstützte Bilddatei handelt, erstelle poster.jpg und fanart.jpg
-            if file_path.suffix.lower() in SUPPORTED_IMAGE_EXTENSIONS:
-                poster_path = destination_dir / "poster.jpg"
-                fanart_path = destination_dir / "fanart.jpg"
-                
-                if not poster_path.exists():
-                    destination_file.rename(poster_path)
-                    typer.secho(f"Bild umbenannt in 'poster.jpg': {poster_path.name}", fg=typer.colors.GREEN)
-                
-                if not fanart_path.exists():
-                    shutil.copy2(poster_path, fanart_path)
-                    typer.secho(f"Bild dupliziert als 'fanart.jpg': {fanart_path.name}", fg=typer.colors.GREEN)
+    results, fanart_created = apply_plan(plan, workers=workers)
+    for result in results:
+        if result.ok:
+            typer.secho(f"Datei verschoben: {result.destination}", fg=typer.colors.CYAN)
+        else:
+            typer.secho(f"Fehler beim Verschieben von '{result.source}': {result.error}", fg=typer.colors.RED)
+    typer.secho(f"{fanart_created} 'fanart.jpg' angelegt.", fg=typer.colors.GREEN)
 
     typer.secho("\nIntegration abgeschlossen.", fg=typer.colors.GREEN)
 
 if __name__ == "__main__":
-    typer.run(integrate_to_library_command)
\ No newline at end of file
+    typer.run(integrate_to_library_command)
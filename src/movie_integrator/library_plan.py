@@ -0,0 +1,156 @@
+# src/movie_integrator/library_plan.py
+
+import os
+import shutil
+import subprocess
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+import logging
+from original_media_integrator.move_pipeline import MoveResult, move_files
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png']
+POSTER_NAME = "poster.jpg"
+FANART_NAME = "fanart.jpg"
+
+# Auf einem NAS dauert jede Dateioperation einen Netzwerk-Roundtrip; viele davon gleichzeitig verbergen die Latenz
+DEFAULT_WORKERS = 8
+
+@dataclass
+class MovieGroup:
+    """Alle Dateien eines Films (gleicher Dateiname ohne Erweiterung im selben Verzeichnis) und ihre Ziele."""
+    name: str
+    destination_dir: Path
+    moves: List[Tuple[Path, Path]] = field(default_factory=list)
+    poster: Optional[Path] = None
+    conflicts: List[str] = field(default_factory=list)
+
+@dataclass
+class LibraryPlan:
+    """Die vollständige Zielstruktur, berechnet bevor eine Datei angefasst wird."""
+    groups: List[MovieGroup]
+
+    @property
+    def conflicts(self) -> List[str]:
+        return [conflict for group in self.groups for conflict in group.conflicts]
+
+def _list_names(directory: Path) -> Set[str]:
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
+
+def scan_source(source_directory: Path) -> Dict[Tuple[Path, str], List[Path]]:
+    """Gruppiert alle sichtbaren Dateien mit einem einzigen os.scandir-Durchlauf nach Verzeichnis und Dateinamen ohne Erweiterung."""
+    file_groups: Dict[Tuple[Path, str], List[Path]] = defaultdict(list)
+    pending = [source_directory]
+    while pending:
+        directory = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(Path(entry.path))
+                elif entry.is_file(follow_symlinks=False):
+                    file_path = Path(entry.path)
+                    file_groups[(file_path.parent.relative_to(source_directory), file_path.stem)].append(file_path)
+    return file_groups
+
+def plan_library(source_directory: Path, target_directory: Path, workers: int = DEFAULT_WORKERS) -> LibraryPlan:
+    """
+    Plant die Integration: pro Film ein Verzeichnis `target_directory/<relativer Pfad>/<Name>`, das erste Bild wird
+    direkt als 'poster.jpg' abgelegt. Bestehende Zielverzeichnisse werden einmal (parallel) gelesen, statt jede
+    Zieldatei einzeln zu prüfen. Konflikte werden gesammelt, nicht aufgelöst.
+    """
+    file_groups = scan_source(source_directory)
+    destination_dirs = {key: target_directory / key[0] / key[1] for key in file_groups}
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="plan") as pool:
+        existing = dict(zip(destination_dirs.values(), pool.map(_list_names, destination_dirs.values())))
+
+    groups = []
+    for key in sorted(file_groups):
+        destination_dir = destination_dirs[key]
+        group = MovieGroup(key[1], destination_dir)
+        taken = set(existing[destination_dir])
+        poster_planned = POSTER_NAME in taken
+        for file_path in sorted(file_groups[key]):
+            name = file_path.name
+            if file_path.suffix.lower() in SUPPORTED_IMAGE_EXTENSIONS:
+                # Ein bereits vorhandenes Poster dient ebenfalls als Vorlage für 'fanart.jpg'
+                group.poster = group.poster or destination_dir / POSTER_NAME
+                if not poster_planned:
+                    name = POSTER_NAME
+                    poster_planned = True
+            if name in taken:
+                group.conflicts.append(f"'{destination_dir / name}' existiert bereits (Quelle: '{file_path}').")
+                continue
+            taken.add(name)
+            group.moves.append((file_path, destination_dir / name))
+        if group.poster and FANART_NAME in taken:
+            group.poster = None
+        groups.append(group)
+    return LibraryPlan(groups)
+
+def link_or_clone(source: Path, destination: Path) -> str:
+    """
+    Legt `destination` als Hardlink auf `source` an, ohne Daten zu kopieren. Wo das nicht geht (z.B. manche
+    Netzlaufwerke), wird unter macOS ein APFS-Klon (`cp -c`) versucht und erst zuletzt kopiert.
+
+    Returns:
+        str: Die verwendete Methode ("hardlink", "clone" oder "copy").
+    """
+    try:
+        os.link(source, destination)
+        return "hardlink"
+    except OSError as e:
+        logger.debug(f"Hardlink {destination} nicht möglich: {e}")
+    if sys.platform == "darwin":
+        result = subprocess.run(['cp', '-c', str(source), str(destination)], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if result.returncode == 0:
+            return "clone"
+    shutil.copy2(source, destination)
+    return "copy"
+
+def apply_plan(plan: LibraryPlan, workers: int = DEFAULT_WORKERS) -> Tuple[List[MoveResult], int]:
+    """
+    Führt einen Plan aus: erstellt die Zielverzeichnisse, verschiebt alle Dateien in einem Thread-Pool (auf demselben
+    Gerät per Umbenennung) und legt 'fanart.jpg' als Hardlink bzw. Klon des verschobenen Posters an.
+    Gruppen mit Konflikten werden übersprungen.
+
+    Returns:
+        Tuple[List[MoveResult], int]: Ergebnisse aller Verschiebungen und die Anzahl angelegter 'fanart.jpg'.
+    """
+    groups = [group for group in plan.groups if not group.conflicts]
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="mkdir") as pool:
+        list(pool.map(lambda directory: directory.mkdir(parents=True, exist_ok=True), {group.destination_dir for group in groups}))
+
+    moves = [(str(source), str(destination)) for group in groups for source, destination in group.moves]
+    results = move_files(moves, workers=workers)
+    moved = {result.destination for result in results if result.ok}
+
+    # Das Poster muss verschoben worden sein oder schon vorher im Ziel gelegen haben
+    planned = {destination for _, destination in moves}
+    posters = [
+        group.poster for group in groups
+        if group.poster and (str(group.poster) in moved or str(group.poster) not in planned)
+    ]
+
+    def create_fanart(poster: Path) -> bool:
+        try:
+            method = link_or_clone(poster, poster.with_name(FANART_NAME))
+            logger.info(f"'{FANART_NAME}' angelegt ({method}): {poster.parent}")
+            return True
+        except OSError as e:
+            logger.error(f"'{FANART_NAME}' konnte in {poster.parent} nicht angelegt werden: {e}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="fanart") as pool:
+        fanart_created = sum(pool.map(create_fanart, posters))
+    return results, fanart_created
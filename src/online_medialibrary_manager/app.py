@@ -1,11 +1,13 @@
 import typer
-from online_medialibrary_manager.commands import create_html, create_og_image, create_artwork
+from online_medialibrary_manager.commands import create_html, create_og_image, create_artwork, build_site, serve
 
 app = typer.Typer(help="Online Medialibrary Manager für Familienvideos")
 
 app.command("create-html")(create_html.create_html_command)
 app.command("create-og-image")(create_og_image.create_og_image_command)
 app.command("create-artwork")(create_artwork.create_artwork_command)
+app.command("build-site")(build_site.build_site_command)
+app.command("serve")(serve.serve_command)
 
 if __name__ == '__main__':
     app()
\ No newline at end of file
@@ -0,0 +1,194 @@
+# src/online_medialibrary_manager/artwork_derivatives.py
+
+import base64
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+try:
+    from PIL import Image, ImageFilter, ImageOps
+except ImportError:  # Ohne Pillow wird das Titelbild unverändert eingebunden
+    Image = None
+    ImageFilter = None
+    ImageOps = None
+
+logger = logging.getLogger(__name__)
+
+# Breiten der Ableitungen in Pixel; grössere Breiten als das Original werden nicht erzeugt
+DERIVATIVE_WIDTHS = [480, 960, 1920]
+FORMATS = {"webp": {"quality": 80, "method": 6}, "jpeg": {"quality": 82, "optimize": True, "progressive": True}}
+EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+PLACEHOLDER_WIDTH = 16
+
+# Wird erhöht, wenn sich Breiten, Formate oder Qualitätseinstellungen ändern, damit der Cache neu befüllt wird
+DERIVATIVE_VERSION = 1
+DEFAULT_CACHE_DIR = Path.home() / "Library" / "Caches" / "Kurmann" / "Videoschnitt" / "artwork"
+CACHE_INFO_FILE = "info.json"
+
+@dataclass
+class ArtworkSet:
+    """Die Ableitungen eines Titelbilds mit intrinsischer Grösse und eingebettetem Platzhalter."""
+    width: int
+    height: int
+    placeholder: str
+    variants: List[Dict[str, Any]] = field(default_factory=list)
+
+    def srcset(self, image_format: str, prefix: str = "") -> str:
+        """Baut das srcset-Attribut für ein Format, z.B. 'Titelbild-480.webp 480w, ...'."""
+        return ", ".join(
+            f"{prefix}{variant['file']} {variant['width']}w"
+            for variant in self.variants if variant['format'] == image_format
+        )
+
+    def fallback(self, prefix: str = "") -> str:
+        """Die mittlere JPEG-Ableitung als src für Browser ohne srcset-Unterstützung."""
+        jpegs = [variant for variant in self.variants if variant['format'] == "jpeg"]
+        return f"{prefix}{jpegs[len(jpegs) // 2]['file']}"
+
+def is_available() -> bool:
+    """Gibt zurück, ob Pillow für die Ableitungen verfügbar ist."""
+    return Image is not None
+
+def derivative_file_name(stem: str, width: int, image_format: str) -> str:
+    return f"{stem}-{width}.{EXTENSIONS[image_format]}"
+
+def source_key(artwork_image: str) -> str:
+    """Cache-Schlüssel aus dem Inhalt des Titelbilds und der Version der Einstellungen."""
+    digest = hashlib.sha256(f"v{DERIVATIVE_VERSION}:{DERIVATIVE_WIDTHS}".encode("utf-8"))
+    with open(artwork_image, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _encode_derivatives(artwork_image: str, target_dir: str, stem: str) -> ArtworkSet:
+    """Dekodiert das Titelbild einmal und erzeugt alle Breiten in allen Formaten sowie den Platzhalter."""
+    with Image.open(artwork_image) as image:
+        icc_profile = image.info.get("icc_profile")
+        image = ImageOps.exif_transpose(image)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+
+        widths = [width for width in DERIVATIVE_WIDTHS if width < image.width] or [image.width]
+        if image.width < DERIVATIVE_WIDTHS[-1] and image.width not in widths:
+            widths.append(image.width)
+
+        variants = []
+        # Von der grössten zur kleinsten Breite, jeweils aus der vorherigen Stufe skaliert
+        current = image
+        for width in sorted(widths, reverse=True):
+            height = round(image.height * width / image.width)
+            current = current.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+            for image_format, options in FORMATS.items():
+                file_name = derivative_file_name(stem, width, image_format)
+                current.save(os.path.join(target_dir, file_name), image_format.upper(), icc_profile=icc_profile, **options)
+                variants.append({'width': width, 'height': height, 'format': image_format, 'file': file_name})
+
+        placeholder_height = max(1, round(image.height * PLACEHOLDER_WIDTH / image.width))
+        tiny = current.resize((PLACEHOLDER_WIDTH, placeholder_height), Image.BILINEAR).filter(ImageFilter.GaussianBlur(1))
+        buffer = io.BytesIO()
+        tiny.save(buffer, "JPEG", quality=40)
+        placeholder = "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+        variants.sort(key=lambda variant: (variant['format'], variant['width']))
+        largest = variants[-1]
+        return ArtworkSet(width=largest['width'], height=largest['height'], placeholder=placeholder, variants=variants)
+
+def _cached_derivatives(artwork_image: str, cache_dir: Path, stem: str) -> Tuple[Path, ArtworkSet]:
+    """Liefert das Cache-Verzeichnis der Ableitungen und erstellt sie bei Bedarf."""
+    entry_dir = cache_dir / f"{source_key(artwork_image)}-{stem}"
+    info_path = entry_dir / CACHE_INFO_FILE
+    if info_path.is_file():
+        with open(info_path, "r", encoding="utf-8") as f:
+            return entry_dir, ArtworkSet(**json.load(f))
+
+    # In ein temporäres Verzeichnis schreiben und erst vollständig in den Cache verschieben
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix=".tmp-", dir=cache_dir)
+    try:
+        artwork_set = _encode_derivatives(artwork_image, work_dir, stem)
+        with open(os.path.join(work_dir, CACHE_INFO_FILE), "w", encoding="utf-8") as f:
+            json.dump(asdict(artwork_set), f)
+        try:
+            os.rename(work_dir, entry_dir)
+        except OSError:
+            # Ein anderer Prozess hat denselben Eintrag gleichzeitig erstellt
+            shutil.rmtree(work_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+    return entry_dir, artwork_set
+
+def create_artwork_derivatives(
+    artwork_image: str,
+    output_dir: str,
+    stem: str = "Titelbild",
+    cache_dir: Path = DEFAULT_CACHE_DIR
+) -> Optional[ArtworkSet]:
+    """
+    Erstellt die Ableitungen eines Titelbilds (WebP und JPEG in mehreren Breiten) in `output_dir`.
+
+    Die Ableitungen werden anhand des Inhalts des Titelbilds zwischengespeichert und bei einem erneuten
+    Aufruf nur noch per Hardlink (bzw. Kopie) in das Ausgabeverzeichnis übernommen.
+
+    Returns:
+        ArtworkSet | None: Die Ableitungen, oder None, wenn Pillow nicht installiert ist.
+    """
+    if not is_available():
+        logger.warning("Pillow ist nicht installiert, das Titelbild wird ohne Ableitungen eingebunden.")
+        return None
+
+    entry_dir, artwork_set = _cached_derivatives(artwork_image, Path(cache_dir), stem)
+    os.makedirs(output_dir, exist_ok=True)
+    for variant in artwork_set.variants:
+        source = entry_dir / variant['file']
+        target = os.path.join(output_dir, variant['file'])
+        if os.path.exists(target):
+            os.remove(target)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+    return artwork_set
+
+def _create_safely(job: Tuple[str, str, str, str]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    artwork_image, output_dir, stem, cache_dir = job
+    try:
+        artwork_set = create_artwork_derivatives(artwork_image, output_dir, stem, Path(cache_dir))
+        return (asdict(artwork_set) if artwork_set else None), None
+    except Exception as e:
+        return None, str(e)
+
+def create_artwork_derivatives_batch(
+    jobs: List[Tuple[str, str]],
+    workers: int = os.cpu_count() or 1,
+    stem: str = "Titelbild",
+    cache_dir: Path = DEFAULT_CACHE_DIR
+) -> Dict[str, Optional[ArtworkSet]]:
+    """
+    Erstellt die Ableitungen mehrerer Titelbilder parallel in einem Prozesspool.
+
+    Args:
+        jobs (List[Tuple[str, str]]): Paare aus Titelbild und Ausgabeverzeichnis.
+
+    Returns:
+        Dict[str, ArtworkSet | None]: Ableitungen pro Ausgabeverzeichnis; None bei einem Fehler.
+    """
+    if not jobs or not is_available():
+        return {output_dir: None for _, output_dir in jobs}
+
+    results: Dict[str, Optional[ArtworkSet]] = {}
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as pool:
+        outcomes = pool.map(_create_safely, [(artwork, output_dir, stem, str(cache_dir)) for artwork, output_dir in jobs])
+        for (artwork_image, output_dir), (artwork_set, error) in zip(jobs, outcomes):
+            if error:
+                logger.error(f"Ableitungen für {artwork_image} konnten nicht erstellt werden: {error}")
+            results[output_dir] = ArtworkSet(**artwork_set) if artwork_set else None
+    return results
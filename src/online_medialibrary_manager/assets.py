@@ -0,0 +1,152 @@
+# src/online_medialibrary_manager/assets.py
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict
+import logging
+
+try:
+    import brotli
+except ImportError:  # Ohne Brotli werden nur .gz-Dateien erzeugt
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+ASSETS_DIR = "assets"
+ASSET_MANIFEST_FILE = "asset-manifest.json"
+HASH_LENGTH = 10
+
+# Textdateien, die zusätzlich vorkomprimiert abgelegt werden
+PRECOMPRESS_EXTENSIONS = {".html", ".css", ".js", ".json", ".m3u8"}
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# Kommentare werden entfernt; Zeichenketten und url(...) bleiben unverändert, da Leerzeichen darin bedeutsam sind
+CSS_LITERALS = re.compile(
+    r"""(/\*.*?\*/)|(url\(\s*(?:"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|[^)]*)\s*\)|"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')""",
+    re.DOTALL | re.IGNORECASE
+)
+
+def minify_css(css: str) -> str:
+    """
+    Entfernt Kommentare und überflüssige Leerzeichen aus CSS. Zeichenketten und url(...) werden nicht verändert.
+    Um ':' wird nur innerhalb von Deklarationsblöcken gekürzt, da ein Leerzeichen davor in Selektoren bedeutsam
+    ist ('a :hover' ist nicht 'a:hover').
+    """
+    literals = []
+
+    def protect(match: re.Match) -> str:
+        if match.group(1):
+            return " "
+        literals.append(match.group(2))
+        return f"\0{len(literals) - 1}\0"
+
+    css = CSS_LITERALS.sub(protect, css)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r"\{[^{}]*\}", lambda block: re.sub(r"\s*:\s*", ":", block.group(0)), css)
+    css = css.replace(";}", "}").strip()
+    return re.sub(r"\0(\d+)\0", lambda match: literals[int(match.group(1))], css)
+
+def minify_js(js: str) -> str:
+    """
+    Entfernt Einrückungen, Leerzeilen und reine Kommentarzeilen aus JavaScript. Zeilenumbrüche bleiben
+    erhalten, damit die automatische Semikolon-Einfügung unverändert greift.
+    """
+    lines = (line.strip() for line in js.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//"))
+
+def fingerprint(name: str, content: str) -> str:
+    """Bildet den Dateinamen mit Inhaltshash, z.B. 'app.css' → 'app.3f2a9c1b0d.css'."""
+    stem, extension = os.path.splitext(name)
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:HASH_LENGTH]
+    return f"{stem}.{digest}{extension}"
+
+def write_assets(output_dir: Path, css: str, js: str) -> Dict[str, str]:
+    """
+    Schreibt CSS und JavaScript minifiziert unter ihrem Inhaltshash nach `output_dir/assets` und legt das
+    Asset-Manifest (logischer Name → Pfad relativ zu `output_dir`) daneben ab.
+
+    Da sich der Name mit dem Inhalt ändert, dürfen die Dateien unbegrenzt zwischengespeichert werden.
+
+    Returns:
+        Dict[str, str]: Das Asset-Manifest.
+    """
+    assets_dir = output_dir / ASSETS_DIR
+    assets_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = {}
+    for name, content in (("app.css", minify_css(css)), ("app.js", minify_js(js))):
+        file_name = fingerprint(name, content)
+        target = assets_dir / file_name
+        if not target.is_file():
+            temp_path = assets_dir / f".{file_name}.tmp"
+            temp_path.write_text(content, encoding="utf-8")
+            os.replace(temp_path, target)
+        manifest[name] = f"{ASSETS_DIR}/{file_name}"
+
+    with open(output_dir / ASSET_MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def relative_assets(manifest: Dict[str, str], relative_path: str) -> Dict[str, str]:
+    """Passt die Pfade des Asset-Manifests für eine Seite im Unterverzeichnis `relative_path` an."""
+    depth = len(Path(relative_path).parts)
+    return {name: "../" * depth + path for name, path in manifest.items()}
+
+def precompress_file(path: Path) -> bool:
+    """
+    Legt neben einer Textdatei eine .gz- und (falls Brotli installiert ist) eine .br-Datei ab, damit der
+    Webserver vorkomprimierte Bytes ausliefern kann. Aktuelle komprimierte Dateien werden nicht neu erstellt,
+    komprimierte Dateien, die nicht kleiner als das Original sind, werden verworfen.
+
+    Returns:
+        bool: True, wenn mindestens eine Datei geschrieben wurde.
+    """
+    source_stat = path.stat()
+    data = None
+    written = False
+    compressors = [(".gz", lambda content: gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0))]
+    if brotli is not None:
+        compressors.append((".br", lambda content: brotli.compress(content, quality=BROTLI_QUALITY)))
+
+    for suffix, compress in compressors:
+        target = path.with_name(path.name + suffix)
+        if target.is_file() and target.stat().st_mtime_ns >= source_stat.st_mtime_ns:
+            continue
+        if data is None:
+            data = path.read_bytes()
+        compressed = compress(data)
+        if len(compressed) >= len(data):
+            if target.exists():
+                target.unlink()
+            continue
+        temp_path = target.with_name(f".{target.name}.tmp")
+        temp_path.write_bytes(compressed)
+        os.replace(temp_path, target)
+        written = True
+    return written
+
+def precompress_tree(root: Path, workers: int = os.cpu_count() or 1) -> int:
+    """
+    Komprimiert alle HTML-, CSS-, JS-, JSON- und Playlist-Dateien unterhalb von `root` parallel vor.
+    Versteckte Dateien und Verzeichnisse (z.B. das Build-Manifest) werden übersprungen.
+
+    Returns:
+        int: Anzahl neu komprimierter Dateien.
+    """
+    if brotli is None:
+        logger.info("Brotli ist nicht installiert, es werden nur .gz-Dateien erstellt.")
+
+    files = [
+        path for path in root.rglob("*")
+        if path.suffix in PRECOMPRESS_EXTENSIONS and path.is_file()
+        and not any(part.startswith(".") for part in path.relative_to(root).parts)
+    ]
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="precompress") as pool:
+        return sum(pool.map(precompress_file, files))
@@ -0,0 +1,55 @@
+# src/online_medialibrary_manager/commands/build_site.py
+
+import typer
+from pathlib import Path
+from online_medialibrary_manager.og_image import DEFAULT_OG_WORKERS
+from online_medialibrary_manager.site_builder import DEFAULT_SITE_WORKERS, build_site
+
+def build_site_command(
+    library: Path = typer.Argument(..., help="Pfad zur Mediathek mit den Mediensets"),
+    output_dir: Path = typer.Argument(..., help="Ausgabeverzeichnis der statischen Website"),
+    base_url: str = typer.Option('', help="Basis-URL für die OG-Metadaten (z.B. https://example.com/videos)"),
+    workers: int = typer.Option(DEFAULT_SITE_WORKERS, "--workers", help="Anzahl parallel erstellter Seiten"),
+    og_workers: int = typer.Option(DEFAULT_OG_WORKERS, "--og-workers", help="Anzahl Prozesse für die OpenGraph-Bilder (Standard: CPU-Kerne)"),
+    force: bool = typer.Option(False, "--force", help="Alle Seiten neu erstellen, auch wenn sich nichts geändert hat"),
+    hls: bool = typer.Option(False, "--hls", help="Internet-Videos zusätzlich als HLS (fMP4-Segmente mit Master-Playlist) verpacken"),
+    precompress: bool = typer.Option(True, "--precompress/--no-precompress", help="HTML, CSS, JavaScript und JSON zusätzlich als .gz/.br ablegen")
+):
+    """
+    Erstellt die statische Website aller Mediensets einer Mediathek.
+
+    Für jedes Medienset (Verzeichnis mit Metadaten.yaml) wird eine Freigabeseite mit Titelbild, OpenGraph-Bild
+    und den Internet-Videos erstellt, dazu eine Übersichtsseite nach Jahr und Album. Es werden nur Seiten neu
+    erstellt, deren Metadaten, Titelbild, Videos oder Vorlagen sich seit dem letzten Build geändert haben.
+    Der Build entsteht in einem eigenen Verzeichnis; das Ausgabeverzeichnis ist ein symbolischer Link darauf
+    und wird erst atomar umgestellt, wenn der Build vollständig ist. Ein bestehendes Verzeichnis, das kein
+    früherer Build ist, wird nicht überschrieben.
+
+    Mit --hls werden die Internet-Renditionen (4K, HD, SD) ohne Neukodierung als HLS verpackt. Die Seiten
+    starten die Wiedergabe dann adaptiv über HLS und verweisen weiterhin auf die MP4-Dateien als Rückfall.
+
+    CSS und JavaScript werden minifiziert als gemeinsame Dateien mit Inhaltshash (assets/app.<hash>.css/.js)
+    abgelegt, das Asset-Manifest (asset-manifest.json) ordnet die Namen zu. Textdateien werden zusätzlich
+    vorkomprimiert, damit der Webserver sie ohne eigene Kompression ausliefern kann.
+    """
+    if not library.is_dir():
+        typer.secho(f"Die Mediathek '{library}' existiert nicht.", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+    # Den Link selbst nicht auflösen: er zeigt auf den aktuellen Build
+    resolved_output = output_dir.parent.resolve() / output_dir.name
+    if resolved_output == library.resolve() or resolved_output in library.resolve().parents:
+        typer.secho(f"Das Ausgabeverzeichnis '{output_dir}' darf nicht die Mediathek sein oder sie enthalten.", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+    try:
+        rendered, reused, failed = build_site(library, output_dir, base_url, workers, force, og_workers, hls, precompress)
+    except FileExistsError as e:
+        typer.secho(str(e), fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+    typer.secho(f"Website erstellt: {output_dir}", fg=typer.colors.GREEN)
+    typer.secho(f"{rendered} Seite(n) neu erstellt, {reused} Seite(n) unverändert übernommen.", fg=typer.colors.GREEN)
+    if failed:
+        typer.secho(f"{failed} Seite(n) konnten nicht erstellt werden.", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
@@ -6,8 +6,13 @@ import os
 from datetime import datetime
 from metadata_manager import get_metadata_with_exiftool
 from metadata_manager.commands.get_recording_date import get_recording_date_command as get_recording_date
+from online_medialibrary_manager.artwork_derivatives import ArtworkSet, create_artwork_derivatives
 from online_medialibrary_manager.commands.create_og_image import create_og_image_command
-from typing import Optional
+from online_medialibrary_manager.hls import package_hls
+from typing import Dict, Optional
+
+# Darstellungsbreite des Titelbilds: volle Breite auf kleinen Bildschirmen, sonst die Breite des Containers
+ARTWORK_SIZES = "(max-width: 940px) 100vw, 900px"
 
 app = typer.Typer()
 
@@ -19,14 +24,16 @@ def create_html_command(
     artwork_image: str = typer.Argument(..., help="Pfad zum Vorschaubild"),
     subtitle: Optional[str] = typer.Option(None, help="Optionaler Untertitel für die Seite (z.B. Ukrainisch)"),
     download_file: Optional[str] = typer.Option(None, help="Optionaler Pfad zur Download-Datei (z.B. ZIP-Datei)"),
-    base_url: str = typer.Option('', help="Basis-URL für die OG-Metadaten (z.B. https://example.com/videos)")
+    base_url: str = typer.Option('', help="Basis-URL für die OG-Metadaten (z.B. https://example.com/videos)"),
+    hls: bool = typer.Option(False, "--hls", help="Videos zusätzlich als HLS (fMP4-Segmente mit Master-Playlist) verpacken")
 ):
     """
     Erstellt eine statische HTML-Seite.
 
     Diese Methode verwendet die bereitgestellten Videodateien und Metadaten, um eine HTML-Seite zu generieren,
     die die Videos in verschiedenen Auflösungen anzeigt. Zusätzlich wird ein OpenGraph-Bild erstellt, das für
-    die Vorschau auf sozialen Medien verwendet werden kann.
+    die Vorschau auf sozialen Medien verwendet werden kann. Mit --hls werden die Videos ohne Neukodierung in
+    HLS-Segmente verpackt; die Seite bevorzugt dann HLS und greift sonst auf die MP4-Dateien zurück.
     """
     # Überprüfen, ob alle erforderlichen Dateien existieren
     required_files = {
@@ -59,7 +66,7 @@ def create_html_command(
 
     # HTML generieren und speichern
     try:
-        html_content = generate_html(metadata_source, high_res_file, mid_res_file, artwork_image, subtitle, download_file, base_url)
+        html_content = generate_html(metadata_source, high_res_file, mid_res_file, artwork_image, subtitle, download_file, base_url, hls)
 
         # HTML-Datei speichern
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -70,7 +77,7 @@ def create_html_command(
         raise typer.Exit(code=1)
 
 
-def generate_html(metadata_source: str, high_res_file: str, mid_res_file: str, artwork_image: str, subtitle: Optional[str] = None, download_file: Optional[str] = None, base_url: str = '') -> str:
+def generate_html(metadata_source: str, high_res_file: str, mid_res_file: str, artwork_image: str, subtitle: Optional[str] = None, download_file: Optional[str] = None, base_url: str = '', hls: bool = False) -> str:
     """
     Generiert eine statische HTML-Seite für das Familienvideo und erstellt ein OpenGraph-Bild.
 
@@ -78,14 +85,7 @@ def generate_html(metadata_source: str, high_res_file: str, mid_res_file: str, a
     die die Videos in verschiedenen Auflösungen anzeigt. Zusätzlich wird ein OpenGraph-Bild erstellt, das für
     die Vorschau auf sozialen Medien verwendet werden kann.
     """
-    # Locale auf Deutsch setzen
-    try:
-        locale.setlocale(locale.LC_TIME, 'de_CH.UTF-8')
-    except locale.Error:
-        try:
-            locale.setlocale(locale.LC_TIME, 'de_DE.UTF-8')
-        except locale.Error:
-            locale.setlocale(locale.LC_TIME, '')
+    set_german_locale()
 
     # Extrahieren der Metadaten aus der angegebenen Metadatenquelle
     metadata = get_metadata_with_exiftool(metadata_source)
@@ -102,12 +102,66 @@ def generate_html(metadata_source: str, high_res_file: str, mid_res_file: str, a
     # Erstellen des OpenGraph-Bildes und Rückgabe des Pfads
     og_image_path = create_og_image_command(artwork_image)
 
-    # Dateinamen extrahieren
-    high_res_file_name = os.path.basename(high_res_file)
-    mid_res_file_name = os.path.basename(mid_res_file)
-    og_image_name = os.path.basename(og_image_path)
-    download_file_name = os.path.basename(download_file) if download_file else None
+    # Ableitungen des Titelbilds neben der HTML-Datei ablegen
+    artwork_set = create_artwork_derivatives(artwork_image, os.path.dirname(metadata_source))
+
+    # Optional die Videos als HLS neben der HTML-Datei verpacken
+    hls_playlist = None
+    if hls:
+        renditions = [("4k", high_res_file)]
+        if os.path.abspath(mid_res_file) != os.path.abspath(high_res_file):
+            renditions.append(("hd", mid_res_file))
+        hls_playlist = package_hls(renditions, os.path.dirname(metadata_source))
+
+    return render_share_page(
+        title,
+        description,
+        recording_date_str,
+        os.path.basename(high_res_file),
+        os.path.basename(mid_res_file),
+        artwork_image,
+        os.path.basename(og_image_path),
+        subtitle,
+        os.path.basename(download_file) if download_file else None,
+        base_url,
+        artwork_set,
+        hls_playlist
+    )
+
+def set_german_locale():
+    """Setzt die Locale für Datumsangaben auf Deutsch (Schweiz, sonst Deutschland, sonst Systemstandard)."""
+    try:
+        locale.setlocale(locale.LC_TIME, 'de_CH.UTF-8')
+    except locale.Error:
+        try:
+            locale.setlocale(locale.LC_TIME, 'de_DE.UTF-8')
+        except locale.Error:
+            locale.setlocale(locale.LC_TIME, '')
+
+def render_share_page(
+    title: str,
+    description: str,
+    recording_date_str: str,
+    high_res_file_name: str,
+    mid_res_file_name: str,
+    artwork_image: str,
+    og_image_name: str,
+    subtitle: Optional[str] = None,
+    download_file_name: Optional[str] = None,
+    base_url: str = '',
+    artwork_set: Optional[ArtworkSet] = None,
+    hls_playlist: Optional[str] = None,
+    assets: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Rendert die Freigabeseite eines Films aus bereits ermittelten Metadaten und Dateinamen.
 
+    Wird von `generate_html` und vom Site-Builder verwendet; liest selbst keine Dateien.
+    Mit `artwork_set` wird das Titelbild über srcset in passender Breite und mit Platzhalter geladen,
+    mit `hls_playlist` startet die Wiedergabe bevorzugt über HLS. Mit `assets` (logischer Name → relative URL,
+    siehe `online_medialibrary_manager.assets`) werden CSS und JavaScript als gemeinsame Dateien eingebunden
+    statt eingebettet.
+    """
     # Wenn base_url angegeben ist, fügen wir sie den Dateinamen hinzu
     def make_absolute(url):
         return f'{base_url.rstrip("/")}/{url.lstrip("/")}' if base_url else url
@@ -149,7 +203,7 @@ def generate_html(metadata_source: str, high_res_file: str, mid_res_file: str, a
     {og_meta_tags}
 
     <!-- CSS -->
-    {generate_css()}
+    {stylesheet_html(assets)}
 
 </head>
 <body>
@@ -159,8 +213,8 @@ def generate_html(metadata_source: str, high_res_file: str, mid_res_file: str, a
         <h2 id="title-link">{title}</h2>
         {subtitle_section}
         <div class="video-container" id="video-container">
-            <a href="{mid_res_file_name}" id="play-link">
-                <img src="{artwork_image}" alt="{title}" class="video-image">
+            <a href="{mid_res_file_name}" id="play-link" data-high-res="{high_res_file_name}" data-mid-res="{mid_res_file_name}" data-hls="{hls_playlist or ''}">
+                {generate_artwork_html(artwork_image, title, artwork_set)}
                 <div class="play-icon">
                     <svg width="100%" height="100%" viewBox="0 0 64 64" xmlns="http://www.w3.org/2000/svg" fill="#ffffff">
                         <circle cx="32" cy="32" r="32" opacity="0.7"/>
@@ -196,7 +250,7 @@ def generate_html(metadata_source: str, high_res_file: str, mid_res_file: str, a
     </footer>
 
     <!-- JavaScript -->
-    {generate_javascript(high_res_file_name, mid_res_file_name)}
+    {script_html(assets)}
 </body>
 
 </html>
@@ -204,15 +258,64 @@ def generate_html(metadata_source: str, high_res_file: str, mid_res_file: str, a
 
     return html_content
 
+def stylesheet_html(assets: Optional[Dict[str, str]] = None) -> str:
+    """Bindet das Stylesheet als gemeinsame Datei ein oder bettet es ohne Asset-Manifest direkt ein."""
+    if assets and "app.css" in assets:
+        return f'<link rel="stylesheet" href="{assets["app.css"]}">'
+    return generate_css()
+
+def script_html(assets: Optional[Dict[str, str]] = None) -> str:
+    """Bindet das Skript als gemeinsame Datei ein oder bettet es ohne Asset-Manifest direkt ein."""
+    if assets and "app.js" in assets:
+        return f'<script src="{assets["app.js"]}" defer></script>'
+    return generate_javascript()
+
+def generate_artwork_html(artwork_image: str, title: str, artwork_set: Optional[ArtworkSet] = None) -> str:
+    """
+    Generiert das Bild-Element für das Titelbild.
+
+    Mit Ableitungen wählt der Browser über `srcset`/`sizes` die passende Breite (WebP bevorzugt). Die
+    explizite Breite und Höhe reservieren den Platz, der eingebettete unscharfe Platzhalter ist sofort sichtbar.
+
+    Args:
+        artwork_image (str): Pfad zum Titelbild, falls keine Ableitungen vorhanden sind.
+        title (str): Der Titel als Alternativtext.
+        artwork_set (ArtworkSet | None): Die Ableitungen des Titelbilds.
+
+    Returns:
+        str: Das HTML für das Titelbild.
+    """
+    if artwork_set is None:
+        return f'<img src="{artwork_image}" alt="{title}" class="video-image">'
+
+    return f'''<picture>
+                    <source type="image/webp" srcset="{artwork_set.srcset('webp')}" sizes="{ARTWORK_SIZES}">
+                    <img src="{artwork_set.fallback()}" srcset="{artwork_set.srcset('jpeg')}" sizes="{ARTWORK_SIZES}"
+                         width="{artwork_set.width}" height="{artwork_set.height}" alt="{title}" class="video-image"
+                         decoding="async" fetchpriority="high"
+                         style="background-image: url({artwork_set.placeholder}); background-size: cover;">
+                </picture>'''
+
 def generate_css() -> str:
     """
-    Generiert das CSS für die HTML-Seite.
+    Generiert das eingebettete CSS für die HTML-Seite.
+
+    Returns:
+        str: Der CSS-String.
+    """
+    return f'''
+    <style>{page_css()}</style>
+    '''
+
+def page_css() -> str:
+    """
+    Das CSS der Freigabe- und Übersichtsseiten ohne <style>-Element, wie es auch in die
+    gemeinsame Stylesheet-Datei des Site-Builders geschrieben wird.
 
     Returns:
         str: Der CSS-String.
     """
     return '''
-    <style>
         body {
             margin: 0;
             padding: 0;
@@ -357,60 +460,79 @@ def generate_css() -> str:
             color: #777;
             font-size: 0.9em;
         }
-    </style>
     '''
 
-def generate_javascript(high_res_file_name: str, mid_res_file_name: str) -> str:
+def generate_javascript() -> str:
     """
-    Generiert das JavaScript für die HTML-Seite.
-
-    Args:
-        high_res_file_name (str): Der Name der 4K-Datei.
-        mid_res_file_name (str): Der Name der HD-Datei.
+    Generiert das eingebettete JavaScript für die HTML-Seite.
 
     Returns:
         str: Der JavaScript-String.
     """
     return f'''
-    <script>
-        document.addEventListener('DOMContentLoaded', function() {{
-            var playLink = document.getElementById('play-link');
-            var highResFile = '{high_res_file_name}';
-            var midResFile = '{mid_res_file_name}';
+    <script>{page_javascript()}</script>
+    '''
 
-            function canPlayHEVC() {{
+def page_javascript() -> str:
+    """
+    Das JavaScript der Freigabeseite ohne <script>-Element. Die Dateinamen liest es aus den
+    data-Attributen des Play-Links, damit dasselbe Skript für alle Seiten gilt.
+
+    Ist ein HLS-Master-Playlist vorhanden und spielt der Browser HLS nativ ab (Safari, iOS), verweist der
+    Play-Link darauf; der Player wählt die Rendition dann nach Bandbreite. Sonst gilt die MP4-Auswahl.
+
+    Returns:
+        str: Der JavaScript-String.
+    """
+    return '''
+        document.addEventListener('DOMContentLoaded', function() {
+            var playLink = document.getElementById('play-link');
+            if (!playLink) {
+                return;
+            }
+            var highResFile = playLink.dataset.highRes;
+            var midResFile = playLink.dataset.midRes;
+            var hlsPlaylist = playLink.dataset.hls || '';
+
+            function canPlayHEVC() {
                 var video = document.createElement('video');
                 return video.canPlayType('video/mp4; codecs="hvc1"') !== '';
-            }}
+            }
+
+            function canPlayHLS() {
+                var video = document.createElement('video');
+                return video.canPlayType('application/vnd.apple.mpegurl') !== '';
+            }
 
-            function getQueryParam(param) {{
+            function getQueryParam(param) {
                 var urlParams = new URLSearchParams(window.location.search);
                 return urlParams.get(param);
-            }}
+            }
 
-            function getAnchorParam() {{
+            function getAnchorParam() {
                 return window.location.hash.substr(1);
-            }}
+            }
 
             var playParam = getQueryParam('play') || getAnchorParam();
 
-            if (playParam) {{
-                if (playParam.toLowerCase() === '4k') {{
+            if (playParam) {
+                if (playParam.toLowerCase() === '4k') {
                     playLink.href = highResFile;
-                }} else if (playParam.toLowerCase() === 'hd') {{
+                } else if (playParam.toLowerCase() === 'hd') {
                     playLink.href = midResFile;
-                }} else {{
+                } else {
                     playLink.href = midResFile;
-                }}
-            }} else {{
-                if (canPlayHEVC()) {{
+                }
+            } else if (hlsPlaylist && canPlayHLS()) {
+                playLink.href = hlsPlaylist;
+            } else {
+                if (canPlayHEVC()) {
                     playLink.href = highResFile;
-                }} else {{
+                } else {
                     playLink.href = midResFile;
-                }}
-            }}
-        }});
-    </script>
+                }
+            }
+        });
     '''
 
 if __name__ == "__main__":
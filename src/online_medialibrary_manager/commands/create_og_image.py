@@ -1,6 +1,7 @@
 import os
 import subprocess
 import typer
+from online_medialibrary_manager.og_image import render_og_image
 
 def create_og_image_command(
     artwork_image: str,
@@ -9,7 +10,7 @@ def create_og_image_command(
     """
     Erstellt ein OpenGraph-Bild.
 
-    Diese Methode skaliert und beschneidet das gegebene Vorschaubild und erstellt ein OpenGraph-Bild für die Verwendung in sozialen Medien. Wenn kein Zielpfad angegeben ist, wird das Bild im gleichen Verzeichnis wie das Eingabebild gespeichert und erhält das Suffix '-OG'.
+    Diese Methode skaliert und beschneidet das gegebene Vorschaubild und erstellt ein OpenGraph-Bild für die Verwendung in sozialen Medien. Das Vorschaubild selbst bleibt unverändert. Wenn kein Zielpfad angegeben ist, wird das Bild im gleichen Verzeichnis wie das Eingabebild gespeichert und erhält das Suffix '-OG'.
 
     Args:
         artwork_image (str): Pfad zum Vorschaubild.
@@ -25,59 +26,17 @@ def create_og_image_command(
         typer.secho("Nur JPG/JPEG-Dateien werden akzeptiert.", fg=typer.colors.RED)
         raise typer.Exit(code=1)
 
-    # Zielauflösung
-    target_width = 1536
-    target_height = 804
-    target_aspect_ratio = target_width / target_height
-
     # Wenn kein output_image angegeben wurde, erstelle Standardnamen mit dem Suffix '-OG'
     if output_image is None:
         input_dir, input_filename = os.path.split(artwork_image)
         input_name, _ = os.path.splitext(input_filename)
         output_image = os.path.join(input_dir, f"{input_name}-OG.jpg")
 
-    # Ermitteln der Original-Bildgröße
-    command_get_size = [
-        'sips', '-g', 'pixelWidth', '-g', 'pixelHeight', artwork_image
-    ]
-    result = subprocess.run(command_get_size, capture_output=True, text=True)
-    original_width = int(result.stdout.split('pixelWidth: ')[1].split()[0])
-    original_height = int(result.stdout.split('pixelHeight: ')[1].split()[0])
-    original_aspect_ratio = original_width / original_height
-
-    # Berechnung des richtigen Beschneidens, um das Seitenverhältnis zu erreichen
-    if original_aspect_ratio > target_aspect_ratio:
-        # Bild ist zu breit, es wird in der Breite beschnitten
-        new_width = int(original_height * target_aspect_ratio)
-        crop_command = [
-            'sips', '-c', str(original_height), str(new_width),
-            artwork_image, '--out', artwork_image
-        ]
-    else:
-        # Bild ist zu hoch, es wird in der Höhe beschnitten
-        new_height = int(original_width / target_aspect_ratio)
-        crop_command = [
-            'sips', '-c', str(new_height), str(original_width),
-            artwork_image, '--out', artwork_image
-        ]
-
-    # Zuschneiden des Bildes
-    try:
-        subprocess.run(crop_command, check=True)
-    except subprocess.CalledProcessError as e:
-        typer.secho(f"Fehler beim Zuschneiden des Bildes: {e}", fg=typer.colors.RED)
-        raise typer.Exit(code=1)
-
-    # Skalieren des Bildes auf die Zielauflösung
-    scale_command = [
-        'sips', '-z', str(target_height), str(target_width),
-        artwork_image, '--out', output_image
-    ]
-
+    # Zuschneiden und Skalieren im Speicher; das Vorschaubild selbst wird nicht verändert
     try:
-        subprocess.run(scale_command, check=True)
-    except subprocess.CalledProcessError as e:
-        typer.secho(f"Fehler beim Skalieren des Bildes: {e}", fg=typer.colors.RED)
+        render_og_image(artwork_image, output_image)
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        typer.secho(f"Fehler beim Erstellen des OpenGraph-Bildes: {e}", fg=typer.colors.RED)
         raise typer.Exit(code=1)
 
     # Überprüfung, ob das Bild erstellt wurde
@@ -0,0 +1,38 @@
+# src/online_medialibrary_manager/commands/serve.py
+
+import logging
+import typer
+from pathlib import Path
+from online_medialibrary_manager.preview_server import DEFAULT_HOST, DEFAULT_PORT, PreviewServer
+
+def serve_command(
+    directory: Path = typer.Argument(..., help="Verzeichnis der erstellten Website (z.B. Ausgabe von build-site)"),
+    host: str = typer.Option(DEFAULT_HOST, "--host", help="Adresse, an die der Server gebunden wird"),
+    port: int = typer.Option(DEFAULT_PORT, "--port", help="Port des Servers")
+):
+    """
+    Startet einen lokalen Vorschau-Server für die erstellten Freigabeseiten.
+
+    Der Server beantwortet Byte-Bereichsanfragen (Spulen in Videos, HLS), liefert vorkomprimierte .br/.gz-Dateien
+    aus, wenn der Browser sie akzeptiert, und überträgt Dateien per sendfile. Jede Anfrage wird mit Status,
+    übertragenen Bytes und Dauer protokolliert; beim Beenden (Ctrl+C) folgt eine Zusammenfassung.
+    """
+    if not directory.is_dir():
+        typer.secho(f"Das Verzeichnis '{directory}' existiert nicht.", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    try:
+        server = PreviewServer(str(directory), host, port)
+    except OSError as e:
+        typer.secho(f"Der Server kann nicht auf {host}:{port} gestartet werden: {e}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+    typer.secho(f"Vorschau von {directory} unter http://{host}:{port}/ (Beenden mit Ctrl+C)", fg=typer.colors.GREEN)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    typer.secho(f"{server.requests} Anfrage(n), {server.bytes_sent / (1024 * 1024):.2f} MB übertragen.", fg=typer.colors.GREEN)
@@ -0,0 +1,219 @@
+# src/online_medialibrary_manager/hls.py
+
+import json
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+HLS_DIR = "hls"
+MASTER_PLAYLIST = "master.m3u8"
+VARIANT_PLAYLIST = "playlist.m3u8"
+SEGMENT_SECONDS = 6
+
+# Codecs, die in fMP4-HLS ohne Neukodierung zulässig sind
+HLS_VIDEO_CODECS = {"h264", "hevc"}
+HLS_AUDIO_CODECS = {"aac": "mp4a.40.2", "ac3": "ac-3", "eac3": "ec-3", "alac": "alac", "flac": "fLaC"}
+
+# Profil-Präfixe für die CODECS-Angabe im Master-Playlist (RFC 6381)
+AVC_PROFILES = {"Constrained Baseline": "42e0", "Baseline": "4200", "Main": "4d40", "High": "6400", "High 10": "6e00"}
+HEVC_PROFILES = {"Main": "1.6", "Main 10": "2.4"}
+VIDEO_RANGES = {"smpte2084": "PQ", "arib-std-b67": "HLG"}
+
+def probe_rendition(file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Liest mit ffprobe die für HLS relevanten Eigenschaften einer Datei (erster Video- und Audiostream).
+    """
+    cmd = [
+        'ffprobe', '-v', 'error',
+        '-show_entries', 'stream=codec_type,codec_name,profile,level,width,height,avg_frame_rate,color_transfer',
+        '-of', 'json', file_path
+    ]
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        streams = json.loads(result.stdout).get('streams', []) if result.returncode == 0 else []
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"Fehler beim Lesen von {file_path}: {e}")
+        return None
+
+    video = next((stream for stream in streams if stream.get('codec_type') == 'video'), None)
+    audio = next((stream for stream in streams if stream.get('codec_type') == 'audio'), None)
+    if video is None:
+        logger.error(f"{file_path} enthält keinen Videostream.")
+        return None
+    return {'video': video, 'audio': audio}
+
+def codecs_attribute(probe: Dict[str, Any], audio_transcoded: bool) -> Optional[str]:
+    """
+    Baut die CODECS-Angabe (z.B. 'hvc1.2.4.L153.B0,mp4a.40.2'), sofern sie sich aus den Metadaten ableiten lässt.
+    """
+    video = probe['video']
+    level = video.get('level')
+    if video.get('codec_name') == 'h264' and video.get('profile') in AVC_PROFILES and level:
+        codecs = [f"avc1.{AVC_PROFILES[video['profile']]}{int(level):02x}"]
+    elif video.get('codec_name') == 'hevc' and video.get('profile') in HEVC_PROFILES and level:
+        codecs = [f"hvc1.{HEVC_PROFILES[video['profile']]}.L{int(level)}.B0"]
+    else:
+        return None
+
+    audio = probe['audio']
+    if audio is not None:
+        codecs.append("mp4a.40.2" if audio_transcoded else HLS_AUDIO_CODECS[audio['codec_name']])
+    return ",".join(codecs)
+
+def build_package_command(input_path: str, output_dir: str, probe: Dict[str, Any]) -> Tuple[List[str], bool]:
+    """
+    Baut den FFmpeg-Befehl, der eine Datei in fMP4-HLS-Segmente verpackt.
+
+    Video und Audio werden kopiert, sofern HLS die Codecs erlaubt. Andernfalls wird Audio nach AAC und Video
+    nach H.264 kodiert.
+
+    Returns:
+        Tuple[List[str], bool]: Der Befehl und ob Audio neu kodiert wird.
+    """
+    video = probe['video']
+    audio = probe['audio']
+    cmd = ['ffmpeg', '-y', '-loglevel', 'error', '-i', input_path, '-map', '0:v:0']
+
+    if video.get('codec_name') in HLS_VIDEO_CODECS:
+        cmd += ['-c:v', 'copy']
+        if video['codec_name'] == 'hevc':
+            cmd += ['-tag:v', 'hvc1']  # Apple-Geräte spielen HEVC in HLS nur mit dem hvc1-Tag ab
+    else:
+        logger.warning(f"{input_path}: Videocodec {video.get('codec_name')} ist in HLS nicht zulässig und wird nach H.264 kodiert.")
+        cmd += ['-c:v', 'libx264', '-crf', '20', '-preset', 'medium', '-force_key_frames', f"expr:gte(t,n_forced*{SEGMENT_SECONDS})"]
+
+    audio_transcoded = False
+    if audio is not None:
+        cmd += ['-map', '0:a:0']
+        if audio.get('codec_name') in HLS_AUDIO_CODECS:
+            cmd += ['-c:a', 'copy']
+        else:
+            cmd += ['-c:a', 'aac', '-b:a', '192k']
+            audio_transcoded = True
+
+    cmd += [
+        '-f', 'hls',
+        '-hls_time', str(SEGMENT_SECONDS),
+        '-hls_playlist_type', 'vod',
+        '-hls_segment_type', 'fmp4',
+        '-hls_fmp4_init_filename', 'init.mp4',
+        '-hls_flags', 'independent_segments',
+        '-hls_segment_filename', os.path.join(output_dir, 'segment_%04d.m4s'),
+        os.path.join(output_dir, VARIANT_PLAYLIST)
+    ]
+    return cmd, audio_transcoded
+
+def measure_bandwidth(variant_dir: str) -> Tuple[int, int]:
+    """
+    Berechnet Spitzen- und Durchschnittsbandbreite (Bit pro Sekunde) aus den erzeugten Segmenten,
+    wie sie für BANDWIDTH und AVERAGE-BANDWIDTH im Master-Playlist verlangt werden.
+    """
+    peak = 0.0
+    total_bytes = 0
+    total_seconds = 0.0
+    duration = None
+    with open(os.path.join(variant_dir, VARIANT_PLAYLIST), "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("#EXTINF:"):
+                duration = float(line[len("#EXTINF:"):].split(",")[0])
+            elif line and not line.startswith("#") and duration:
+                size = os.path.getsize(os.path.join(variant_dir, line))
+                peak = max(peak, size * 8 / duration)
+                total_bytes += size
+                total_seconds += duration
+                duration = None
+    average = total_bytes * 8 / total_seconds if total_seconds else 0.0
+    return int(peak), int(average)
+
+def package_rendition(name: str, input_path: str, hls_dir: str) -> Optional[Dict[str, Any]]:
+    """
+    Verpackt eine Rendition in ein Unterverzeichnis von `hls_dir` und liefert die Angaben für das Master-Playlist.
+    """
+    probe = probe_rendition(input_path)
+    if probe is None:
+        return None
+
+    variant_dir = os.path.join(hls_dir, name)
+    shutil.rmtree(variant_dir, ignore_errors=True)
+    os.makedirs(variant_dir)
+    cmd, audio_transcoded = build_package_command(input_path, variant_dir, probe)
+    logger.debug(f"Verpacke {input_path} als HLS: {' '.join(cmd)}")
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        logger.error(f"HLS-Verpackung von {input_path} fehlgeschlagen: {result.stderr.strip()}")
+        return None
+
+    peak, average = measure_bandwidth(variant_dir)
+    video = probe['video']
+    frame_rate = None
+    if video.get('avg_frame_rate') and video['avg_frame_rate'] != '0/0':
+        numerator, denominator = video['avg_frame_rate'].split('/')
+        frame_rate = float(numerator) / float(denominator)
+    return {
+        'name': name,
+        'uri': f"{name}/{VARIANT_PLAYLIST}",
+        'bandwidth': peak,
+        'average_bandwidth': average,
+        'resolution': f"{video.get('width')}x{video.get('height')}",
+        'codecs': codecs_attribute(probe, audio_transcoded),
+        'frame_rate': frame_rate,
+        'video_range': VIDEO_RANGES.get(video.get('color_transfer'), "SDR"),
+    }
+
+def write_master_playlist(variants: List[Dict[str, Any]], hls_dir: str, preferred: Optional[str] = None) -> str:
+    """
+    Schreibt das Master-Playlist. Die bevorzugte Rendition steht zuoberst, da Player mit ihr starten;
+    die übrigen folgen nach absteigender Bandbreite.
+    """
+    ordered = sorted(variants, key=lambda variant: (variant['name'] != preferred, -variant['bandwidth']))
+    lines = ["#EXTM3U", "#EXT-X-VERSION:7", "#EXT-X-INDEPENDENT-SEGMENTS"]
+    for variant in ordered:
+        attributes = [
+            f"BANDWIDTH={variant['bandwidth']}",
+            f"AVERAGE-BANDWIDTH={variant['average_bandwidth']}",
+            f"RESOLUTION={variant['resolution']}",
+            f"VIDEO-RANGE={variant['video_range']}",
+        ]
+        if variant['codecs']:
+            attributes.append(f'CODECS="{variant["codecs"]}"')
+        if variant['frame_rate']:
+            attributes.append(f"FRAME-RATE={variant['frame_rate']:.3f}")
+        lines.append("#EXT-X-STREAM-INF:" + ",".join(attributes))
+        lines.append(variant['uri'])
+
+    master_path = os.path.join(hls_dir, MASTER_PLAYLIST)
+    temp_path = os.path.join(hls_dir, f".{MASTER_PLAYLIST}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(temp_path, master_path)
+    return master_path
+
+def package_hls(renditions: List[Tuple[str, str]], output_dir: str, preferred: Optional[str] = "hd") -> Optional[str]:
+    """
+    Verpackt die vorhandenen Internet-Renditionen (z.B. 4K, HD, SD) parallel als fMP4-HLS mit Master-Playlist.
+
+    Args:
+        renditions (List[Tuple[str, str]]): Paare aus Name (Unterverzeichnis, z.B. 'hd') und Pfad zur MP4-Datei.
+        output_dir (str): Verzeichnis, in dem das Unterverzeichnis 'hls' angelegt wird.
+        preferred (str | None): Rendition, mit der Player starten sollen.
+
+    Returns:
+        str | None: Pfad des Master-Playlists relativ zu `output_dir`, oder None, wenn keine Rendition verpackt werden konnte.
+    """
+    hls_dir = os.path.join(output_dir, HLS_DIR)
+    os.makedirs(hls_dir, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=max(1, len(renditions)), thread_name_prefix="hls") as pool:
+        variants = list(pool.map(lambda rendition: package_rendition(rendition[0], rendition[1], hls_dir), renditions))
+
+    variants = [variant for variant in variants if variant]
+    if not variants:
+        return None
+    write_master_playlist(variants, hls_dir, preferred)
+    return f"{HLS_DIR}/{MASTER_PLAYLIST}"
@@ -0,0 +1,143 @@
+# src/online_medialibrary_manager/og_image.py
+
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import logging
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Ohne Pillow wird auf sips (macOS) zurückgegriffen
+    Image = None
+    ImageOps = None
+
+logger = logging.getLogger(__name__)
+
+# Zielauflösung der OpenGraph-Bilder
+OG_WIDTH = 1536
+OG_HEIGHT = 804
+JPEG_QUALITY = 85
+
+DEFAULT_OG_WORKERS = os.cpu_count() or 1
+
+def crop_box(width: int, height: int, target_width: int = OG_WIDTH, target_height: int = OG_HEIGHT) -> Tuple[int, int, int, int]:
+    """
+    Berechnet den zentrierten Ausschnitt (links, oben, rechts, unten) mit dem Seitenverhältnis des Zielbildes.
+    """
+    target_aspect_ratio = target_width / target_height
+    if width / height > target_aspect_ratio:
+        # Bild ist zu breit, es wird in der Breite beschnitten
+        new_width = round(height * target_aspect_ratio)
+        left = (width - new_width) // 2
+        return left, 0, left + new_width, height
+    # Bild ist zu hoch, es wird in der Höhe beschnitten
+    new_height = round(width / target_aspect_ratio)
+    top = (height - new_height) // 2
+    return 0, top, width, top + new_height
+
+def _temporary_path(output_image: str) -> str:
+    directory, name = os.path.split(output_image)
+    return os.path.join(directory, f".{name}.tmp.jpg")
+
+def _render_with_pillow(artwork_image: str, output_image: str, quality: int):
+    with Image.open(artwork_image) as image:
+        # Bei JPEGs nur so fein dekodieren wie nötig (DCT-Skalierung), das spart bei 4K-Titelbildern viel Zeit
+        image.draft("RGB", (OG_WIDTH, OG_HEIGHT))
+        icc_profile = image.info.get("icc_profile")
+        image = ImageOps.exif_transpose(image)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        image = image.resize(
+            (OG_WIDTH, OG_HEIGHT),
+            Image.LANCZOS,
+            box=crop_box(image.width, image.height),
+            reducing_gap=3.0
+        )
+        temp_path = _temporary_path(output_image)
+        # Das Farbprofil (z.B. Adobe RGB) bleibt erhalten, damit die Farben im Browser stimmen
+        image.save(
+            temp_path, "JPEG",
+            quality=quality, optimize=True, progressive=True, subsampling="4:2:0",
+            icc_profile=icc_profile
+        )
+    os.replace(temp_path, output_image)
+
+def _render_with_sips(artwork_image: str, output_image: str):
+    result = subprocess.run(
+        ['sips', '-g', 'pixelWidth', '-g', 'pixelHeight', artwork_image],
+        capture_output=True, text=True, check=True
+    )
+    width = int(result.stdout.split('pixelWidth: ')[1].split()[0])
+    height = int(result.stdout.split('pixelHeight: ')[1].split()[0])
+    left, top, right, bottom = crop_box(width, height)
+
+    # Zuschneiden und Skalieren in einem Aufruf; die Ausgabe geht in eine neue Datei, das Original bleibt unverändert
+    temp_path = _temporary_path(output_image)
+    subprocess.run(
+        [
+            'sips', '-s', 'format', 'jpeg',
+            '-c', str(bottom - top), str(right - left),
+            '-z', str(OG_HEIGHT), str(OG_WIDTH),
+            artwork_image, '--out', temp_path
+        ],
+        capture_output=True, check=True
+    )
+    os.replace(temp_path, output_image)
+
+def render_og_image(artwork_image: str, output_image: str, quality: int = JPEG_QUALITY) -> str:
+    """
+    Erstellt ein OpenGraph-Bild (1536×804, JPEG) aus einem Titelbild, ohne das Titelbild zu verändern.
+
+    Mit Pillow wird das Bild einmal dekodiert, im Speicher zentriert beschnitten, skaliert und mit
+    optimierten JPEG-Einstellungen gespeichert. Ohne Pillow wird sips verwendet.
+
+    Args:
+        artwork_image (str): Pfad zum Titelbild (JPG oder PNG).
+        output_image (str): Pfad zur Ausgabedatei.
+        quality (int): JPEG-Qualität (1-95).
+
+    Returns:
+        str: Pfad zur Ausgabedatei.
+    """
+    if Image is not None:
+        _render_with_pillow(artwork_image, output_image, quality)
+    else:
+        _render_with_sips(artwork_image, output_image)
+    return output_image
+
+def _render_safely(job: Tuple[str, str, int]) -> Optional[str]:
+    artwork_image, output_image, quality = job
+    try:
+        render_og_image(artwork_image, output_image, quality)
+        return None
+    except Exception as e:
+        return str(e)
+
+def render_og_images(
+    jobs: List[Tuple[str, str]],
+    workers: int = DEFAULT_OG_WORKERS,
+    quality: int = JPEG_QUALITY
+) -> Dict[str, bool]:
+    """
+    Erstellt mehrere OpenGraph-Bilder parallel in einem Prozesspool (Dekodieren und Skalieren sind CPU-gebunden).
+
+    Args:
+        jobs (List[Tuple[str, str]]): Paare aus Titelbild und Ausgabedatei.
+        workers (int): Anzahl Prozesse.
+        quality (int): JPEG-Qualität.
+
+    Returns:
+        Dict[str, bool]: Erfolg pro Ausgabedatei.
+    """
+    if not jobs:
+        return {}
+
+    results: Dict[str, bool] = {}
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as pool:
+        errors = pool.map(_render_safely, [(artwork, output, quality) for artwork, output in jobs], chunksize=4)
+        for (artwork_image, output_image), error in zip(jobs, errors):
+            if error:
+                logger.error(f"OpenGraph-Bild für {artwork_image} konnte nicht erstellt werden: {error}")
+            results[output_image] = error is None
+    return results
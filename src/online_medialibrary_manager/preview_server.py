@@ -0,0 +1,250 @@
+# src/online_medialibrary_manager/preview_server.py
+
+import email.utils
+import mimetypes
+import os
+import posixpath
+import re
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+
+# Inhaltstypen, die mimetypes nicht oder falsch kennt
+CONTENT_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".m4s": "video/iso.segment",
+    ".m4v": "video/mp4",
+    ".mp4": "video/mp4",
+    ".webp": "image/webp",
+    ".json": "application/json",
+}
+TEXT_TYPES = ("text/", "application/json", "application/javascript", "application/vnd.apple.mpegurl")
+
+# Vorkomprimierte Varianten in der Reihenfolge der Bevorzugung (siehe online_medialibrary_manager.assets)
+PRECOMPRESSED = [("br", ".br"), ("gzip", ".gz")]
+
+# Dateien mit Inhaltshash im Namen (z.B. app.3f2a9c1b0d.css) ändern sich nie
+FINGERPRINTED = re.compile(r"\.[0-9a-f]{10}\.[a-z0-9]+$")
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+MEDIA_CACHE = "public, max-age=3600"
+
+RANGE_HEADER = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def content_type(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    guessed = CONTENT_TYPES.get(extension) or mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if guessed.startswith(TEXT_TYPES):
+        return f"{guessed}; charset=utf-8"
+    return guessed
+
+def cache_control(path: str) -> str:
+    """
+    Unveränderliche Assets dürfen ein Jahr im Cache bleiben, HTML, Manifeste und Playlists werden immer
+    revalidiert (über ETag billig), Bilder und Videos eine Stunde lang zwischengespeichert.
+    """
+    if FINGERPRINTED.search(os.path.basename(path)):
+        return IMMUTABLE_CACHE
+    if os.path.splitext(path)[1].lower() in (".html", ".json", ".m3u8"):
+        return REVALIDATE_CACHE
+    return MEDIA_CACHE
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """
+    Wertet einen Accept-Encoding-Header aus, z.B. 'br;q=1.0, gzip;q=0.5, *;q=0'.
+
+    Returns:
+        Dict[str, float]: Gewichtung (q-Wert) pro Kodierung in Kleinbuchstaben; ungültige q-Werte zählen als 0.
+    """
+    weights: Dict[str, float] = {}
+    for item in header.split(","):
+        name, *parameters = [part.strip() for part in item.split(";")]
+        if not name:
+            continue
+        weight = 1.0
+        for parameter in parameters:
+            key, _, value = parameter.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.lower()] = weight
+    return weights
+
+def accepts_encoding(weights: Dict[str, float], encoding: str) -> bool:
+    """Eine Kodierung ist erlaubt, wenn sie (oder '*') mit einem q-Wert über 0 genannt ist."""
+    return weights.get(encoding, weights.get("*", 0.0)) > 0
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Wertet einen Range-Header mit einem einzelnen Bereich aus.
+
+    Returns:
+        Tuple[int, int] | None: Erstes und letztes Byte (inklusive). None, wenn der Header nicht unterstützt wird
+        oder ungültig ist (z.B. 'bytes=500-10') und die ganze Datei geliefert werden soll (RFC 9110, 14.1.1).
+
+    Raises:
+        ValueError: Wenn der Bereich ausserhalb der Datei liegt (416).
+    """
+    match = RANGE_HEADER.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None  # Mehrere Bereiche oder unbekannte Einheit: ganze Datei
+    start, end = match.groups()
+    if start == "":
+        length = int(end)
+        if length == 0:
+            raise ValueError(header)
+        return max(0, size - length), size - 1
+    first = int(start)
+    if end and int(end) < first:
+        return None
+    if first >= size:
+        raise ValueError(header)
+    return first, min(int(end), size - 1) if end else size - 1
+
+class PreviewRequestHandler(BaseHTTPRequestHandler):
+    """
+    Liefert die Dateien eines Verzeichnisses aus: Byte-Bereiche für das Spulen in Videos, vorkomprimierte
+    .br/.gz-Dateien, bedingte Anfragen über ETag und die Dateiinhalte per sendfile ohne Umweg über Python.
+    """
+    server_version = "KurmannPreview/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def log_message(self, format, *args):
+        # Die Standardausgabe von http.server wird durch die Zeile mit Latenz und Bytes in _serve ersetzt
+        pass
+
+    def send_response(self, code, message=None):
+        self._status = code
+        super().send_response(code, message)
+
+    def _translate_path(self) -> Optional[str]:
+        """Übersetzt den URL-Pfad in einen Dateipfad unterhalb des Wurzelverzeichnisses."""
+        url_path = unquote(urlsplit(self.path).path)
+        normalized = posixpath.normpath(url_path)
+        parts = [part for part in normalized.split("/") if part and part not in (".", "..")]
+        path = os.path.join(self.server.root, *parts)
+        if os.path.isdir(path):
+            if not url_path.endswith("/"):
+                return None  # Weiterleitung auf den Pfad mit Schrägstrich
+            path = os.path.join(path, "index.html")
+        return path
+
+    def _serve(self, send_body: bool):
+        started = time.perf_counter()
+        self._status = None
+        sent = 0
+        try:
+            sent = self._respond(send_body)
+        except (BrokenPipeError, ConnectionResetError):
+            # Browser brechen beim Spulen laufende Videoanfragen regelmässig ab
+            self.close_connection = True
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.server.record(sent)
+            logger.info(
+                f"{self.command} {self.path} {self._status} {sent} B {elapsed_ms:.1f} ms"
+                + (f" range={self.headers['Range']}" if self.headers.get("Range") else "")
+            )
+
+    def _respond(self, send_body: bool) -> int:
+        path = self._translate_path()
+        if path is None:
+            self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+            self.send_header("Location", urlsplit(self.path).path + "/")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return 0
+        if not os.path.isfile(path):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return 0
+
+        stat = os.stat(path)
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        range_header = self.headers.get("Range")
+
+        # Vorkomprimierte Variante nur für ganze Dateien, Byte-Bereiche beziehen sich auf die unkomprimierte Datei
+        serve_path, encoding = path, None
+        if not range_header:
+            accepted = accepted_encodings(self.headers.get("Accept-Encoding", ""))
+            for name, suffix in PRECOMPRESSED:
+                if accepts_encoding(accepted, name) and os.path.isfile(path + suffix):
+                    serve_path, encoding = path + suffix, name
+                    etag = etag[:-1] + f'-{name}"'
+                    break
+
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache_control(path))
+            self.end_headers()
+            return 0
+
+        size = os.path.getsize(serve_path)
+        first, last = 0, size - 1
+        status = HTTPStatus.OK
+        if range_header and size > 0:
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return 0
+            if byte_range:
+                first, last = byte_range
+                status = HTTPStatus.PARTIAL_CONTENT
+        length = max(0, last - first + 1)
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type(path))
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", email.utils.formatdate(stat.st_mtime, usegmt=True))
+        self.send_header("Cache-Control", cache_control(path))
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header("Content-Range", f"bytes {first}-{last}/{size}")
+        self.end_headers()
+
+        if not send_body or length == 0:
+            return 0
+        with open(serve_path, "rb") as f:
+            # socket.sendfile nutzt os.sendfile (Zero-Copy) und fällt sonst auf send zurück
+            return self.connection.sendfile(f, offset=first, count=length)
+
+class PreviewServer(ThreadingHTTPServer):
+    """HTTP-Server mit einem Thread pro Verbindung, der die ausgelieferten Bytes mitzählt."""
+    daemon_threads = True
+
+    def __init__(self, root: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.root = os.path.abspath(root)
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        super().__init__((host, port), PreviewRequestHandler)
+
+    def record(self, sent: int):
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += sent
@@ -0,0 +1,491 @@
+# src/online_medialibrary_manager/site_builder.py
+
+import hashlib
+import html
+import inspect
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import chain
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import yaml
+from online_medialibrary_manager.commands import create_html
+from online_medialibrary_manager import artwork_derivatives, assets, hls, og_image
+from online_medialibrary_manager.artwork_derivatives import (
+    DERIVATIVE_WIDTHS, ArtworkSet, create_artwork_derivatives_batch, derivative_file_name
+)
+from online_medialibrary_manager.assets import precompress_tree, relative_assets, write_assets
+from online_medialibrary_manager.hls import package_hls
+from online_medialibrary_manager.og_image import DEFAULT_OG_WORKERS, render_og_images
+
+logger = logging.getLogger(__name__)
+
+METADATA_FILE = "Metadaten.yaml"
+MANIFEST_FILE = ".site-manifest.json"
+PAGE_FILE = "index.html"
+ARTWORK_FILE = "Titelbild.jpg"
+OG_IMAGE_FILE = "Titelbild-OG.jpg"
+
+# Dateinamen gemäss Kurmann-Medienset-Spezifikation, jeweils in absteigender Priorität
+HIGH_RES_FILES = ["Video-Internet-4K.m4v"]
+MID_RES_FILES = ["Video-Internet-HD.m4v", "Video-Internet-SD.m4v"]
+ARTWORK_FILES = ["Titelbild.jpg", "Titelbild.jpeg", "Titelbild.png"]
+# Renditionen, die mit --hls als HLS verpackt werden (Unterverzeichnis, Dateiname)
+HLS_RENDITIONS = [("4k", "Video-Internet-4K.m4v"), ("hd", "Video-Internet-HD.m4v"), ("sd", "Video-Internet-SD.m4v")]
+PREVIOUS_VERSION_DIRS = {"Vorherige_Version", "Vorherige_Versionen"}
+
+DEFAULT_SITE_WORKERS = 4
+
+# Zusätzliches CSS der Übersichtsseite; wird zusammen mit dem Seiten-CSS in das gemeinsame Stylesheet geschrieben
+INDEX_CSS = '''
+        h3 { color: #ffae42; font-weight: 300; letter-spacing: 0.05em; }
+        .index-list { list-style: none; padding: 0; display: grid; grid-template-columns: repeat(auto-fill, minmax(200px, 1fr)); gap: 20px; }
+        .index-list a { color: #e0e0e0; text-decoration: none; display: block; }
+        .index-list img { width: 100%; border-radius: 8px; display: block; margin-bottom: 8px; }
+'''
+
+@dataclass
+class Mediaset:
+    """Ein Medienset der Mediathek mit den für die Freigabeseite benötigten Dateien."""
+    directory: Path
+    relative_path: str
+    metadata: Dict[str, Any]
+    metadata_hash: str
+    artwork: Path
+    high_res_file: Optional[Path] = None
+    mid_res_file: Optional[Path] = None
+    renditions: List[Tuple[str, Path]] = field(default_factory=list)
+    inputs: Dict[str, Any] = field(default_factory=dict)
+    thumbnail: str = ARTWORK_FILE
+
+    @property
+    def title(self) -> str:
+        return str(self.metadata.get("Titel") or self.directory.name)
+
+    @property
+    def year(self) -> str:
+        return str(self.metadata.get("Jahr") or self.directory.name[:4])
+
+    @property
+    def album(self) -> str:
+        return str(self.metadata.get("Album") or "Ohne Album")
+
+def hash_file(file_path: Path) -> str:
+    """Berechnet den SHA-256-Hash einer Datei blockweise."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def template_hash() -> str:
+    """
+    Hash über den Quelltext der Vorlagen. Ändert sich das Layout einer Seite, werden alle Seiten neu erstellt.
+    """
+    digest = hashlib.sha256()
+    modules = (create_html, og_image, artwork_derivatives, hls, assets)
+    for source in [inspect.getsource(module) for module in modules] + [inspect.getsource(render_index_page), INDEX_CSS]:
+        digest.update(source.encode("utf-8"))
+    return digest.hexdigest()
+
+def _first_existing(directory: Path, names: List[str]) -> Optional[Path]:
+    for name in names:
+        path = directory / name
+        if path.is_file():
+            return path
+    return None
+
+def find_mediasets(library: Path) -> List[Mediaset]:
+    """
+    Sucht alle Mediensets (Verzeichnisse mit einer Metadaten.yaml) in der Mediathek.
+    Vorherige Versionen werden übersprungen, ebenso Mediensets ohne Titelbild oder Internet-Video.
+    """
+    mediasets = []
+    for metadata_path in sorted(library.rglob(METADATA_FILE)):
+        directory = metadata_path.parent
+        relative = directory.relative_to(library)
+        if any(part in PREVIOUS_VERSION_DIRS or part.startswith(".") for part in relative.parts):
+            continue
+
+        try:
+            with open(metadata_path, "r", encoding="utf-8") as f:
+                metadata = yaml.safe_load(f) or {}
+        except (OSError, yaml.YAMLError) as e:
+            logger.error(f"{metadata_path} kann nicht gelesen werden: {e}")
+            continue
+
+        artwork = _first_existing(directory, ARTWORK_FILES)
+        high_res_file = _first_existing(directory, HIGH_RES_FILES)
+        mid_res_file = _first_existing(directory, MID_RES_FILES)
+        if artwork is None or not (high_res_file or mid_res_file):
+            logger.warning(f"Überspringe {directory}: Titelbild oder Internet-Video fehlt.")
+            continue
+
+        mediasets.append(Mediaset(
+            directory=directory,
+            relative_path=relative.as_posix() if relative.parts else directory.name,
+            metadata=metadata,
+            metadata_hash=hash_file(metadata_path),
+            artwork=artwork,
+            high_res_file=high_res_file or mid_res_file,
+            mid_res_file=mid_res_file or high_res_file,
+            renditions=[(name, directory / file_name) for name, file_name in HLS_RENDITIONS if (directory / file_name).is_file()],
+        ))
+    return mediasets
+
+def compute_inputs(mediaset: Mediaset, templates: str, base_url: str, with_hls: bool = False) -> Dict[str, Any]:
+    """
+    Ermittelt die Abhängigkeiten einer Freigabeseite: Metadaten, Titelbild und Vorlagen werden über ihren
+    Inhalt gehasht, Videos über Grösse und Änderungszeit (ein Hash über mehrere Gigabyte wäre zu teuer).
+    Mit HLS gehören auch alle verpackten Renditionen dazu.
+    """
+    videos = {}
+    hls_videos = {path for _, path in mediaset.renditions} if with_hls else set()
+    for video in {mediaset.high_res_file, mediaset.mid_res_file} | hls_videos:
+        stat = video.stat()
+        videos[video.name] = [stat.st_size, stat.st_mtime_ns]
+    return {
+        'metadata': mediaset.metadata_hash,
+        'artwork': hash_file(mediaset.artwork),
+        'templates': templates,
+        'base_url': base_url,
+        'videos': videos,
+        'hls': with_hls,
+    }
+
+def format_recording_date(metadata: Dict[str, Any]) -> str:
+    """Formatiert das Aufnahmedatum (Ereignis) bzw. den Zeitraum (Rückblick) für die Anzeige."""
+    recording_date = metadata.get("Aufnahmedatum")
+    if isinstance(recording_date, str):
+        try:
+            recording_date = datetime.strptime(recording_date, "%Y-%m-%d").date()
+        except ValueError:
+            return recording_date
+    if isinstance(recording_date, date):
+        return recording_date.strftime('%A, %-d. %B %Y')
+    return str(metadata.get("Zeitraum") or "")
+
+def link_or_copy(source: Path, target: Path):
+    """Legt einen Hardlink an; über Volumegrenzen hinweg wird kopiert."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+def write_text_atomic(path: Path, content: str):
+    """Schreibt eine Textdatei über eine temporäre Datei, damit nie eine halbe Datei sichtbar ist."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+def prepare_artwork(source: Path, target: Path):
+    """Übernimmt das Titelbild als JPEG; PNG-Dateien werden mit sips umgewandelt."""
+    if source.suffix.lower() in (".jpg", ".jpeg"):
+        link_or_copy(source, target)
+        return
+    subprocess.run(['sips', '-s', 'format', 'jpeg', str(source), '--out', str(target)], check=True, capture_output=True)
+
+def render_mediaset(
+    mediaset: Mediaset,
+    page_dir: Path,
+    base_url: str,
+    artwork_set: Optional[ArtworkSet] = None,
+    with_hls: bool = False,
+    asset_manifest: Optional[Dict[str, str]] = None
+):
+    """
+    Erstellt die Freigabeseite eines Mediensets mit Titelbild und Videos in `page_dir`.
+    Das OpenGraph-Bild und die Ableitungen des Titelbilds werden vorab für alle Seiten gemeinsam erstellt.
+    Mit `with_hls` werden die Renditionen zusätzlich als HLS verpackt; die MP4-Dateien bleiben als Rückfall erhalten.
+    Mit `asset_manifest` verweist die Seite auf die gemeinsamen CSS- und JavaScript-Dateien.
+    """
+    page_dir.mkdir(parents=True, exist_ok=True)
+    prepare_artwork(mediaset.artwork, page_dir / ARTWORK_FILE)
+
+    for video in {mediaset.high_res_file, mediaset.mid_res_file}:
+        link_or_copy(video, page_dir / video.name)
+
+    hls_playlist = None
+    if with_hls and mediaset.renditions:
+        hls_playlist = package_hls([(name, str(path)) for name, path in mediaset.renditions], str(page_dir))
+        if hls_playlist is None:
+            logger.warning(f"{mediaset.relative_path}: HLS-Verpackung fehlgeschlagen, die Seite verweist nur auf die MP4-Dateien.")
+
+    page_url = f"{base_url.rstrip('/')}/{mediaset.relative_path}" if base_url else ''
+    content = create_html.render_share_page(
+        html.escape(mediaset.title),
+        html.escape(str(mediaset.metadata.get("Beschreibung") or "")),
+        format_recording_date(mediaset.metadata),
+        mediaset.high_res_file.name,
+        mediaset.mid_res_file.name,
+        ARTWORK_FILE,
+        OG_IMAGE_FILE,
+        base_url=page_url,
+        artwork_set=artwork_set,
+        hls_playlist=hls_playlist,
+        assets=relative_assets(asset_manifest, mediaset.relative_path) if asset_manifest else None
+    )
+    write_text_atomic(page_dir / PAGE_FILE, content)
+
+def render_index_page(mediasets: List[Mediaset], asset_manifest: Optional[Dict[str, str]] = None) -> str:
+    """
+    Rendert die Übersichtsseite der Mediathek, gruppiert nach Jahr (absteigend) und Album.
+    """
+    index_style = '' if asset_manifest else f'<style>{INDEX_CSS}</style>'
+    by_year: Dict[str, List[Mediaset]] = {}
+    for mediaset in mediasets:
+        by_year.setdefault(mediaset.year, []).append(mediaset)
+
+    sections = []
+    for year in sorted(by_year, reverse=True):
+        by_album: Dict[str, List[Mediaset]] = {}
+        for mediaset in by_year[year]:
+            by_album.setdefault(mediaset.album, []).append(mediaset)
+        albums = []
+        for album in sorted(by_album):
+            items = "\n".join(
+                f'<li><a href="{html.escape(m.relative_path)}/{PAGE_FILE}">'
+                f'<img src="{html.escape(m.relative_path)}/{m.thumbnail}" alt="" loading="lazy">'
+                f'<span>{html.escape(m.title)}</span></a></li>'
+                for m in sorted(by_album[album], key=lambda m: str(m.metadata.get("Aufnahmedatum") or ""), reverse=True)
+            )
+            albums.append(f'<h3>{html.escape(album)}</h3>\n<ul class="index-list">\n{items}\n</ul>')
+        sections.append(f'<section>\n<h2>{html.escape(year)}</h2>\n' + "\n".join(albums) + '\n</section>')
+
+    return f'''<!DOCTYPE html>
+<html lang="de-CH">
+
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Kurmann Mediathek</title>
+    {create_html.stylesheet_html(asset_manifest)}
+    {index_style}
+</head>
+<body>
+    <h1>Kurmann Mediathek</h1>
+    <div class="container">
+    {"".join(sections)}
+    </div>
+    <footer>
+        &copy; {datetime.now().year} Kurmann Online-Mediathek von Patrick Kurmann. Alle Rechte vorbehalten.
+    </footer>
+</body>
+
+</html>
+'''
+
+def load_manifest(output_dir: Path) -> Dict[str, Any]:
+    """Liest das Manifest des letzten Builds (Abhängigkeiten pro Seite)."""
+    try:
+        with open(output_dir / MANIFEST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def is_site_build(directory: Path) -> bool:
+    """Prüft, ob ein Verzeichnis von `build_site` erstellt wurde (enthält das Build-Manifest)."""
+    return (directory / MANIFEST_FILE).is_file()
+
+def check_output_dir(output_dir: Path):
+    """
+    Stellt sicher, dass `output_dir` fehlt, ein symbolischer Link oder ein früherer Build ist. Ein anderes
+    Verzeichnis (z.B. die Mediathek selbst) würde beim Veröffentlichen ersetzt und gelöscht.
+
+    Raises:
+        FileExistsError: Wenn `output_dir` ein Verzeichnis oder eine Datei ist, die nicht von `build_site` stammt.
+    """
+    if output_dir.is_symlink() or not os.path.lexists(output_dir):
+        return
+    if not output_dir.is_dir() or not is_site_build(output_dir):
+        raise FileExistsError(
+            f"'{output_dir}' existiert bereits und ist kein Build von build-site ({MANIFEST_FILE} fehlt). "
+            f"Bitte ein leeres oder neues Ausgabeverzeichnis angeben."
+        )
+
+def publish_build(build_dir: Path, output_dir: Path):
+    """
+    Veröffentlicht einen fertigen Build. `output_dir` ist ein symbolischer Link auf das aktuelle Build-Verzeichnis
+    daneben. Umgeschaltet wird, indem ein temporärer Link mit os.replace über den bestehenden gelegt wird; Webserver
+    und Vorschau sehen so immer entweder den alten oder den neuen Build, nie einen fehlenden Pfad. Der vorherige
+    Build wird danach entfernt.
+
+    Ist `output_dir` noch ein echtes Verzeichnis (Build vor der Umstellung auf Links), wird es einmalig umbenannt
+    und ist bis zum Anlegen des Links kurz nicht erreichbar. Schlägt das fehl, erhält es seinen Namen zurück.
+    Andere Verzeichnisse werden nie angefasst (siehe `check_output_dir`); zeigt der Link auf etwas anderes als
+    einen Build daneben, wird nur der Link ersetzt.
+    """
+    check_output_dir(output_dir)
+    previous_build = None
+    migrated = False
+    if output_dir.is_symlink():
+        target = output_dir.parent / os.readlink(output_dir)
+        if (target.parent.resolve() == output_dir.parent.resolve() and target.name.startswith(f".{output_dir.name}.build-")
+                and is_site_build(target)):
+            previous_build = target
+    elif output_dir.exists():
+        previous_build = Path(tempfile.mkdtemp(prefix=f".{output_dir.name}.build-", dir=output_dir.parent))
+        previous_build.rmdir()
+        os.rename(output_dir, previous_build)
+        migrated = True
+
+    temp_link = output_dir.parent / f".{output_dir.name}.link-{os.getpid()}"
+    try:
+        if temp_link.is_symlink():
+            temp_link.unlink()
+        os.symlink(build_dir.name, temp_link)
+        os.replace(temp_link, output_dir)
+    except OSError:
+        if temp_link.is_symlink():
+            temp_link.unlink()
+        if migrated and not os.path.lexists(output_dir):
+            os.rename(previous_build, output_dir)
+        raise
+
+    if previous_build is not None and previous_build.resolve() != build_dir.resolve():
+        shutil.rmtree(previous_build, ignore_errors=True)
+
+def build_site(
+    library: Path,
+    output_dir: Path,
+    base_url: str = '',
+    workers: int = DEFAULT_SITE_WORKERS,
+    force: bool = False,
+    og_workers: int = DEFAULT_OG_WORKERS,
+    with_hls: bool = False,
+    precompress: bool = True
+) -> Tuple[int, int, int]:
+    """
+    Erstellt die statische Website für alle Mediensets einer Mediathek.
+
+    Der Build läuft in einem eigenen Verzeichnis neben dem Ausgabeverzeichnis. Seiten, deren Abhängigkeiten
+    sich seit dem letzten Build nicht geändert haben, werden per Hardlink aus dem bisherigen Build übernommen;
+    alle anderen werden parallel neu erstellt. Erst wenn alle Seiten fertig sind, wird der symbolische Link
+    `output_dir` atomar auf den neuen Build umgestellt (siehe `publish_build`). Mit `with_hls` werden die Videos zusätzlich als HLS verpackt.
+
+    CSS und JavaScript aller Seiten liegen als gemeinsame Dateien mit Inhaltshash unter `assets/`; mit
+    `precompress` werden alle Textdateien zusätzlich als .gz bzw. .br abgelegt.
+
+    Returns:
+        Tuple[int, int, int]: Anzahl neu erstellter, übernommener und fehlgeschlagener Seiten.
+
+    Raises:
+        FileExistsError: Wenn `output_dir` ein bestehendes Verzeichnis ist, das nicht von `build_site` stammt.
+    """
+    # Nur das Elternverzeichnis auflösen: `output_dir` selbst ist der Link auf den aktuellen Build
+    output_dir = output_dir.parent.resolve() / output_dir.name
+    check_output_dir(output_dir)
+    output_dir.parent.mkdir(parents=True, exist_ok=True)
+    previous_manifest = {} if force else load_manifest(output_dir)
+    previous_pages = previous_manifest.get('pages', {})
+    templates = template_hash()
+
+    mediasets = find_mediasets(library)
+    for mediaset in mediasets:
+        mediaset.inputs = compute_inputs(mediaset, templates, base_url, with_hls)
+
+    staging_dir = Path(tempfile.mkdtemp(prefix=f".{output_dir.name}.build-", dir=output_dir.parent))
+    # mkdtemp legt das Verzeichnis nur für den Besitzer lesbar an, der Webserver muss es aber lesen können
+    os.chmod(staging_dir, 0o755)
+    create_html.set_german_locale()
+    asset_manifest = write_assets(staging_dir, create_html.page_css() + INDEX_CSS, create_html.page_javascript())
+
+    def link_previous_page(mediaset: Mediaset):
+        # Neben den Dateien der Seite auch die HLS-Segmente; Unterverzeichnisse anderer Seiten bleiben aussen vor
+        previous_page_dir = output_dir / mediaset.relative_path
+        for path in chain(previous_page_dir.iterdir(), (previous_page_dir / hls.HLS_DIR).rglob("*")):
+            if path.is_file():
+                link_or_copy(path, staging_dir / mediaset.relative_path / path.relative_to(previous_page_dir))
+
+    pages: Dict[str, Any] = {}
+    to_render = []
+    for mediaset in mediasets:
+        unchanged = previous_pages.get(mediaset.relative_path) == mediaset.inputs
+        if unchanged and (output_dir / mediaset.relative_path / PAGE_FILE).is_file():
+            link_previous_page(mediaset)
+            pages[mediaset.relative_path] = mediaset.inputs
+        else:
+            to_render.append(mediaset)
+    reused = len(pages)
+
+    # OpenGraph-Bilder sind CPU-gebunden und entstehen gemeinsam in einem Prozesspool
+    og_jobs = []
+    for mediaset in to_render:
+        (staging_dir / mediaset.relative_path).mkdir(parents=True, exist_ok=True)
+        og_jobs.append((str(mediaset.artwork), str(staging_dir / mediaset.relative_path / OG_IMAGE_FILE)))
+    og_results = render_og_images(og_jobs, workers=og_workers)
+    artwork_sets = create_artwork_derivatives_batch(
+        [(str(mediaset.artwork), str(staging_dir / mediaset.relative_path)) for mediaset in to_render],
+        workers=og_workers
+    )
+
+    def render(mediaset: Mediaset) -> bool:
+        if not og_results.get(str(staging_dir / mediaset.relative_path / OG_IMAGE_FILE)):
+            return False
+        try:
+            page_dir = staging_dir / mediaset.relative_path
+            render_mediaset(mediaset, page_dir, base_url, artwork_sets.get(str(page_dir)), with_hls, asset_manifest)
+            logger.info(f"Seite für {mediaset.relative_path} erstellt.")
+            return True
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger.error(f"Seite für {mediaset.relative_path} konnte nicht erstellt werden: {e}")
+            return False
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="site") as pool:
+            results = list(pool.map(render, to_render))
+
+        failed = 0
+        for mediaset, success in zip(to_render, results):
+            if success:
+                pages[mediaset.relative_path] = mediaset.inputs
+                continue
+            failed += 1
+            # Bei einem Fehler bleibt die zuletzt veröffentlichte Seite bestehen
+            shutil.rmtree(staging_dir / mediaset.relative_path, ignore_errors=True)
+            if mediaset.relative_path in previous_pages and (output_dir / mediaset.relative_path / PAGE_FILE).is_file():
+                link_previous_page(mediaset)
+                pages[mediaset.relative_path] = previous_pages[mediaset.relative_path]
+
+        # Die Übersichtsseite hängt von den Metadaten aller veröffentlichten Mediensets ab
+        published = [mediaset for mediaset in mediasets if mediaset.relative_path in pages]
+        for mediaset in published:
+            thumbnail = derivative_file_name("Titelbild", DERIVATIVE_WIDTHS[0], "jpeg")
+            if (staging_dir / mediaset.relative_path / thumbnail).is_file():
+                mediaset.thumbnail = thumbnail
+        index_inputs = hashlib.sha256(json.dumps(
+            [templates] + [[m.relative_path, pages[m.relative_path]['metadata'], m.thumbnail] for m in published]
+        ).encode("utf-8")).hexdigest()
+        if previous_manifest.get('index') == index_inputs and (output_dir / PAGE_FILE).is_file():
+            for name in (PAGE_FILE, f"{PAGE_FILE}.gz", f"{PAGE_FILE}.br"):
+                if (output_dir / name).is_file():
+                    link_or_copy(output_dir / name, staging_dir / name)
+        else:
+            write_text_atomic(staging_dir / PAGE_FILE, render_index_page(published, asset_manifest))
+
+        manifest = {
+            'built_at': datetime.now().astimezone().isoformat(),
+            'templates': templates,
+            'index': index_inputs,
+            'pages': pages,
+        }
+        write_text_atomic(staging_dir / MANIFEST_FILE, json.dumps(manifest, ensure_ascii=False, indent=2))
+        if precompress:
+            compressed = precompress_tree(staging_dir, og_workers)
+            logger.info(f"{compressed} Datei(en) vorkomprimiert.")
+        publish_build(staging_dir, output_dir)
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    return len(to_render) - failed, reused, failed
@@ -3,6 +3,7 @@
 import typer
 from original_media_integrator.commands.import_by_created_date import import_by_created_date
 from original_media_integrator.commands.import_by_exif_creation_date import import_by_exif_creation_date
+from original_media_integrator.commands.dedupe_report import dedupe_report_command
 from config_manager.config_loader import load_app_env
 import logging
 
@@ -25,6 +26,7 @@ app = typer.Typer(help="Original Media Integrator")
 # Registriere die Commands direkt
 app.command(name="import-by-create-date")(import_by_created_date)
 app.command(name="import-by-exif-creation-date")(import_by_exif_creation_date)
+app.command(name="dedupe-report")(dedupe_report_command)
 
 if __name__ == "__main__":
     app()
\ No newline at end of file
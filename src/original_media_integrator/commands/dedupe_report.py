@@ -0,0 +1,49 @@
+# src/original_media_integrator/commands/dedupe_report.py
+
+import os
+import logging
+from pathlib import Path
+import typer
+from original_media_integrator.dedup_index import DEFAULT_DEDUP_DB_PATH, DedupIndex
+
+logger = logging.getLogger(__name__)
+
+def dedupe_report_command(
+    archive_dir: Path = typer.Argument(..., help="Pfad zum Archivverzeichnis der Originalmedien"),
+    dedup_db: Path = typer.Option(DEFAULT_DEDUP_DB_PATH, "--dedup-db", help="Pfad zur SQLite-Datenbank mit dem Duplikatindex")
+):
+    """
+    Listet Dateien mit identischem Inhalt im Archiv auf, unabhängig von ihrem Namen.
+
+    Der Duplikatindex wird zuerst mit dem Archivverzeichnis abgeglichen. Kandidaten werden über die Dateigrösse
+    gefunden und über einen Teilhash (erster und letzter MiB) sowie den vollen Hash bestätigt. Es werden keine
+    Dateien verändert oder gelöscht.
+    """
+    if not archive_dir.is_dir():
+        typer.secho(f"Das Archivverzeichnis {archive_dir} existiert nicht.", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+    index = DedupIndex(dedup_db)
+    try:
+        added, removed = index.scan(archive_dir)
+        logger.info(f"Duplikatindex abgeglichen: {added} Datei(en) aufgenommen, {removed} entfernt.")
+        groups = index.duplicates(archive_dir)
+    finally:
+        index.close()
+
+    if not groups:
+        typer.secho("Keine Duplikate gefunden.", fg=typer.colors.GREEN)
+        return
+
+    wasted = 0
+    for group in groups:
+        size = os.path.getsize(group[0])
+        wasted += size * (len(group) - 1)
+        typer.secho(f"{len(group)} identische Dateien ({size / (1024 * 1024):.2f} MiB):", fg=typer.colors.YELLOW)
+        for path in group:
+            typer.echo(f"  {path}")
+
+    typer.secho(
+        f"{len(groups)} Duplikatgruppe(n), {wasted / (1024 * 1024):.2f} MiB mehrfach belegt.",
+        fg=typer.colors.YELLOW
+    )
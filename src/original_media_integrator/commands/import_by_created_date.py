@@ -1,12 +1,15 @@
-import os
 import re
-import shutil
 import logging
-from datetime import datetime
 from pathlib import Path
 import typer
-from original_media_integrator.media_manager import remove_empty_directories
-from metadata_manager.exif import get_creation_datetime
+from original_media_integrator.date_resolution import resolve_dates
+from original_media_integrator.dedup_index import DEFAULT_DEDUP_DB_PATH, DedupIndex, record_imports
+from original_media_integrator.media_groups import move_groups
+from original_media_integrator.media_manager import (
+    iter_import_batches, remove_emptied_directories, scan_source_tree, unique_destination
+)
+from original_media_integrator.move_pipeline import DEFAULT_MOVE_WORKERS, DEFAULT_PER_DEVICE, METHOD_SKIPPED
+from original_media_integrator.stability import DEFAULT_SETTLE_SECONDS
 
 app = typer.Typer(help="Importiert Mediendateien basierend auf dem Dateinamen, EXIF-Datum oder File Created Date.")
 
@@ -20,7 +23,14 @@ logging.basicConfig(
 @app.command()
 def import_by_created_date(
     source_dir: Path = typer.Argument(..., help="Pfad zum Quellverzeichnis"),
-    destination_dir: Path = typer.Argument(..., help="Pfad zum Zielverzeichnis")
+    destination_dir: Path = typer.Argument(..., help="Pfad zum Zielverzeichnis"),
+    workers: int = typer.Option(DEFAULT_MOVE_WORKERS, "--workers", help="Maximale Anzahl gleichzeitiger Kopien über Gerätegrenzen"),
+    per_device: int = typer.Option(DEFAULT_PER_DEVICE, "--per-device", help="Maximale Anzahl gleichzeitiger Kopien pro Gerät"),
+    verify: bool = typer.Option(True, "--verify/--no-verify", help="Kopien vor dem Löschen der Quelle per Prüfsumme verifizieren"),
+    dedup: bool = typer.Option(True, "--dedup/--no-dedup", help="Bereits importierte Dateien (auch umbenannte) anhand ihres Inhalts überspringen"),
+    dedup_db: Path = typer.Option(DEFAULT_DEDUP_DB_PATH, "--dedup-db", help="Pfad zur SQLite-Datenbank mit dem Duplikatindex"),
+    settle_seconds: float = typer.Option(DEFAULT_SETTLE_SECONDS, "--settle-seconds", help="Ruhezeit in Sekunden, nach der eine Datei als fertig geschrieben gilt"),
+    reindex: bool = typer.Option(False, "--reindex", help="Duplikatindex vor dem Import mit dem Zielverzeichnis abgleichen (durchläuft das ganze Archiv)")
 ):
     """
     Importiert Mediendateien und organisiert sie in einer Verzeichnisstruktur: Jahr/Jahr-Monat/Jahr-Monat-Tag.
@@ -28,38 +38,46 @@ def import_by_created_date(
     - Relative Unterverzeichnisse aus der Quelle werden beibehalten.
     - Wenn ein Unterverzeichnis bereits ein Datum enthält, wird es nicht doppelt in der Zielstruktur erstellt.
     - Unterstützte Dateiformate: .mov, .mp4, .jpg, .jpeg, .png, .heif, .heic, .dng.
-    - Unterstützte Dateinamenformate: YYYY-MM-DD oder YYYY-MM-DD_hh-mm-ss.
+    - Unterstützte Dateinamenformate: YYYY-MM-DD, YYYY-MM-DD_hh-mm-ss sowie Kameranamen wie IMG_YYYYMMDD_hhmmss.
+    - Dateien ohne Datum im Namen werden stapelweise per EXIF gelesen, zuletzt gilt das Dateidatum.
     - Zielstruktur: /Zielverzeichnis/Jahr/Jahr-Monat/Jahr-Monat-Tag/relative/pfade/Datei.ext.
+    - Auf demselben Volume wird nur umbenannt. Von SD-Karte oder NAS wird parallel kopiert, per Prüfsumme
+      verifiziert und die Quelle erst danach gelöscht.
+    - Dateien, deren Inhalt bereits importiert wurde, werden übersprungen (Grösse, Teilhash, voller Hash).
+      Von Hand archivierte Dateien kennt der Index erst nach --reindex oder dedupe-report.
+    - Dateien, die noch geschrieben werden, werden abgewartet bzw. übersprungen und beim nächsten Lauf importiert.
+    - Begleitdateien (.AAE, .XMP, .LRF, .THM, .SRT, Video einer Live Photo) werden mit ihrer Hauptdatei verschoben.
+    - Bestehende Zieldateien werden nie überschrieben. Ist der Name mit anderem Inhalt belegt (z.B. Serienbilder
+      aus derselben Sekunde), erhält die Datei eine Nummer (-2, -3, ...).
     """
     source_dir = source_dir.resolve()
     destination_dir = destination_dir.resolve()
 
     logger.info(f"Starte Import von {source_dir} nach {destination_dir}")
 
-    for root, _, files in os.walk(source_dir):
-        for filename in files:
-            if filename.startswith('.') or not filename.lower().endswith(
-                ('.mov', '.mp4', '.jpg', '.jpeg', '.png', '.heif', '.heic', '.dng')
-            ):
-                logger.debug(f"Überspringe Datei {filename} aufgrund des Dateityps oder versteckter Datei.")
-                continue
-
-            source_file = Path(root) / filename
-
+    # Ein einziger Durchlauf: Mediendateien und Anzahl Einträge pro Verzeichnis für das spätere Aufräumen
+    tree = scan_source_tree(str(source_dir))
+
+    # Begleitdateien zur Hauptdatei gruppieren, laufende Kopien abwarten und Duplikate überspringen
+    dedup_index = DedupIndex(dedup_db) if dedup else None
+    # Gruppen werden verschoben, sobald ihre Dateien fertig geschrieben sind, statt auf alle zu warten
+    moved_sources = []
+    reserved = {}
+    for groups, fingerprints in iter_import_batches(tree.files, settle_seconds, dedup_index, str(destination_dir), reindex):
+        # 1. Datum aller Gruppen eines Durchgangs gemeinsam ermitteln (Präferenz: Dateiname > EXIF > File Created Date)
+        resolved_dates = resolve_dates([group.primary for group in groups])
+
+        planned = []
+        for group in groups:
+            source_file = Path(group.primary)
+            root, filename = source_file.parent, source_file.name
             try:
-                # 1. Datum extrahieren (Präferenz: Dateiname > EXIF > File Created Date)
-                date_match = re.match(r'(\d{4}-\d{2}-\d{2})(?:_(\d{2}-\d{2}-\d{2}))?', filename)
-                if date_match:
-                    date_str = date_match.group(1)
-                    creation_datetime = datetime.strptime(date_str, '%Y-%m-%d')
-                    logger.info(f"Extrahiere Datum {date_str} aus Dateinamen {filename}.")
-                else:
-                    # Fallback: Versuche EXIF-Daten zu lesen
-                    creation_datetime = get_creation_datetime(str(source_file))
-                    if not creation_datetime:
-                        logger.warning(f"EXIF-Datum nicht gefunden für {source_file}, verwende File Created Date.")
-                        creation_datetime = datetime.fromtimestamp(source_file.stat().st_ctime)
-                
+                resolved = resolved_dates.get(str(source_file))
+                if resolved is None:
+                    raise ValueError("Erstellungsdatum konnte nicht ermittelt werden.")
+                creation_datetime = resolved.timestamp
+                logger.debug(f"Datum {creation_datetime} für {filename} aus Quelle '{resolved.source}'.")
+
                 # 2. Zielverzeichnisstruktur erstellen (Jahr/Jahr-Monat/Jahr-Monat-Tag)
                 year = creation_datetime.strftime('%Y')
                 year_month = creation_datetime.strftime('%Y-%m')
@@ -78,24 +96,25 @@ def import_by_created_date(
                 # Kombiniere Datumsverzeichnis mit dem bereinigten relativen Pfad
                 date_path = destination_dir / year / year_month / year_month_day / relative_path
 
-                # Zielverzeichnis erstellen (falls nicht vorhanden)
-                date_path.mkdir(parents=True, exist_ok=True)
-
-                # 4. Zielpfad prüfen und Datei verschieben
-                destination_file = date_path / filename
-                if destination_file.exists():
-                    logger.warning(f"Datei {destination_file} existiert bereits, überspringe...")
-                    continue
-
-                logger.info(f"Verschiebe Datei {source_file} nach {destination_file}")
-                shutil.move(str(source_file), str(destination_file))
+                # Gleichnamige Dateien mit anderem Inhalt erhalten eine Nummer (-2, -3, ...)
+                planned.append((group, unique_destination(group.primary, str(date_path / filename), reserved)))
             except Exception as e:
                 logger.error(f"Fehler beim Verschieben von {source_file}: {e}")
                 typer.secho(f"Fehler beim Verschieben von {source_file}: {e}", fg=typer.colors.RED)
 
-    # Entferne leere Verzeichnisse im Eingangsverzeichnis
-    logger.info(f"Überprüfe auf leere Verzeichnisse in: {source_dir}")
-    remove_empty_directories(source_dir)
+        # 4. Verschieben: auf demselben Gerät umbenennen, sonst verifiziert kopieren; bestehende Ziele werden übersprungen
+        results = move_groups(planned, workers=workers, per_device=per_device, verify=verify)
+        for result in results:
+            if result.error and result.method != METHOD_SKIPPED:
+                typer.secho(f"Fehler beim Verschieben von {result.source}: {result.error}", fg=typer.colors.RED)
+        record_imports(dedup_index, [(result.source, result.destination) for result in results if result.ok], fingerprints)
+        moved_sources.extend(result.source for result in results if result.ok)
+
+    if dedup_index:
+        dedup_index.close()
+
+    # Entferne leer gewordene Verzeichnisse im Eingangsverzeichnis, ohne es erneut zu durchlaufen
+    remove_emptied_directories(tree, moved_sources)
 
     typer.secho("Import abgeschlossen.", fg=typer.colors.GREEN)
     logger.info("Import abgeschlossen.")
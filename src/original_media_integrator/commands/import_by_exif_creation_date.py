@@ -1,6 +1,8 @@
 import typer
 from pathlib import Path
+from original_media_integrator.dedup_index import DEFAULT_DEDUP_DB_PATH, DedupIndex
 from original_media_integrator.media_manager import organize_media_files
+from original_media_integrator.stability import DEFAULT_SETTLE_SECONDS
 import logging
 
 app = typer.Typer(help="Importiert Mediendateien basierend auf EXIF Creation Date")
@@ -19,6 +21,10 @@ def import_by_exif_creation_date(
     base_source_dir: Path = typer.Option(
         None, help="Wurzelverzeichnis zur Berechnung des relativen Pfads. Standard: source_dir"
     ),
+    dedup: bool = typer.Option(True, "--dedup/--no-dedup", help="Bereits importierte Dateien (auch umbenannte) anhand ihres Inhalts überspringen"),
+    dedup_db: Path = typer.Option(DEFAULT_DEDUP_DB_PATH, "--dedup-db", help="Pfad zur SQLite-Datenbank mit dem Duplikatindex"),
+    settle_seconds: float = typer.Option(DEFAULT_SETTLE_SECONDS, "--settle-seconds", help="Ruhezeit in Sekunden, nach der eine Datei als fertig geschrieben gilt"),
+    reindex: bool = typer.Option(False, "--reindex", help="Duplikatindex vor dem Import mit dem Zielverzeichnis abgleichen (durchläuft das ganze Archiv)"),
 ):
     """
     Importiert Mediendateien basierend auf dem EXIF-Erstellungsdatum (CreationDate).
@@ -26,6 +32,8 @@ def import_by_exif_creation_date(
     - Beibehaltung der relativen Unterverzeichnisstruktur des Quellverzeichnisses.
     - Organisation der Dateien nach Jahr/Monat/Tag basierend auf EXIF-Daten.
     - Unterstützt Videodateien (z. B. MOV, MP4) und Bilddateien (z. B. JPG, PNG).
+    - Überspringt Dateien, deren Inhalt bereits importiert wurde, auch wenn sie umbenannt wurden.
+      Von Hand archivierte Dateien kennt der Index erst nach --reindex oder dedupe-report.
 
     Beispiel:
         python -m original_media_integrator import-by-exif-creation-date /source /destination
@@ -36,7 +44,10 @@ def import_by_exif_creation_date(
         base_source_dir = base_source_dir.resolve() if base_source_dir else None
 
         logger.info(f"Importiere Medien von {source_dir} nach {destination_dir}")
-        organize_media_files(str(source_dir), str(destination_dir), str(base_source_dir))
+        dedup_index = DedupIndex(dedup_db) if dedup else None
+        organize_media_files(str(source_dir), str(destination_dir), str(base_source_dir) if base_source_dir else None, dedup_index, settle_seconds, reindex)
+        if dedup_index:
+            dedup_index.close()
         typer.secho("Import abgeschlossen.", fg=typer.colors.GREEN)
     except Exception as e:
         logger.error(f"Fehler beim Importieren: {e}")
@@ -0,0 +1,226 @@
+# src/original_media_integrator/date_resolution.py
+
+import json
+import os
+import re
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+import logging
+from metadata_manager.exif import CREATION_DATE_TAGS, VIDEO_EXTENSIONS, parse_creation_datetime
+
+try:
+    from PIL import Image
+except ImportError:  # Ohne Pillow werden auch JPEG-Dateien über exiftool gelesen
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Herkunft eines ermittelten Datums
+SOURCE_FILENAME = "filename"
+SOURCE_EXIF = "exif"
+SOURCE_STAT = "stat"
+
+# Anzahl Dateien pro exiftool-Aufruf und parallele Aufrufe; 20'000 Dateien ergeben so 10 Aufrufe
+DEFAULT_BATCH_SIZE = 2000
+DEFAULT_EXIFTOOL_WORKERS = 4
+
+# JPEG-Dateien werden direkt mit Pillow gelesen (nur der EXIF-Block, ohne Dekodieren des Bildes)
+NATIVE_EXTENSIONS = {'.jpg', '.jpeg'}
+EXIF_IFD = 0x8769
+DATETIME_ORIGINAL_TAG = 0x9003
+OFFSET_TIME_ORIGINAL_TAG = 0x9011
+
+# Datumsmuster in Dateinamen mit Uhrzeit, in absteigender Priorität
+DATETIME_PATTERNS = [
+    # Eigene Benennung nach dem Import, z.B. 2024-05-01_143000+0200.jpg
+    re.compile(r"(?<!\d)(\d{4})-(\d{2})-(\d{2})_(\d{2})(\d{2})(\d{2})([+-]\d{4})?(?!\d)"),
+    # z.B. 2024-05-01_14-30-00.mov
+    re.compile(r"(?<!\d)(\d{4})-(\d{2})-(\d{2})_(\d{2})-(\d{2})-(\d{2})(?!\d)"),
+    # Kamera- und Telefonnamen, z.B. IMG_20240501_143000.jpg, PXL_20240501_143000123.jpg, DJI_20240501143000_0001.MP4
+    re.compile(r"(?<!\d)((?:19|20)\d{2})(\d{2})(\d{2})[_-]?(\d{2})(\d{2})(\d{2})"),
+]
+# Nur ein Datum, z.B. 2024-05-01 Ausflug.mov
+DATE_PATTERN = re.compile(r"(?<!\d)(\d{4})-(\d{2})-(\d{2})(?!\d)")
+
+@dataclass
+class ResolvedDate:
+    """Ermitteltes Aufnahmedatum einer Datei und seine Herkunft (Dateiname, EXIF oder Dateisystem)."""
+    timestamp: datetime
+    source: str
+    has_time: bool = True
+
+def _parse_offset(offset: str) -> timezone:
+    sign = -1 if offset[0] == "-" else 1
+    return timezone(sign * timedelta(hours=int(offset[1:3]), minutes=int(offset[3:5])))
+
+def date_from_filename(file_name: str) -> Optional[ResolvedDate]:
+    """
+    Liest ein im Dateinamen kodiertes Datum, ohne auf die Datei zuzugreifen.
+
+    Returns:
+        ResolvedDate | None: Datum mit Uhrzeit (has_time=True), nur Datum (has_time=False) oder None.
+    """
+    for pattern in DATETIME_PATTERNS:
+        for match in pattern.finditer(file_name):
+            groups = match.groups()
+            try:
+                timestamp = datetime(*(int(value) for value in groups[:6]))
+            except ValueError:
+                continue
+            if len(groups) > 6 and groups[6]:
+                timestamp = timestamp.replace(tzinfo=_parse_offset(groups[6]))
+            return ResolvedDate(timestamp, SOURCE_FILENAME)
+
+    for match in DATE_PATTERN.finditer(file_name):
+        try:
+            return ResolvedDate(datetime(*(int(value) for value in match.groups())), SOURCE_FILENAME, has_time=False)
+        except ValueError:
+            continue
+    return None
+
+def _read_native(file_path: str) -> Optional[datetime]:
+    """Liest DateTimeOriginal und OffsetTimeOriginal einer JPEG-Datei mit Pillow."""
+    try:
+        with Image.open(file_path) as image:
+            exif_ifd = image.getexif().get_ifd(EXIF_IFD)
+    except Exception as e:
+        logger.debug(f"EXIF von {file_path} konnte nicht direkt gelesen werden: {e}")
+        return None
+    entry = {
+        "DateTimeOriginal": exif_ifd.get(DATETIME_ORIGINAL_TAG),
+        "OffsetTimeOriginal": exif_ifd.get(OFFSET_TIME_ORIGINAL_TAG),
+    }
+    return parse_creation_datetime(entry, is_video=False)
+
+def _read_exiftool_batch(file_paths: List[str]) -> Dict[str, Optional[datetime]]:
+    """
+    Liest die Datums-Tags vieler Dateien mit einem einzigen exiftool-Aufruf. Die Pfade werden über eine
+    Argumentdatei übergeben, damit die maximale Länge der Kommandozeile keine Rolle spielt.
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".args", encoding="utf-8", delete=False) as argfile:
+        argfile.write("\n".join(file_paths) + "\n")
+    try:
+        cmd = ['exiftool', '-json', '-fast2', '-charset', 'filename=UTF8'] + CREATION_DATE_TAGS + ['-@', argfile.name]
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    finally:
+        os.remove(argfile.name)
+
+    # exiftool endet auch mit Fehlercode, wenn einzelne Dateien nicht lesbar sind; die übrigen sind trotzdem gültig
+    try:
+        entries = json.loads(result.stdout) if result.stdout.strip() else []
+    except json.JSONDecodeError:
+        logger.error(f"Ungültige JSON-Ausgabe von exiftool: {result.stderr.strip()}")
+        entries = []
+
+    dates: Dict[str, Optional[datetime]] = {}
+    for entry in entries:
+        source_file = entry.get("SourceFile")
+        is_video = os.path.splitext(source_file or "")[1].lower() in VIDEO_EXTENSIONS
+        dates[source_file] = parse_creation_datetime(entry, is_video)
+    return dates
+
+def date_from_stat(file_path: str) -> Optional[datetime]:
+    """Erstellungsdatum der Datei aus dem Dateisystem (macOS: Birth Time, sonst Änderungsdatum)."""
+    try:
+        stat = os.stat(file_path)
+    except OSError as e:
+        logger.error(f"Dateidatum von {file_path} kann nicht gelesen werden: {e}")
+        return None
+    timestamp = getattr(stat, "st_birthtime", None) or stat.st_mtime
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).astimezone()
+
+def _chunks(items: List[str], size: int) -> List[List[str]]:
+    return [items[index:index + size] for index in range(0, len(items), size)]
+
+def resolve_dates(
+    file_paths: Iterable[str],
+    require_time: bool = False,
+    prefer_metadata: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = DEFAULT_EXIFTOOL_WORKERS
+) -> Dict[str, ResolvedDate]:
+    """
+    Ermittelt das Aufnahmedatum vieler Dateien auf einmal.
+
+    1. Im Dateinamen kodierte Daten (ohne Dateizugriff).
+    2. EXIF/QuickTime-Metadaten der übrigen Dateien: JPEG direkt mit Pillow, alle anderen stapelweise mit
+       wenigen parallelen exiftool-Aufrufen.
+    3. Erst zuletzt das Datum aus dem Dateisystem.
+
+    Mit `prefer_metadata` werden die Metadaten aller Dateien zuerst gelesen und der Dateiname dient nur als
+    Rückfall. Zeiten aus Dateinamen haben keine Zeitzone und sind je nach Gerät Lokalzeit oder UTC
+    (z.B. Pixel `PXL_…`), die Metadaten enthalten dagegen meist den Offset.
+
+    Args:
+        file_paths: Die Dateien.
+        require_time (bool): Ein Dateiname mit Datum ohne Uhrzeit genügt nicht; die Metadaten haben dann Vorrang
+            und das Datum aus dem Dateinamen dient nur noch als Rückfall vor dem Dateisystem.
+        prefer_metadata (bool): Metadaten haben immer Vorrang vor dem Dateinamen, auch mit Uhrzeit.
+        batch_size (int): Anzahl Dateien pro exiftool-Aufruf.
+        workers (int): Anzahl paralleler exiftool-Aufrufe.
+
+    Returns:
+        Dict[str, ResolvedDate]: Datum und Herkunft pro Datei. Dateien ohne jedes Datum fehlen.
+    """
+    resolved: Dict[str, ResolvedDate] = {}
+    name_fallback: Dict[str, ResolvedDate] = {}
+    pending: List[str] = []
+
+    for file_path in file_paths:
+        from_name = date_from_filename(os.path.basename(file_path))
+        if from_name and not prefer_metadata and (from_name.has_time or not require_time):
+            resolved[file_path] = from_name
+            continue
+        if from_name:
+            name_fallback[file_path] = from_name
+        pending.append(file_path)
+
+    # JPEG-Dateien ohne Unterprozess lesen
+    batch_paths: List[str] = []
+    for file_path in pending:
+        if Image is not None and os.path.splitext(file_path)[1].lower() in NATIVE_EXTENSIONS:
+            timestamp = _read_native(file_path)
+            if timestamp:
+                resolved[file_path] = ResolvedDate(timestamp, SOURCE_EXIF)
+                continue
+        batch_paths.append(file_path)
+
+    batches = _chunks(batch_paths, max(1, batch_size))
+    if batches:
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches))), thread_name_prefix="exiftool") as pool:
+                for dates in pool.map(_read_exiftool_batch, batches):
+                    for file_path, timestamp in dates.items():
+                        if timestamp:
+                            resolved[file_path] = ResolvedDate(timestamp, SOURCE_EXIF)
+        except FileNotFoundError:
+            logger.error("exiftool wurde nicht gefunden, es werden nur Dateinamen und Dateidaten verwendet.")
+
+    for file_path in pending:
+        if file_path in resolved:
+            continue
+        if file_path in name_fallback:
+            resolved[file_path] = name_fallback[file_path]
+            continue
+        timestamp = date_from_stat(file_path)
+        if timestamp:
+            resolved[file_path] = ResolvedDate(timestamp, SOURCE_STAT)
+
+    counts = summarize_sources(resolved)
+    logger.info(
+        f"Datum für {len(resolved)} Datei(en) ermittelt: {counts.get(SOURCE_FILENAME, 0)} aus dem Dateinamen, "
+        f"{counts.get(SOURCE_EXIF, 0)} aus EXIF, {counts.get(SOURCE_STAT, 0)} aus dem Dateisystem "
+        f"({len(batches)} exiftool-Aufruf(e))."
+    )
+    return resolved
+
+def summarize_sources(resolved: Dict[str, ResolvedDate]) -> Dict[str, int]:
+    """Zählt die ermittelten Daten pro Herkunft."""
+    counts: Dict[str, int] = {}
+    for resolved_date in resolved.values():
+        counts[resolved_date.source] = counts.get(resolved_date.source, 0) + 1
+    return counts
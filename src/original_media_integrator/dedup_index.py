@@ -0,0 +1,282 @@
+# src/original_media_integrator/dedup_index.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+from original_media_integrator.file_utils import MEDIA_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEDUP_DB_PATH = Path.home() / "Library/Application Support/Kurmann/Videoschnitt/original_media_integrator.sqlite"
+
+# Für den Teilhash werden der erste und der letzte MiB gelesen
+PARTIAL_CHUNK = 1024 * 1024
+HASH_CHUNK = 8 * 1024 * 1024
+
+def is_indexed_file(file_path: str) -> bool:
+    """Nur sichtbare Mediendateien kommen in den Index; Begleitdateien (.AAE, .XMP, .LRF, ...) nicht."""
+    name = os.path.basename(file_path)
+    return not name.startswith('.') and name.lower().endswith(MEDIA_EXTENSIONS)
+
+@dataclass
+class Fingerprint:
+    """Grösse und (bei Bedarf berechnete) Hashes einer Datei."""
+    size: int
+    partial_hash: Optional[str] = None
+    full_hash: Optional[str] = None
+
+def compute_partial_hash(file_path: str, size: int) -> str:
+    """Hash über Grösse, ersten und letzten MiB. Kleine Dateien werden vollständig gehasht."""
+    digest = hashlib.sha256(str(size).encode("ascii"))
+    with open(file_path, "rb") as f:
+        if size <= 2 * PARTIAL_CHUNK:
+            digest.update(f.read())
+        else:
+            digest.update(f.read(PARTIAL_CHUNK))
+            f.seek(-PARTIAL_CHUNK, os.SEEK_END)
+            digest.update(f.read(PARTIAL_CHUNK))
+    return digest.hexdigest()
+
+def compute_full_hash(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class DedupIndex:
+    """
+    Persistenter Index der importierten Originale in einer SQLite-Datenbank.
+
+    Dateien werden über ihre Grösse gefunden (indiziert, ohne Dateizugriff). Erst wenn die Grösse übereinstimmt,
+    wird ein Teilhash über den ersten und letzten MiB berechnet, und nur bei gleichem Teilhash der volle Hash.
+    Hashes der archivierten Dateien werden bei Bedarf nachberechnet und gespeichert. Umbenannte Dateien
+    werden so ebenfalls als Duplikate erkannt.
+    """
+
+    def __init__(self, db_path: Path = DEFAULT_DEDUP_DB_PATH):
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(str(db_path), check_same_thread=False)
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS originals (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    partial_hash TEXT,
+                    full_hash TEXT,
+                    indexed_at TEXT NOT NULL
+                )
+                """
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS originals_size ON originals (size, partial_hash)")
+
+    def close(self):
+        """Schliesst die Datenbankverbindung."""
+        with self._lock:
+            self._connection.close()
+
+    def add(self, file_path: str, fingerprint: Optional[Fingerprint] = None):
+        """Nimmt eine (archivierte) Datei in den Index auf. Bereits bekannte Hashes werden mitgespeichert."""
+        stat = os.stat(file_path)
+        fingerprint = fingerprint or Fingerprint(stat.st_size)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO originals (path, size, mtime_ns, partial_hash, full_hash, indexed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, fingerprint.partial_hash,
+                 fingerprint.full_hash, datetime.now().astimezone().isoformat())
+            )
+
+    def remove(self, file_path: str):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM originals WHERE path = ?", (os.path.abspath(file_path),))
+
+    def _stored_hash(self, path: str, column: str) -> Optional[str]:
+        """
+        Liefert den gespeicherten Teil- bzw. vollen Hash einer archivierten Datei und berechnet ihn bei Bedarf.
+        Existiert die Datei nicht mehr oder hat sie sich verändert, wird sie aus dem Index entfernt bzw. aktualisiert.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT size, mtime_ns, {column} FROM originals WHERE path = ?", (path,)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.remove(path)
+            return None
+        size, mtime_ns, stored = row
+        if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+            self.add(path)
+            stored = None
+        if stored:
+            return stored
+
+        value = compute_partial_hash(path, stat.st_size) if column == "partial_hash" else compute_full_hash(path)
+        with self._lock, self._connection:
+            self._connection.execute(f"UPDATE originals SET {column} = ? WHERE path = ?", (value, path))
+        return value
+
+    def find_duplicate(self, file_path: str) -> Tuple[Optional[str], Fingerprint]:
+        """
+        Sucht eine archivierte Datei mit identischem Inhalt.
+
+        Returns:
+            Tuple[str | None, Fingerprint]: Pfad des Duplikats (oder None) und der Fingerprint der geprüften Datei,
+            damit dessen Hashes beim Aufnehmen in den Index wiederverwendet werden können.
+        """
+        source_path = os.path.abspath(file_path)
+        fingerprint = Fingerprint(os.path.getsize(file_path))
+        with self._lock:
+            candidates = [row[0] for row in self._connection.execute(
+                "SELECT path FROM originals WHERE size = ? AND path != ?", (fingerprint.size, source_path)
+            )]
+        if not candidates:
+            return None, fingerprint
+
+        fingerprint.partial_hash = compute_partial_hash(file_path, fingerprint.size)
+        candidates = [path for path in candidates if self._stored_hash(path, "partial_hash") == fingerprint.partial_hash]
+        if not candidates:
+            return None, fingerprint
+
+        fingerprint.full_hash = compute_full_hash(file_path)
+        for path in candidates:
+            if self._stored_hash(path, "full_hash") == fingerprint.full_hash:
+                return path, fingerprint
+        return None, fingerprint
+
+    def scan(self, root: Path) -> Tuple[int, int]:
+        """
+        Gleicht den Index mit einem Archivverzeichnis ab: neue oder veränderte Mediendateien werden aufgenommen
+        (ohne Hash), nicht mehr vorhandene entfernt. Nicht lesbare Einträge (z.B. defekte Links) werden übersprungen.
+
+        Returns:
+            Tuple[int, int]: Anzahl aufgenommener und entfernter Einträge.
+        """
+        root_path = os.path.abspath(root)
+        with self._lock:
+            known = {
+                path: (size, mtime_ns) for path, size, mtime_ns in self._connection.execute(
+                    "SELECT path, size, mtime_ns FROM originals WHERE path LIKE ? ESCAPE '\\'",
+                    (_like_prefix(root_path),)
+                )
+            }
+
+        indexed_at = datetime.now().astimezone().isoformat()
+        rows = []
+        seen = set()
+        for directory, _, files in os.walk(root_path):
+            for name in files:
+                path = os.path.join(directory, name)
+                if not is_indexed_file(path):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError as e:
+                    # Defekte Links oder während des Durchlaufs gelöschte Dateien
+                    logger.debug(f"Überspringe {path}: {e}")
+                    continue
+                seen.add(path)
+                if known.get(path) != (stat.st_size, stat.st_mtime_ns):
+                    rows.append((path, stat.st_size, stat.st_mtime_ns, indexed_at))
+
+        removed = [path for path in known if path not in seen]
+        # Alle Änderungen in einer Transaktion
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO originals (path, size, mtime_ns, indexed_at) VALUES (?, ?, ?, ?)", rows
+            )
+            self._connection.executemany("DELETE FROM originals WHERE path = ?", [(path,) for path in removed])
+        return len(rows), len(removed)
+
+    def duplicates(self, root: Optional[Path] = None) -> List[List[str]]:
+        """
+        Findet Gruppen identischer Dateien im Index (optional nur unterhalb von `root`).
+        Gleiche Grösse grenzt ein, Teil- und voller Hash bestätigen.
+
+        Returns:
+            List[List[str]]: Gruppen von Pfaden mit identischem Inhalt.
+        """
+        prefix = _like_prefix(os.path.abspath(root)) if root else "%"
+        with self._lock:
+            sizes = [row[0] for row in self._connection.execute(
+                "SELECT size FROM originals WHERE path LIKE ? ESCAPE '\\' GROUP BY size HAVING COUNT(*) > 1", (prefix,)
+            )]
+
+        groups: List[List[str]] = []
+        for size in sizes:
+            with self._lock:
+                paths = [row[0] for row in self._connection.execute(
+                    "SELECT path FROM originals WHERE size = ? AND path LIKE ? ESCAPE '\\' ORDER BY path", (size, prefix)
+                )]
+            for partial_group in _group_by(paths, lambda path: self._stored_hash(path, "partial_hash")):
+                groups.extend(_group_by(partial_group, lambda path: self._stored_hash(path, "full_hash")))
+        return groups
+
+def _like_prefix(directory: str) -> str:
+    escaped = directory.rstrip(os.sep).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + os.sep + "%"
+
+def _group_by(paths: List[str], key) -> List[List[str]]:
+    """Gruppiert Pfade nach einem Schlüssel und behält nur Gruppen mit mehr als einem Eintrag."""
+    buckets: Dict[str, List[str]] = {}
+    for path in paths:
+        value = key(path)
+        if value is not None:
+            buckets.setdefault(value, []).append(path)
+    return [group for group in buckets.values() if len(group) > 1]
+
+def skip_duplicates(index: Optional[DedupIndex], file_paths: List[str]) -> Tuple[List[str], Dict[str, Fingerprint]]:
+    """
+    Filtert Dateien heraus, deren Inhalt bereits im Archiv liegt. Die Quelldateien bleiben unverändert liegen.
+
+    Returns:
+        Tuple[List[str], Dict[str, Fingerprint]]: Die zu importierenden Dateien und ihre Fingerprints.
+    """
+    if index is None:
+        return list(file_paths), {}
+
+    remaining = []
+    fingerprints: Dict[str, Fingerprint] = {}
+    for file_path in file_paths:
+        try:
+            duplicate, fingerprint = index.find_duplicate(file_path)
+        except OSError as e:
+            logger.error(f"Duplikatprüfung für {file_path} fehlgeschlagen: {e}")
+            remaining.append(file_path)
+            continue
+        if duplicate:
+            logger.info(f"Überspringe {file_path}: bereits importiert als {duplicate}.")
+            continue
+        remaining.append(file_path)
+        fingerprints[file_path] = fingerprint
+    if len(remaining) < len(file_paths):
+        logger.info(f"{len(file_paths) - len(remaining)} Duplikat(e) übersprungen.")
+    return remaining, fingerprints
+
+def record_imports(index: Optional[DedupIndex], moved: List[Tuple[str, str]], fingerprints: Dict[str, Fingerprint]):
+    """
+    Nimmt die importierten Dateien (Paare aus Quelle und Ziel) mit den bereits berechneten Hashes in den Index auf.
+    Begleitdateien werden wie bei `DedupIndex.scan` ausgelassen.
+    """
+    if index is None:
+        return
+    for source, destination in moved:
+        if not is_indexed_file(destination):
+            continue
+        try:
+            index.add(destination, fingerprints.get(source))
+        except OSError as e:
+            logger.error(f"{destination} konnte nicht in den Duplikatindex aufgenommen werden: {e}")
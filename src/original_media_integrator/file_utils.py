@@ -1,11 +1,7 @@
 # original_media_integrator/file_utils.py
 
-import os
+# Dateiendungen der importierten Originale
+MEDIA_EXTENSIONS = ('.mov', '.mp4', '.jpg', '.jpeg', '.png', '.heif', '.heic', '.dng')
 
-def is_file_in_use(filepath: str) -> bool:
-    """Überprüft, ob eine Datei in Verwendung ist."""
-    try:
-        os.rename(filepath, filepath)  # Versuch, die Datei umzubenennen, um sicherzustellen, dass sie nicht in Verwendung ist.
-        return False
-    except OSError:
-        return True
\ No newline at end of file
+# Begleitdateien, die mit ihrer Hauptdatei importiert werden (iPhone-Bearbeitungen, XMP, DJI-Proxies und -Vorschaubilder, Telemetrie)
+SIDECAR_EXTENSIONS = ('.aae', '.xmp', '.lrf', '.thm', '.srt')
@@ -0,0 +1,120 @@
+# src/original_media_integrator/media_groups.py
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+import logging
+from original_media_integrator.file_utils import SIDECAR_EXTENSIONS
+from original_media_integrator.move_pipeline import MoveResult, move_files
+
+logger = logging.getLogger(__name__)
+
+# Live Photos: Bild und gleichnamiges Video gehören zusammen, das Bild ist die Hauptdatei
+LIVE_PHOTO_IMAGE_EXTENSIONS = ('.heic', '.heif', '.jpg', '.jpeg')
+LIVE_PHOTO_VIDEO_EXTENSIONS = ('.mov',)
+
+@dataclass
+class MediaGroup:
+    """Eine Hauptdatei mit ihren Begleitdateien (Sidecars wie .AAE/.XMP/.LRF, Video einer Live Photo)."""
+    primary: str
+    companions: List[str] = field(default_factory=list)
+
+    @property
+    def files(self) -> List[str]:
+        return [self.primary] + self.companions
+
+def _is_sidecar(name: str) -> bool:
+    return name.lower().endswith(SIDECAR_EXTENSIONS)
+
+def group_media_files(file_paths: Iterable[str]) -> List[MediaGroup]:
+    """
+    Ordnet Begleitdateien ihrer Hauptdatei zu. Jedes Verzeichnis wird dafür einmal nach Dateistamm indexiert.
+
+    - Sidecars (.AAE, .XMP, .LRF, .THM, .SRT) gehören zur Datei mit demselben Stamm; XMP-Dateien der Form
+      `IMG_0001.DNG.xmp` zur Datei mit dem vollständigen Namen.
+    - Das .MOV einer Live Photo gehört zum gleichnamigen Bild.
+    - Sidecars ohne Hauptdatei bleiben liegen.
+
+    Returns:
+        List[MediaGroup]: Eine Gruppe pro Hauptdatei, in der Reihenfolge der Eingabe.
+    """
+    by_directory: Dict[str, List[str]] = {}
+    for file_path in file_paths:
+        by_directory.setdefault(os.path.dirname(file_path), []).append(os.path.basename(file_path))
+
+    groups: List[MediaGroup] = []
+    for directory, names in by_directory.items():
+        media = [name for name in names if not _is_sidecar(name)]
+        images_by_stem = {
+            os.path.splitext(name)[0].lower(): name for name in media if name.lower().endswith(LIVE_PHOTO_IMAGE_EXTENSIONS)
+        }
+
+        by_stem: Dict[str, MediaGroup] = {}
+        by_name: Dict[str, MediaGroup] = {}
+        live_videos: List[Tuple[str, str]] = []
+        for name in media:
+            stem = os.path.splitext(name)[0].lower()
+            if name.lower().endswith(LIVE_PHOTO_VIDEO_EXTENSIONS) and stem in images_by_stem:
+                live_videos.append((stem, name))
+                continue
+            group = MediaGroup(os.path.join(directory, name))
+            groups.append(group)
+            by_name[name.lower()] = group
+            # Bei gleichem Stamm (z.B. RAW und JPEG) erhält die erste Datei die Sidecars
+            by_stem.setdefault(stem, group)
+
+        for stem, name in live_videos:
+            by_stem[stem].companions.append(os.path.join(directory, name))
+
+        for name in names:
+            if not _is_sidecar(name):
+                continue
+            stem = os.path.splitext(name)[0].lower()
+            group = by_name.get(stem) or by_stem.get(stem)
+            if group is None:
+                logger.debug(f"Keine Hauptdatei für {os.path.join(directory, name)} gefunden, bleibt liegen.")
+                continue
+            group.companions.append(os.path.join(directory, name))
+    return groups
+
+def companion_destination(primary: str, primary_destination: str, companion: str) -> str:
+    """
+    Zielpfad einer Begleitdatei: neben der Hauptdatei und mit deren neuem Namen, z.B.
+    IMG_0001.AAE → 2024-05-01_143000+0200.aae, IMG_0001.DNG.xmp → 2024-05-01_143000+0200.dng.xmp.
+    Wurde die Dateiendung der Hauptdatei kleingeschrieben, gilt das auch für die Begleitdatei.
+    """
+    primary_name = os.path.basename(primary)
+    companion_name = os.path.basename(companion)
+    if companion_name.lower().startswith(primary_name.lower() + "."):
+        base, suffix = primary_destination, companion_name[len(primary_name):]
+    else:
+        base, suffix = os.path.splitext(primary_destination)[0], companion_name[len(os.path.splitext(primary_name)[0]):]
+    if os.path.splitext(primary_destination)[1] != os.path.splitext(primary)[1]:
+        suffix = suffix.lower()
+    return base + suffix
+
+def move_groups(planned: List[Tuple[MediaGroup, str]], **kwargs) -> List[MoveResult]:
+    """
+    Verschiebt Gruppen als Einheit: zuerst alle Hauptdateien, danach die Begleitdateien der erfolgreich
+    verschobenen Hauptdateien. Schlägt die Hauptdatei fehl, bleibt die ganze Gruppe liegen.
+
+    Args:
+        planned: Paare aus Gruppe und Zielpfad der Hauptdatei.
+        **kwargs: Weitere Argumente für `move_files`.
+
+    Returns:
+        List[MoveResult]: Ergebnisse der Hauptdateien, gefolgt von denen der Begleitdateien.
+    """
+    results = move_files([(group.primary, destination) for group, destination in planned], **kwargs)
+
+    companion_moves = []
+    for (group, destination), result in zip(planned, results):
+        if result.ok:
+            companion_moves.extend(
+                (companion, companion_destination(group.primary, destination, companion)) for companion in group.companions
+            )
+        elif group.companions:
+            logger.warning(f"Begleitdateien von {group.primary} bleiben liegen: {', '.join(group.companions)}")
+    if companion_moves:
+        results += move_files(companion_moves, **kwargs)
+    return results
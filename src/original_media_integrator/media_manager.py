@@ -1,16 +1,84 @@
 # src/original_media_integrator/media_manager.py
 
+import filecmp
 import os
-import shutil
-from typing import Optional
-from original_media_integrator.file_utils import is_file_in_use
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from original_media_integrator.date_resolution import resolve_dates
+from original_media_integrator.dedup_index import DedupIndex, Fingerprint, record_imports, skip_duplicates
+from original_media_integrator.file_utils import MEDIA_EXTENSIONS, SIDECAR_EXTENSIONS
+from original_media_integrator.media_groups import MediaGroup, group_media_files, move_groups
+from original_media_integrator.move_pipeline import move_file
+from original_media_integrator.stability import DEFAULT_SETTLE_SECONDS, iter_stable_batches
 from metadata_manager import get_creation_datetime
 import logging
 
 # Konfiguriere das Logging
 logger = logging.getLogger(__name__)
 
-def move_file_to_target(source_file: str, base_source_dir: str, base_destination_dir: str) -> Optional[str]:
+def plan_destination(source_file: str, base_source_dir: str, base_destination_dir: str, creation_time: datetime) -> str:
+    """
+    Berechnet den Zielpfad einer Datei: Datumsstruktur, beibehaltenes Unterverzeichnis und neuer Dateiname
+    mit Datum, Zeitzone und ggf. -edited (siehe `move_file_to_target`).
+    """
+    date_path = creation_time.strftime('%Y/%Y-%m/%Y-%m-%d')
+
+    # Relativen Pfad zum Quellverzeichnis finden (um Unterverzeichnisse beizubehalten)
+    relative_dir = os.path.relpath(os.path.dirname(source_file), base_source_dir).lstrip(os.sep)
+
+    # Zielverzeichnis basierend auf Datum und Unterverzeichnisstruktur erstellen
+    destination_dir = os.path.join(base_destination_dir, date_path, relative_dir)
+
+    # Dateiendung und Dateiname ohne Endung bestimmen
+    extension = os.path.splitext(source_file)[1].lower()
+    filename_without_extension = os.path.splitext(os.path.basename(source_file))[0]
+
+    # Zeitzoneninformationen extrahieren
+    timezone_suffix = creation_time.strftime('%z')
+
+    # Prüfen, ob der Dateiname "_edited" enthält
+    edited_suffix = "-edited" if "_edited" in filename_without_extension else ""
+
+    # Neuer Dateiname mit Datum, Zeitzone und ggf. -edited
+    filename = creation_time.strftime(f'%Y-%m-%d_%H%M%S{timezone_suffix}{edited_suffix}{extension}')
+
+    # Vollständiger Pfad der Zieldatei
+    return os.path.normpath(os.path.join(destination_dir, filename))
+
+def _same_content(first: str, second: str) -> bool:
+    try:
+        return os.path.getsize(first) == os.path.getsize(second) and filecmp.cmp(first, second, shallow=False)
+    except OSError:
+        return False
+
+def unique_destination(source_file: str, destination: str, reserved: Dict[str, str]) -> str:
+    """
+    Hängt eine Nummer (-2, -3, ...) an den Zielnamen, wenn er im Ziel bereits belegt oder in diesem Lauf schon
+    vergeben ist, z.B. bei Serienbildern aus derselben Sekunde. Ist der Inhalt identisch mit der bestehenden bzw.
+    bereits eingeplanten Datei, bleibt der Name; die Datei wird dann beim Verschieben übersprungen.
+
+    Args:
+        source_file (str): Die zu verschiebende Datei.
+        destination (str): Der geplante Zielpfad (siehe `plan_destination`).
+        reserved (Dict[str, str]): Die in diesem Lauf bereits vergebenen Zielpfade mit ihrer Quelldatei; der
+            Rückgabewert wird ergänzt.
+
+    Returns:
+        str: Der eindeutige Zielpfad.
+    """
+    base, extension = os.path.splitext(destination)
+    candidate = destination
+    counter = 1
+    while candidate in reserved or os.path.lexists(candidate):
+        if _same_content(source_file, reserved.get(candidate, candidate)):
+            return candidate
+        counter += 1
+        candidate = f"{base}-{counter}{extension}"
+    reserved[candidate] = source_file
+    return candidate
+
+def move_file_to_target(source_file: str, base_source_dir: str, base_destination_dir: str, creation_time: Optional[datetime] = None) -> Optional[str]:
     """
     Verschiebt eine Datei ins Zielverzeichnis, behält die Unterverzeichnisstruktur vom Quellverzeichnis bei und organisiert nach Datum.
 
@@ -19,11 +87,14 @@ def move_file_to_target(source_file: str, base_source_dir: str, base_destination
     - Dateien im Wurzelverzeichnis des Quellverzeichnisses werden direkt in die Datumsstruktur des Zielverzeichnisses verschoben.
     - Der Dateiname wird anhand des Erstellungsdatums der Datei generiert und enthält die Zeitzone.
     - Wenn der Dateiname "_edited" enthält, wird dies als "-edited" im neuen Dateinamen übernommen.
+    - Eine bestehende Zieldatei wird nicht überschrieben; bei anderem Inhalt erhält der Name eine Nummer. Über Gerätegrenzen hinweg wird verifiziert kopiert
+      und die Quelle erst danach gelöscht (siehe `move_pipeline`).
 
     Argumente:
     - source_file (str): Der vollständige Pfad zur Quelldatei.
     - base_source_dir (str): Das Wurzelverzeichnis der Quelle. Dient zur Berechnung des relativen Pfads.
     - base_destination_dir (str): Das Wurzelverzeichnis des Ziels, in das die Datei verschoben wird.
+    - creation_time (datetime): Bereits ermitteltes Erstellungsdatum (siehe `resolve_dates`). Wenn None, wird es einzeln gelesen.
 
     Rückgabewert:
     - str: Der vollständige Pfad der verschobenen Datei im Zielverzeichnis.
@@ -31,40 +102,19 @@ def move_file_to_target(source_file: str, base_source_dir: str, base_destination
     """
     try:
         # Datum der Datei extrahieren, inklusive Zeitzone
-        creation_time = get_creation_datetime(source_file)
+        if creation_time is None:
+            creation_time = get_creation_datetime(source_file)
         if not creation_time:
             raise ValueError("Erstellungsdatum konnte nicht ermittelt werden.")
 
-        date_path = creation_time.strftime('%Y/%Y-%m/%Y-%m-%d')
-
-        # Relativen Pfad zum Quellverzeichnis finden (um Unterverzeichnisse beizubehalten)
-        relative_dir = os.path.relpath(os.path.dirname(source_file), base_source_dir).lstrip(os.sep)
-
-        # Zielverzeichnis basierend auf Datum und Unterverzeichnisstruktur erstellen
-        destination_dir = os.path.join(base_destination_dir, date_path, relative_dir)
-
-        # Dateiendung und Dateiname ohne Endung bestimmen
-        extension = os.path.splitext(source_file)[1].lower()
-        filename_without_extension = os.path.splitext(os.path.basename(source_file))[0]
-
-        # Zeitzoneninformationen extrahieren
-        timezone_suffix = creation_time.strftime('%z')
-
-        # Prüfen, ob der Dateiname "_edited" enthält
-        edited_suffix = "-edited" if "_edited" in filename_without_extension else ""
-
-        # Neuer Dateiname mit Datum, Zeitzone und ggf. -edited
-        filename = creation_time.strftime(f'%Y-%m-%d_%H%M%S{timezone_suffix}{edited_suffix}{extension}')
-
-        # Sicherstellen, dass das Zielverzeichnis existiert
-        os.makedirs(destination_dir, exist_ok=True)
-
-        # Vollständiger Pfad der Zieldatei
-        destination_path = os.path.join(destination_dir, filename)
+        destination_path = plan_destination(source_file, base_source_dir, base_destination_dir, creation_time)
+        destination_path = unique_destination(source_file, destination_path, {})
 
         # Verschiebe die Datei
         logger.info(f"Verschiebe Datei {source_file} ({os.path.getsize(source_file) / (1024 * 1024):.2f} MiB) nach {destination_path}")
-        shutil.move(source_file, destination_path)
+        result = move_file(source_file, destination_path)
+        if not result.ok:
+            raise OSError(result.error)
         logger.info(f"Datei verschoben nach {destination_path}")
 
         return destination_path
@@ -73,7 +123,8 @@ def move_file_to_target(source_file: str, base_source_dir: str, base_destination
         print(f"Fehler beim Verschieben der Datei {source_file}: {e}")
         return None
 
-def organize_media_files(source_dir: str, destination_dir: str, base_source_dir: Optional[str] = None):
+def organize_media_files(source_dir: str, destination_dir: str, base_source_dir: Optional[str] = None, dedup_index: Optional[DedupIndex] = None,
+                         settle_seconds: float = DEFAULT_SETTLE_SECONDS, reindex: bool = False):
     """
     Organisiert Medien aus dem Quellverzeichnis ins Zielverzeichnis.
 
@@ -82,9 +133,18 @@ def organize_media_files(source_dir: str, destination_dir: str, base_source_dir:
     - destination_dir (str): Das Zielverzeichnis, in das die Dateien verschoben werden.
     - base_source_dir (str): Das Wurzelverzeichnis zur Berechnung des relativen Pfads. 
                              Wenn None, wird source_dir verwendet.
+    - dedup_index (DedupIndex): Index der importierten Originale. Dateien, deren Inhalt bereits importiert
+                                wurde (auch unter anderem Namen), werden übersprungen.
+    - settle_seconds (float): Ruhezeit, nach der eine Datei als fertig geschrieben gilt. Dateien, die noch
+                              geschrieben werden, werden übersprungen.
+    - reindex (bool): Den Duplikatindex vorab mit dem ganzen destination_dir abgleichen.
 
-    Diese Funktion durchläuft rekursiv das source_dir und verschiebt gültige Dateien
-    ins destination_dir, wobei die Unterverzeichnisstruktur beibehalten wird.
+    Diese Funktion durchläuft das source_dir ein einziges Mal und verschiebt gültige Dateien
+    ins destination_dir, wobei die Unterverzeichnisstruktur beibehalten wird. Die Erstellungsdaten aller
+    Dateien werden vorab gemeinsam ermittelt (stapelweise EXIF, dann Dateiname, zuletzt Dateisystem).
+    Begleitdateien (.AAE, .XMP, .LRF, Video einer Live Photo) werden mit ihrer Hauptdatei verschoben und
+    erhalten deren neuen Namen. Belegte Zielnamen erhalten eine Nummer (siehe `unique_destination`). Leer gewordene Verzeichnisse werden anhand der beim Durchlauf gezählten
+    Einträge entfernt.
     """
     if base_source_dir is None:
         base_source_dir = os.path.abspath(source_dir)  # Verwende source_dir als base_source_dir
@@ -92,41 +152,136 @@ def organize_media_files(source_dir: str, destination_dir: str, base_source_dir:
         base_source_dir = os.path.abspath(base_source_dir)
 
     logger.info(f"Durchlaufe das Quellverzeichnis: {source_dir}")
-    for root, _, files in os.walk(source_dir):
-        for filename in files:
-            if filename.startswith('.') or not filename.lower().endswith(('.mov', '.mp4', '.jpg', '.jpeg', '.png', '.heif', '.heic', '.dng')):
-                logger.debug(f"Überspringe Datei {filename} aufgrund des Dateityps oder versteckter Datei.")
-                continue
-
-            file_path = os.path.join(root, filename)
+    tree = scan_source_tree(source_dir)
 
-            if is_file_in_use(file_path):
-                logger.warning(f"Datei {filename} wird noch verwendet. Überspringe.")
-                print(f"Datei {filename} wird noch verwendet. Überspringe.")
+    moved_sources = []
+    reserved: Dict[str, str] = {}
+    for groups, fingerprints in iter_import_batches(tree.files, settle_seconds, dedup_index, destination_dir, reindex):
+        # Ein Datum pro Gruppe (Hauptdatei). EXIF/QuickTime zuerst, da nur die Metadaten den Zeitzonen-Offset
+        # für den neuen Namen liefern; der Dateiname dient nur als Rückfall
+        resolved_dates = resolve_dates([group.primary for group in groups], prefer_metadata=True)
+        planned = []
+        for group in groups:
+            resolved = resolved_dates.get(group.primary)
+            if resolved is None:
+                logger.error(f"Fehler beim Verschieben der Datei {group.primary}: Erstellungsdatum konnte nicht ermittelt werden.")
                 continue
+            destination = plan_destination(group.primary, base_source_dir, destination_dir, resolved.timestamp)
+            planned.append((group, unique_destination(group.primary, destination, reserved)))
 
-            # Nutze die Funktion `move_file_to_target` zum Verschieben und Organisieren
-            move_file_to_target(file_path, base_source_dir, destination_dir)
+        # Umbenennungen auf demselben Gerät sofort, Kopien von Karte oder NAS parallel und verifiziert
+        results = move_groups(planned)
+        record_imports(dedup_index, [(result.source, result.destination) for result in results if result.ok], fingerprints)
+        moved_sources.extend(result.source for result in results if result.ok)
 
-    remove_empty_directories(source_dir)
+    remove_emptied_directories(tree, moved_sources)
 
-def remove_empty_directories(root_dir: str):
+def iter_import_batches(
+    file_paths: List[str],
+    settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+    dedup_index: Optional[DedupIndex] = None,
+    destination_dir: Optional[str] = None,
+    reindex: bool = False
+) -> Iterator[Tuple[List[MediaGroup], Dict[str, Fingerprint]]]:
     """
-    Entfernt leere Verzeichnisse rekursiv.
+    Fasst Haupt- und Begleitdateien zu Gruppen zusammen und liefert sie, sobald alle ihre Dateien fertig
+    geschrieben sind. Bereits ruhende Gruppen werden so verschoben, während andere noch kopiert werden.
+    Gruppen, deren Hauptdatei schon importiert wurde, entfallen.
 
-    Argumente:
-    - root_dir (str): Das Wurzelverzeichnis, in dem nach leeren Verzeichnissen gesucht wird.
+    Die Duplikatprüfung fragt nur den Index ab, ohne das Archiv zu durchlaufen; importierte Dateien werden nach
+    jedem Durchgang aufgenommen. Mit `reindex` wird der Index vorab mit `destination_dir` abgeglichen (os.stat
+    jeder Datei, ohne Hashes), damit auch von Hand archivierte Dateien erkannt werden.
+
+    Yields:
+        Tuple[List[MediaGroup], Dict[str, Fingerprint]]: Die zu importierenden Gruppen eines Prüfdurchgangs und
+        die Fingerprints ihrer Hauptdateien (für `record_imports`).
     """
-    logger.info(f"Starte das Entfernen leerer Verzeichnisse in: {root_dir}")
-    for dirpath, dirnames, filenames in os.walk(root_dir, topdown=False):
-        if dirpath == root_dir:
+    if reindex and dedup_index is not None and destination_dir and os.path.isdir(destination_dir):
+        added, removed = dedup_index.scan(destination_dir)
+        logger.info(f"Duplikatindex mit {destination_dir} abgeglichen: {added} aufgenommen, {removed} entfernt.")
+
+    # Laufende Kopien abwarten: alle Dateien gemeinsam beobachten statt jede einzeln zu prüfen
+    waiting = group_media_files(file_paths)
+    stable: Set[str] = set()
+    for released in iter_stable_batches(file_paths, settle_seconds):
+        stable.update(released)
+        ready = [group for group in waiting if all(file_path in stable for file_path in group.files)]
+        if not ready:
             continue
+        waiting = [group for group in waiting if not all(file_path in stable for file_path in group.files)]
+        remaining, fingerprints = skip_duplicates(dedup_index, [group.primary for group in ready])
+        remaining = set(remaining)
+        yield [group for group in ready if group.primary in remaining], fingerprints
 
-        if not any(fname for fname in filenames if not fname.startswith('.')) and not dirnames:
-            try:
-                os.rmdir(dirpath)
-                logger.info(f"Leeres Verzeichnis entfernt: {dirpath}")
-                print(f"Leeres Verzeichnis entfernt: {dirpath}")
-            except Exception as e:
-                logger.error(f"Fehler beim Entfernen des Verzeichnisses {dirpath}: {e}")
-                print(f"Fehler beim Entfernen des Verzeichnisses {dirpath}: {e}")
\ No newline at end of file
+    for group in waiting:
+        if group.primary in stable:
+            logger.warning(f"Begleitdateien von {group.primary} werden noch geschrieben. Überspringe die Gruppe.")
+
+@dataclass
+class SourceTree:
+    """
+    Ergebnis eines einzigen Durchlaufs durch das Quellverzeichnis: die Medien- und Begleitdateien und pro Verzeichnis die
+    Anzahl verbleibender Einträge (sichtbare Dateien und Unterverzeichnisse).
+    """
+    root: str
+    files: List[str] = field(default_factory=list)
+    remaining: Dict[str, int] = field(default_factory=dict)
+
+def scan_source_tree(root_dir: str) -> SourceTree:
+    """
+    Durchläuft das Quellverzeichnis einmal mit os.scandir, sammelt die Mediendateien und zählt die Einträge
+    pro Verzeichnis, damit leere Verzeichnisse nach dem Verschieben ohne zweiten Durchlauf entfernt werden können.
+    """
+    tree = SourceTree(os.path.abspath(root_dir))
+    pending = [tree.root]
+    while pending:
+        directory = pending.pop()
+        count = 0
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        pending.append(entry.path)
+                        count += 1
+                    elif not entry.name.startswith('.'):
+                        count += 1
+                        if entry.name.lower().endswith(MEDIA_EXTENSIONS + SIDECAR_EXTENSIONS):
+                            tree.files.append(entry.path)
+                        else:
+                            logger.debug(f"Überspringe Datei {entry.name} aufgrund des Dateityps.")
+        except OSError as e:
+            logger.error(f"Verzeichnis {directory} kann nicht gelesen werden: {e}")
+            count = 1  # Unlesbare Verzeichnisse nie entfernen
+        tree.remaining[directory] = count
+    return tree
+
+def remove_emptied_directories(tree: SourceTree, moved_files: Iterable[str]):
+    """
+    Entfernt Verzeichnisse, die durch das Verschieben leer geworden sind (oder es bereits waren), von unten nach
+    oben anhand der gezählten Einträge; das Quellverzeichnis wird dafür nicht erneut durchlaufen.
+    Das Wurzelverzeichnis selbst bleibt bestehen.
+    """
+    for file_path in moved_files:
+        directory = os.path.dirname(file_path)
+        if directory in tree.remaining:
+            tree.remaining[directory] -= 1
+
+    # Tiefste Verzeichnisse zuerst, damit Elternverzeichnisse im selben Durchgang leer werden können
+    for directory in sorted(tree.remaining, key=lambda path: path.count(os.sep), reverse=True):
+        if directory == tree.root or tree.remaining[directory] > 0:
+            continue
+        try:
+            os.rmdir(directory)
+            logger.info(f"Leeres Verzeichnis entfernt: {directory}")
+            print(f"Leeres Verzeichnis entfernt: {directory}")
+        except OSError as e:
+            logger.error(f"Fehler beim Entfernen des Verzeichnisses {directory}: {e}")
+            print(f"Fehler beim Entfernen des Verzeichnisses {directory}: {e}")
+            continue
+        parent = os.path.dirname(directory)
+        if parent in tree.remaining:
+            tree.remaining[parent] -= 1
@@ -0,0 +1,274 @@
+# src/original_media_integrator/move_pipeline.py
+
+import errno
+import hashlib
+import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Parallele Kopien insgesamt und pro Gerät (Quelle bzw. Ziel); eine Festplatte soll nicht von vielen
+# gleichzeitigen Zugriffen ausgebremst werden
+DEFAULT_MOVE_WORKERS = 4
+DEFAULT_PER_DEVICE = 2
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# macOS: Daten der Zieldatei nicht im Page-Cache halten, damit die Prüfung wirklich vom Datenträger liest
+F_NOCACHE = getattr(fcntl, "F_NOCACHE", 48 if sys.platform == "darwin" else None) if fcntl else None
+
+# Fehler von os.link auf Dateisystemen ohne Hardlinks (exFAT/FAT auf Speicherkarten, manche Netzlaufwerke)
+LINK_UNSUPPORTED_ERRNOS = {errno.EPERM, errno.ENOTSUP, errno.EOPNOTSUPP, errno.EMLINK, errno.ENOSYS}
+
+METHOD_RENAME = "rename"
+METHOD_COPY = "copy"
+METHOD_SKIPPED = "skipped"
+
+@dataclass
+class MoveResult:
+    """Ergebnis einer Verschiebung."""
+    source: str
+    destination: str
+    method: str
+    size: int = 0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.method != METHOD_SKIPPED
+
+class DeviceLimiter:
+    """Begrenzt die gleichzeitigen Kopien pro Gerät (st_dev). `limits` legt abweichende Grenzen für einzelne Geräte fest."""
+
+    def __init__(self, per_device: int = DEFAULT_PER_DEVICE, limits: Optional[Dict[int, int]] = None):
+        self.per_device = max(1, per_device)
+        self.limits = limits or {}
+        self._semaphores: Dict[int, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, device: int) -> threading.Semaphore:
+        with self._lock:
+            if device not in self._semaphores:
+                self._semaphores[device] = threading.Semaphore(max(1, self.limits.get(device, self.per_device)))
+            return self._semaphores[device]
+
+    def acquire(self, devices: Iterable[int]) -> List[threading.Semaphore]:
+        # Immer in derselben Reihenfolge belegen, damit sich zwei Kopien nicht gegenseitig blockieren
+        semaphores = [self._semaphore(device) for device in sorted(set(devices))]
+        for semaphore in semaphores:
+            semaphore.acquire()
+        return semaphores
+
+    @staticmethod
+    def release(semaphores: List[threading.Semaphore]):
+        for semaphore in reversed(semaphores):
+            semaphore.release()
+
+def device_of(path: str) -> int:
+    """Gerät einer Datei oder, falls der Pfad noch nicht existiert, des nächsten existierenden Elternverzeichnisses."""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return os.stat(path).st_dev
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _drop_page_cache(fd: int):
+    """
+    Linux: verwirft die (nach fsync sauberen) Seiten einer Datei aus dem Page-Cache, damit das Zurücklesen
+    vom Datenträger liest. Dateisysteme, die den Hinweis ignorieren, lesen weiterhin aus dem Cache.
+    """
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+
+def _commit_no_replace(path: str, destination: str):
+    """
+    Gibt der Datei `path` den Namen `destination`, ohne eine bestehende Datei zu überschreiben. Der neue Name
+    wird als Hardlink angelegt, was atomar fehlschlägt, falls das Ziel inzwischen existiert; danach wird der alte
+    Name entfernt. Ohne Hardlinks wird das Ziel exklusiv (O_EXCL) reserviert und die Reservierung ersetzt.
+
+    Raises:
+        FileExistsError: Wenn das Ziel bereits existiert.
+        OSError: Bei anderen Fehlern; beide Namen bleiben dann wie vorher.
+    """
+    try:
+        os.link(path, destination)
+    except FileExistsError:
+        raise
+    except OSError as e:
+        if e.errno not in LINK_UNSUPPORTED_ERRNOS:
+            raise
+        os.close(os.open(destination, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+        try:
+            os.replace(path, destination)
+        except BaseException:
+            os.remove(destination)
+            raise
+        return
+
+    try:
+        os.unlink(path)
+    except BaseException:
+        os.unlink(destination)
+        raise
+
+def copy_verified(source: str, destination: str, verify: bool = True) -> int:
+    """
+    Kopiert eine Datei streamend in eine temporäre Datei im Zielverzeichnis und hasht dabei die Quelle.
+    Mit `verify` wird die Kopie anschliessend vom Ziel zurückgelesen und verglichen (unter macOS ohne Page-Cache,
+    unter Linux nach dem Verwerfen der geschriebenen Seiten). Erst dann erhält die Kopie ihren endgültigen
+    Namen; eine inzwischen entstandene Zieldatei wird nicht überschrieben.
+
+    Returns:
+        int: Anzahl kopierter Bytes.
+
+    Raises:
+        FileExistsError: Wenn die Zieldatei während des Kopierens angelegt wurde.
+        OSError: Bei einem Lese- oder Schreibfehler oder wenn die Prüfsummen nicht übereinstimmen.
+    """
+    temp_path = os.path.join(os.path.dirname(destination), f".{os.path.basename(destination)}.partial")
+    digest = hashlib.sha256()
+    size = 0
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    try:
+        with open(source, "rb") as src, open(temp_path, "wb") as dst:
+            if F_NOCACHE is not None:
+                try:
+                    fcntl.fcntl(dst.fileno(), F_NOCACHE, 1)
+                except OSError:
+                    pass
+            while True:
+                read = src.readinto(buffer)
+                if not read:
+                    break
+                digest.update(view[:read])
+                dst.write(view[:read])
+                size += read
+            dst.flush()
+            os.fsync(dst.fileno())
+            if verify:
+                _drop_page_cache(dst.fileno())
+        shutil.copystat(source, temp_path)
+
+        if verify and _hash_file(temp_path) != digest.hexdigest():
+            raise OSError(f"Prüfsumme der Kopie {destination} stimmt nicht mit der Quelle überein.")
+        _commit_no_replace(temp_path, destination)
+        return size
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def move_file(source: str, destination: str, verify: bool = True, limiter: Optional[DeviceLimiter] = None) -> MoveResult:
+    """
+    Verschiebt eine einzelne Datei, ohne eine bestehende Zieldatei zu überschreiben.
+
+    Auf demselben Gerät wird nur umbenannt (siehe `_commit_no_replace`). Über Gerätegrenzen hinweg (SD-Karte, NAS)
+    wird verifiziert kopiert und die Quelle erst nach erfolgreicher Prüfung gelöscht. Entsteht die Zieldatei
+    zwischen Prüfung und Verschieben, wird die Datei übersprungen.
+    """
+    try:
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        if os.path.exists(destination):
+            return MoveResult(source, destination, METHOD_SKIPPED, error="Zieldatei existiert bereits.")
+
+        source_device = os.stat(source).st_dev
+        destination_device = device_of(os.path.dirname(destination))
+        if source_device == destination_device:
+            size = os.path.getsize(source)
+            _commit_no_replace(source, destination)
+            return MoveResult(source, destination, METHOD_RENAME, size)
+
+        semaphores = limiter.acquire([source_device, destination_device]) if limiter else []
+        try:
+            size = copy_verified(source, destination, verify)
+        finally:
+            DeviceLimiter.release(semaphores)
+        os.remove(source)
+        return MoveResult(source, destination, METHOD_COPY, size)
+    except FileExistsError:
+        return MoveResult(source, destination, METHOD_SKIPPED, error="Zieldatei existiert bereits.")
+    except OSError as e:
+        return MoveResult(source, destination, METHOD_COPY, error=str(e))
+
+def move_files(
+    moves: Iterable[Tuple[str, str]],
+    workers: int = DEFAULT_MOVE_WORKERS,
+    per_device: int = DEFAULT_PER_DEVICE,
+    verify: bool = True,
+    device_limits: Optional[Dict[int, int]] = None
+) -> List[MoveResult]:
+    """
+    Verschiebt viele Dateien: Umbenennungen auf demselben Gerät sofort, Kopien über Gerätegrenzen hinweg in
+    einem begrenzten Pool mit höchstens `per_device` gleichzeitigen Kopien pro Gerät.
+
+    Mehrere Quellen mit demselben Ziel werden nicht überschrieben; nur die erste wird verschoben.
+
+    Args:
+        moves: Paare aus Quelle und Ziel.
+        workers (int): Maximale Anzahl gleichzeitiger Kopien.
+        per_device (int): Maximale Anzahl gleichzeitiger Kopien pro Quell- bzw. Zielgerät.
+        verify (bool): Kopien vor dem Löschen der Quelle zurücklesen und vergleichen.
+        device_limits (Dict[int, int]): Abweichende Grenzen pro Gerät (st_dev), z.B. für ein Ziel, das mehrere
+            Speicherkarten gleichzeitig aufnimmt.
+
+    Returns:
+        List[MoveResult]: Ergebnis pro Verschiebung in der Reihenfolge der Eingabe.
+    """
+    started = time.monotonic()
+    limiter = DeviceLimiter(per_device, device_limits)
+    reserved = set()
+    results: List[Optional[MoveResult]] = []
+    futures = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="move") as pool:
+        for index, (source, destination) in enumerate(moves):
+            if destination in reserved:
+                results.append(MoveResult(source, destination, METHOD_SKIPPED, error="Ziel wird bereits von einer anderen Datei belegt."))
+                continue
+            reserved.add(destination)
+            results.append(None)
+            futures[index] = pool.submit(move_file, source, destination, verify, limiter)
+
+        for index, future in futures.items():
+            results[index] = future.result()
+
+    for result in results:
+        if result.ok:
+            logger.info(f"{'Umbenannt' if result.method == METHOD_RENAME else 'Kopiert und geprüft'}: {result.source} → {result.destination}")
+        elif result.method == METHOD_SKIPPED:
+            logger.warning(f"Überspringe {result.source}: {result.error} ({result.destination})")
+        else:
+            logger.error(f"Fehler beim Verschieben von {result.source}: {result.error}")
+
+    copied = sum(result.size for result in results if result.ok and result.method == METHOD_COPY)
+    elapsed = max(time.monotonic() - started, 1e-6)
+    logger.info(
+        f"{sum(1 for result in results if result.ok)} von {len(results)} Datei(en) verschoben "
+        f"({sum(1 for result in results if result.ok and result.method == METHOD_RENAME)} umbenannt, "
+        f"{copied / (1024 * 1024):.1f} MiB kopiert mit {copied / (1024 * 1024) / elapsed:.1f} MiB/s)."
+    )
+    return results
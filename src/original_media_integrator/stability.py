@@ -0,0 +1,147 @@
+# src/original_media_integrator/stability.py
+
+import os
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import logging
+from fs_watch.watcher import InotifyWatcher
+
+logger = logging.getLogger(__name__)
+
+# Eine Datei gilt als fertig geschrieben, wenn sich Grösse und Änderungszeit so lange nicht verändert haben
+DEFAULT_SETTLE_SECONDS = 10.0
+# Dateien, die nach dieser Zeit noch geschrieben werden, werden übersprungen (und beim nächsten Lauf importiert)
+DEFAULT_SETTLE_TIMEOUT = 120.0
+# Abfrageintervall, wenn keine Dateiereignisse verfügbar sind (macOS, Netzlaufwerke)
+DEFAULT_CHECK_INTERVAL = 1.0
+
+def _identity(stat: os.stat_result) -> Tuple[int, int, int]:
+    return stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns
+
+def _last_change(stat: os.stat_result, now: float) -> float:
+    """
+    Zeitpunkt der letzten Änderung laut Dateisystem. Die ctime lässt sich im Gegensatz zur mtime nicht von
+    Kopierprogrammen zurücksetzen; Zeitstempel in der Zukunft (abweichende Uhr eines NAS) zählen als jetzt.
+    """
+    return min(now, max(stat.st_mtime, stat.st_ctime))
+
+def _busy_names(directory: str, cache: Dict[str, Set[str]]) -> Set[str]:
+    """Namen der Dateien eines Verzeichnisses, zu denen .sb-* Dateien existieren (noch in Arbeit durch macOS/iCloud)."""
+    if directory not in cache:
+        busy: Set[str] = set()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if ".sb-" in entry.name:
+                        busy.add(entry.name.split(".sb-", 1)[0])
+        except OSError:
+            pass
+        cache[directory] = busy
+    return cache[directory]
+
+def _create_event_source(file_paths: Iterable[str]) -> Optional[InotifyWatcher]:
+    """Ein einziger rekursiver inotify-Watcher auf dem gemeinsamen Verzeichnis aller Dateien (nur Linux)."""
+    if not sys.platform.startswith("linux"):
+        return None
+    directories = {os.path.dirname(file_path) for file_path in file_paths}
+    if not directories:
+        return None
+    try:
+        return InotifyWatcher(os.path.commonpath(list(directories)), recursive=len(directories) > 1)
+    except (OSError, AttributeError, ValueError) as e:
+        logger.debug(f"inotify nicht verfügbar ({e}), verwende Polling.")
+        return None
+
+def iter_stable_batches(
+    file_paths: Iterable[str],
+    settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+    timeout: float = DEFAULT_SETTLE_TIMEOUT,
+    check_interval: float = DEFAULT_CHECK_INTERVAL
+) -> Iterator[List[str]]:
+    """
+    Liefert Dateien, sobald sie fertig geschrieben sind, gebündelt pro Prüfdurchgang.
+
+    Eine Datei ist fertig, wenn sich Grösse, mtime und ctime seit `settle_seconds` nicht verändert haben und
+    keine .sb-* Dateien zu ihr existieren. Dateien, die schon länger unverändert sind, werden sofort geliefert,
+    ohne Wartezeit. Die übrigen werden gemeinsam beobachtet: unter Linux mit einem einzigen inotify-Watcher,
+    sonst durch gesammeltes Abfragen der noch offenen Dateien alle `check_interval` Sekunden.
+
+    Args:
+        file_paths: Die zu prüfenden Dateien.
+        settle_seconds (float): Ruhezeit, nach der eine Datei als fertig gilt.
+        timeout (float): Maximale Wartezeit. Danach noch veränderte Dateien werden nicht geliefert.
+        check_interval (float): Abfrageintervall ohne Dateiereignisse.
+
+    Yields:
+        List[str]: Die im jeweiligen Durchgang zur Ruhe gekommenen Dateien; der erste Block enthält alle bereits
+        ruhenden Dateien. Gelöschte Dateien entfallen.
+    """
+    started = time.time()
+    pending: Dict[str, Tuple[Tuple[int, int, int], float]] = {}
+    for file_path in file_paths:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+        pending[file_path] = (_identity(stat), _last_change(stat, started))
+
+    watcher = None
+    try:
+        while pending:
+            now = time.time()
+            sidecar_cache: Dict[str, Set[str]] = {}
+            released = []
+            for file_path, (identity, last_change) in list(pending.items()):
+                if now - last_change < settle_seconds:
+                    continue
+                # Vor der Freigabe nachprüfen; Schreibzugriffe über das Netzwerk erzeugen keine Ereignisse
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    del pending[file_path]
+                    continue
+                if _identity(stat) != identity:
+                    pending[file_path] = (_identity(stat), now)
+                    continue
+                if os.path.basename(file_path) in _busy_names(os.path.dirname(file_path), sidecar_cache):
+                    pending[file_path] = (identity, now)
+                    continue
+                del pending[file_path]
+                released.append(file_path)
+            if released:
+                # Die Zeit, in der der Aufrufer die Dateien verarbeitet, zählt nicht zur Wartezeit
+                paused = time.time()
+                yield released
+                started += time.time() - paused
+
+            if not pending:
+                break
+            if now - started >= timeout:
+                for file_path in pending:
+                    logger.warning(f"Datei {file_path} wird noch geschrieben. Überspringe.")
+                break
+
+            if watcher is None:
+                watcher = _create_event_source(pending) or False
+            next_due = min(last_change for _, last_change in pending.values()) + settle_seconds
+            wait = min(max(next_due - time.time(), 0.05), started + timeout - time.time())
+            if watcher:
+                # Ohne Ereignis bis zur nächsten fälligen Datei schlafen, dann erneut prüfen
+                changed = watcher.poll(max(wait, 0.05)) & pending.keys()
+            else:
+                time.sleep(max(min(wait, check_interval), 0.05))
+                changed = pending.keys()
+
+            now = time.time()
+            for file_path in list(changed):
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    pending.pop(file_path, None)
+                    continue
+                if _identity(stat) != pending[file_path][0]:
+                    pending[file_path] = (_identity(stat), now)
+    finally:
+        if watcher:
+            watcher.close()
@@ -2,12 +2,17 @@
 
 import typer
 from video_compressor.commands.convert_with_handbrake import convert_videos_with_handbrake_command
-from video_compressor.commands.analyze_with_mediainfo import analyze
+from video_compressor.commands.analyze_with_mediainfo import analyze, analyze_directory
+from video_compressor.commands.estimate_savings import estimate_savings_command
+from video_compressor.commands.watch_directory import watch_directory_command
 
 app = typer.Typer()
 
 app.command("convert-to-hevc")(convert_videos_with_handbrake_command)
 app.command("analyze")(analyze)
+app.command("analyze-directory")(analyze_directory)
+app.command("estimate")(estimate_savings_command)
+app.command("watch")(watch_directory_command)
 
 if __name__ == "__main__":
     app()
\ No newline at end of file
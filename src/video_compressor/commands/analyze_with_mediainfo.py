@@ -1,8 +1,15 @@
 import os
+import csv
+import json
 import subprocess
 import typer
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
 from rich.console import Console
 from rich.table import Table
+from video_compressor.file_utils import VIDEO_EXTENSIONS
+from video_compressor.mediainfo import MediaInfoRecord, analyze_files, is_mediainfo_installed
 
 app = typer.Typer()
 console = Console()
@@ -16,7 +23,7 @@ def analyze(input_file: str = typer.Argument(..., help="Pfad zur Eingabedatei"))
         raise typer.Exit(code=1)
 
     # Überprüfen, ob MediaInfo installiert ist
-    if subprocess.call(["which", "mediainfo"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) != 0:
+    if not is_mediainfo_installed():
         console.print("[bold red]MediaInfo ist nicht installiert. Bitte installieren und erneut versuchen.[/bold red]")
         raise typer.Exit(code=1)
 
@@ -55,7 +62,7 @@ def analyze(input_file: str = typer.Argument(..., help="Pfad zur Eingabedatei"))
         video_table.add_column("Farbraum", style="cyan")
 
         lines = video_info.split("\n")
-        details = {line.split(":")[0].strip(): line.split(":")[1].strip() for line in lines if ":" in line}
+        details = {key.strip(): value.strip() for key, value in (line.split(":", 1) for line in lines if ":" in line)}
         resolution = f"{details.get('Width', 'N/A')} x {details.get('Height', 'N/A')}"
         video_table.add_row(
             details.get("Format", "N/A"),
@@ -82,7 +89,7 @@ def analyze(input_file: str = typer.Argument(..., help="Pfad zur Eingabedatei"))
 
         for audio in audio_info:
             lines = audio.split("\n")
-            details = {line.split(":")[0].strip(): line.split(":")[1].strip() for line in lines if ":" in line}
+            details = {key.strip(): value.strip() for key, value in (line.split(":", 1) for line in lines if ":" in line)}
             audio_table.add_row(
                 details.get("ID", "N/A"),
                 details.get("Format", "N/A"),
@@ -105,7 +112,7 @@ def analyze(input_file: str = typer.Argument(..., help="Pfad zur Eingabedatei"))
 
         for subtitle in subtitle_info:
             lines = subtitle.split("\n")
-            details = {line.split(":")[0].strip(): line.split(":")[1].strip() for line in lines if ":" in line}
+            details = {key.strip(): value.strip() for key, value in (line.split(":", 1) for line in lines if ":" in line)}
             subtitle_table.add_row(
                 details.get("ID", "N/A"),
                 details.get("Format", "N/A"),
@@ -116,6 +123,103 @@ def analyze(input_file: str = typer.Argument(..., help="Pfad zur Eingabedatei"))
     else:
         console.print("[bold red]Keine Untertitel gefunden.[/bold red]")
 
+def analyze_directory(
+    directory: Path = typer.Argument(..., help="Pfad zum Verzeichnis mit den Mediendateien"),
+    recursive: bool = typer.Option(True, "--recursive/--no-recursive", help="Unterverzeichnisse einbeziehen"),
+    workers: int = typer.Option(4, "--workers", help="Anzahl gleichzeitiger MediaInfo-Prozesse"),
+    batch_size: int = typer.Option(50, "--batch-size", help="Anzahl Dateien pro MediaInfo-Aufruf"),
+    csv_path: Optional[Path] = typer.Option(None, "--csv", help="Schreibt einen Datensatz pro Datei in diese CSV-Datei"),
+    jsonl_path: Optional[Path] = typer.Option(None, "--jsonl", help="Schreibt einen Datensatz pro Datei in diese JSON-Lines-Datei")
+):
+    """
+    Analysiert alle Videodateien eines Verzeichnisses mit MediaInfo (JSON-Ausgabe) und zeigt
+    zusammenfassende Tabellen zu Codecs, HDR-Formaten, Grösse und Bitrate an.
+
+    Die Dateien werden in Stapeln an MediaInfo übergeben, mehrere Stapel laufen parallel.
+    """
+    if not directory.is_dir():
+        console.print(f"[bold red]Das Verzeichnis '{directory}' existiert nicht.[/bold red]")
+        raise typer.Exit(code=1)
+
+    if not is_mediainfo_installed():
+        console.print("[bold red]MediaInfo ist nicht installiert. Bitte installieren und erneut versuchen.[/bold red]")
+        raise typer.Exit(code=1)
+
+    candidates = directory.rglob("*") if recursive else directory.glob("*")
+    file_paths = sorted(
+        str(path) for path in candidates
+        if path.is_file() and not path.name.startswith(".") and path.suffix.lower() in VIDEO_EXTENSIONS
+    )
+    if not file_paths:
+        console.print("[yellow]Keine Videodateien gefunden.[/yellow]")
+        raise typer.Exit()
+
+    batch_size = max(1, batch_size)
+    batches = [file_paths[i:i + batch_size] for i in range(0, len(file_paths), batch_size)]
+    console.print(f"Analysiere {len(file_paths)} Datei(en) in {len(batches)} Stapel(n)...")
+
+    records: List[MediaInfoRecord] = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for batch_records in pool.map(analyze_files, batches):
+            records.extend(batch_records)
+
+    print_codec_summary(records)
+    print_hdr_summary(records)
+
+    if csv_path:
+        write_records_csv(records, csv_path)
+        console.print(f"[green]CSV geschrieben: {csv_path}[/green]")
+    if jsonl_path:
+        with open(jsonl_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record.to_dict(), ensure_ascii=False) + "\n")
+        console.print(f"[green]JSON-Lines geschrieben: {jsonl_path}[/green]")
+
+def print_codec_summary(records: List[MediaInfoRecord]):
+    """Zeigt Anzahl, Gesamtgrösse, Gesamtdauer und mittlere Bitrate pro Videocodec an."""
+    summary: Dict[str, Dict[str, float]] = {}
+    for record in records:
+        entry = summary.setdefault(record.video_codec or "N/A", {"count": 0, "size": 0, "duration": 0.0})
+        entry["count"] += 1
+        entry["size"] += record.size
+        entry["duration"] += record.duration
+
+    table = Table(title="Codec-Verteilung", style="bright_green")
+    table.add_column("Codec", style="cyan")
+    table.add_column("Dateien", justify="right", style="green")
+    table.add_column("Grösse (GB)", justify="right", style="yellow")
+    table.add_column("Dauer (h)", justify="right", style="magenta")
+    table.add_column("Ø Bitrate (Mbit/s)", justify="right", style="blue")
+    for codec, entry in sorted(summary.items(), key=lambda item: -item[1]["size"]):
+        bitrate = entry["size"] * 8 / entry["duration"] / 1e6 if entry["duration"] else 0.0
+        table.add_row(codec, str(entry["count"]), f"{entry['size'] / 1e9:.2f}", f"{entry['duration'] / 3600:.2f}", f"{bitrate:.1f}")
+    console.print(table)
+
+def print_hdr_summary(records: List[MediaInfoRecord]):
+    """Zeigt die Verteilung der HDR-Formate an."""
+    counts: Dict[str, int] = {}
+    for record in records:
+        hdr_format = record.hdr_format or "SDR"
+        counts[hdr_format] = counts.get(hdr_format, 0) + 1
+
+    table = Table(title="HDR-Formate", style="bright_magenta")
+    table.add_column("Format", style="cyan")
+    table.add_column("Dateien", justify="right", style="green")
+    for hdr_format, count in sorted(counts.items(), key=lambda item: -item[1]):
+        table.add_row(hdr_format, str(count))
+    console.print(table)
+
+def write_records_csv(records: List[MediaInfoRecord], csv_path: Path):
+    """Schreibt die Datensätze als CSV. Audio-Codecs werden mit '|' verbunden."""
+    fieldnames = list(MediaInfoRecord.__dataclass_fields__.keys())
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for record in records:
+            row = record.to_dict()
+            row["audio_codecs"] = "|".join(row["audio_codecs"])
+            writer.writerow(row)
+
 @app.command()
 def main():
     typer.run(analyze)
@@ -2,11 +2,20 @@
 
 import typer
 import os
-from typing import List
-from metadata_manager.commands.get_video_codec import get_video_codec
-import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 import logging
-from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn
+from video_compressor.file_utils import VIDEO_EXTENSIONS
+from video_compressor.probe import DEFAULT_PROBE_WORKERS, ProbeCache, probe_videos
+from video_compressor.preflight import ACTION_SKIP, classify_video, print_preflight_summary
+from video_compressor.scheduler import (
+    JOB_KIND_ENCODE, JOB_KIND_REMUX, DEFAULT_REMUX_WORKERS, DEFAULT_THREADS_PER_JOB,
+    default_encode_workers, run_jobs
+)
+from video_compressor.verification import DEFAULT_MIN_SSIM, DEFAULT_SAMPLE_COUNT, DEFAULT_SAMPLE_SECONDS
+from video_compressor.progress import ProgressReporter
+from video_compressor.job_queue import DEFAULT_JOB_DB_PATH, DEFAULT_MAX_ATTEMPTS, JobQueue, compute_preset_hash
+from video_compressor.job_runner import JobRunner
 
 logger = logging.getLogger(__name__)
 
@@ -14,14 +23,23 @@ logger = logging.getLogger(__name__)
 PRESET = "YouTube"  # Wähle ein geeignetes Preset oder erstelle ein eigenes
 POSTFIX = "-hevc"
 OUTPUT_EXTENSION = ".mp4"
-VIDEO_EXTENSIONS = [
-    ".mp4", ".mov", ".avi", ".mkv", ".flv", ".wmv", ".webm", ".mpeg", ".mpg",
-    ".m4v", ".3gp", ".3g2", ".mts", ".m2ts", ".ts", ".vob", ".ogv", ".dv",
-    ".f4v", ".rm", ".rmvb"
-]
 
 app = typer.Typer()
 
+def create_job(file_path: str, action: str, probe: Dict[str, Any], postfix: str = POSTFIX) -> Dict[str, Any]:
+    """Erstellt einen Job für eine Videodatei; die Ausgabedatei liegt im selben Verzeichnis."""
+    base_name = os.path.splitext(os.path.basename(file_path))[0]
+    output_path = os.path.join(os.path.dirname(file_path), f"{base_name}{postfix}{OUTPUT_EXTENSION}")
+    return {
+        'kind': action,
+        'input_path': file_path,
+        'output_path': output_path,
+        'size': probe['size'],
+        'duration': probe['duration'],
+        'fps': probe['fps'],
+        'probe': probe,
+    }
+
 def convert_videos_with_handbrake_command(
     directory: str = typer.Argument(..., help="Pfad zum Verzeichnis mit den Videodateien"),
     preset_file: str = typer.Option(
@@ -35,19 +53,40 @@ def convert_videos_with_handbrake_command(
         False,
         "--force-remux-mp4-h264",
         help="Erzwingt das Remuxing von MP4-Dateien mit H.264 Codec."
-    )
+    ),
+    encode_jobs: int = typer.Option(0, "--encode-jobs", help="Anzahl paralleler HandBrakeCLI-Kodierungen (0 = CPU-Kerne / Threads pro Job)"),
+    threads_per_job: int = typer.Option(DEFAULT_THREADS_PER_JOB, "--threads-per-job", help="Geschätzte Threads pro Kodierung zur Berechnung der Parallelität"),
+    remux_jobs: int = typer.Option(DEFAULT_REMUX_WORKERS, "--remux-jobs", help="Anzahl paralleler Remux-Vorgänge mit FFmpeg"),
+    job_db: Path = typer.Option(DEFAULT_JOB_DB_PATH, "--job-db", help="Pfad zur SQLite-Datenbank mit dem Zustand der Jobs"),
+    max_attempts: int = typer.Option(DEFAULT_MAX_ATTEMPTS, "--max-attempts", help="Maximale Anzahl Versuche pro Datei"),
+    retry_backoff: float = typer.Option(30.0, "--retry-backoff", help="Wartezeit in Sekunden vor dem ersten erneuten Versuch (verdoppelt sich pro Versuch)"),
+    progress_log: Optional[Path] = typer.Option(None, "--progress-log", help="Schreibt den Fortschritt zusätzlich als JSON-Lines in diese Datei"),
+    segments: int = typer.Option(0, "--segments", help="Teilt lange Videos in so viele Segmente, die parallel kodiert werden (0 = aus)"),
+    segment_min_duration: float = typer.Option(600.0, "--segment-min-duration", help="Mindestdauer in Sekunden, ab der ein Video segmentiert kodiert wird"),
+    probe_jobs: int = typer.Option(DEFAULT_PROBE_WORKERS, "--probe-jobs", help="Anzahl paralleler ffprobe-Aufrufe in der Vorabanalyse"),
+    verify: bool = typer.Option(True, "--verify/--no-verify", help="Prüft jede Ausgabedatei, bevor das Original zum Löschen freigegeben wird"),
+    verify_samples: int = typer.Option(DEFAULT_SAMPLE_COUNT, "--verify-samples", help="Anzahl dekodierter Stichproben pro Ausgabedatei"),
+    verify_sample_seconds: float = typer.Option(DEFAULT_SAMPLE_SECONDS, "--verify-sample-seconds", help="Länge einer Stichprobe in Sekunden"),
+    min_ssim: float = typer.Option(DEFAULT_MIN_SSIM, "--min-ssim", help="Minimaler SSIM-Wert pro Stichprobe bei Neukodierungen (0 = keine Qualitätsmessung)")
 ):
     """
     Konvertiert alle nicht H.264 oder HEVC Videos in einem Verzeichnis nach HEVC mit HandBrakeCLI.
     WebM-Dateien mit H.264 oder HEVC werden ohne Neukodierung in einen MP4-Container remuxt.
     Mit der Option --force-remux-mp4-h264 werden MP4-Dateien mit H.264 Codec ebenfalls remuxt.
+    Remux- und Kodierungsjobs laufen in getrennten Pools parallel, die längsten Jobs zuerst.
+    Der Zustand jedes Jobs wird in einer SQLite-Datenbank gespeichert: Ein erneuter Aufruf setzt
+    unterbrochene Jobs fort und wiederholt fehlgeschlagene Jobs mit zunehmender Wartezeit.
+    Mit --segments werden lange Videos an Keyframes geteilt, parallel kodiert und verlustfrei zusammengefügt.
+    Eine Vorabanalyse liest alle Dateien parallel ein, zeigt den geschätzten Aufwand und merkt sich die
+    Ergebnisse pro Datei, sodass unveränderte Dateien beim nächsten Lauf nicht erneut gelesen werden.
+    Jede Ausgabedatei wird anhand von Metadaten und dekodierten Stichproben gegen die Quelle geprüft;
+    nur bei bestandener Prüfung wird das Original zum Löschen freigegeben.
     """
     # Zähler initialisieren
     total_videos = 0
     converted_videos = 0
     remuxed_videos = 0
     skipped_videos = 0
-    pending_videos = 0
 
     # Listen für spätere Aktionen
     original_files_to_delete: List[str] = []
@@ -64,164 +103,121 @@ def convert_videos_with_handbrake_command(
     # Filtere nur Videodateien basierend auf den Erweiterungen
     video_files = [
         f for f in files
-        if os.path.isfile(os.path.join(directory, f)) and
+        if not f.startswith('.') and  # versteckte Dateien, u.a. temporäre Ausgaben ('.*.part.mp4')
+        os.path.isfile(os.path.join(directory, f)) and
         os.path.splitext(f)[1].lower() in VIDEO_EXTENSIONS
     ]
     total_videos = len(video_files)
-    pending_videos = total_videos
 
     if total_videos == 0:
         typer.secho("Keine Videodateien zum Konvertieren gefunden.", fg=typer.colors.YELLOW)
         raise typer.Exit()
 
-    typer.secho(f"Insgesamt {total_videos} Videodatei(en) gefunden. Beginne mit der Konvertierung...", fg=typer.colors.BLUE)
-
-    with Progress(
-        SpinnerColumn(),
-        "[progress.description]{task.description}",
-        BarColumn(),
-        TimeElapsedColumn(),
-        transient=True
-    ) as progress:
-        task = progress.add_task("[green]Konvertiere Videos...", total=total_videos)
-        for index, video_file in enumerate(video_files, start=1):
-            file_path = os.path.join(directory, video_file)
-            codec = get_video_codec(file_path)
-
-            if codec is None:
-                skipped_videos += 1
-                pending_videos -= 1
-                progress.update(task, advance=1)
-                continue
-
-            # Erstelle den Ausgabedateinamen
-            base_name, extension = os.path.splitext(video_file)
-            output_file = f"{base_name}{postfix}{OUTPUT_EXTENSION}"
-            output_path = os.path.join(directory, output_file)
-
-            # Überprüfe, ob die Ausgabedatei bereits existiert
-            if os.path.exists(output_path):
-                skipped_videos += 1
-                pending_videos -= 1
-                progress.update(task, advance=1)
-                continue
-
-            # Prüfe, ob die Datei eine WebM-Datei mit HEVC oder H.264 ist
-            if extension.lower() == '.webm' and codec.lower() in ['hevc', 'h264']:
-                remux_type = "WebM"
-                typer.echo(f"[{index}/{total_videos}] Remux '{video_file}' zu MP4 ohne Neukodierung...")
-                # Baue den FFmpeg-Befehl zum Remuxen
-                cmd = [
-                    'ffmpeg',
-                    '-y',  # Überschreibt bestehende Dateien ohne Nachfrage
-                    '-i', file_path,
-                    '-c', 'copy',
-                    '-movflags', 'faststart',  # Optional für bessere Streaming-Performance
-                    output_path
-                ]
-
-                logger.debug(f"Führe FFmpeg mit folgendem Befehl aus: {' '.join(cmd)}")
-
-                # Führe den FFmpeg-Prozess aus
-                process = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-
-                if process.returncode != 0:
-                    skipped_videos += 1
-                    pending_videos -= 1
-                    progress.update(task, advance=1)
-                    continue
-
-                remuxed_videos += 1
-                pending_videos -= 1
-
-                # Speichere die Dateien für spätere Aktionen
-                original_files_to_delete.append(file_path)
-                processed_files.append(output_path)
-
-            # Prüfe, ob die Datei ein MP4 mit H.264 Codec ist und das Remuxing erzwungen werden soll
-            elif extension.lower() == '.mp4' and codec.lower() == 'h264' and force_remux_mp4_h264:
-                remux_type = "MP4-H264 (erzwingt)"
-                typer.echo(f"[{index}/{total_videos}] Remux '{video_file}' zu MP4 ohne Neukodierung (erzwingt)...")
-                # Baue den FFmpeg-Befehl zum Remuxen
-                cmd = [
-                    'ffmpeg',
-                    '-y',  # Überschreibt bestehende Dateien ohne Nachfrage
-                    '-i', file_path,
-                    '-c', 'copy',
-                    '-movflags', 'faststart',  # Optional für bessere Streaming-Performance
-                    output_path
-                ]
-
-                logger.debug(f"Führe FFmpeg mit folgendem Befehl aus: {' '.join(cmd)}")
-
-                # Führe den FFmpeg-Prozess aus
-                process = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-
-                if process.returncode != 0:
-                    skipped_videos += 1
-                    pending_videos -= 1
-                    progress.update(task, advance=1)
-                    continue
-
-                remuxed_videos += 1
-                pending_videos -= 1
-
-                # Speichere die Dateien für spätere Aktionen
-                original_files_to_delete.append(file_path)
-                processed_files.append(output_path)
-
-            # Überspringe bereits kompatible MP4-Dateien mit HEVC oder H.264 (ohne erzwungenes Remuxing)
-            elif extension.lower() == '.mp4' and codec.lower() in ['hevc', 'h264']:
-                skipped_videos += 1
-                pending_videos -= 1
-                progress.update(task, advance=1)
-                continue
-
-            else:
-                # Ansonsten konvertiere mit HandBrakeCLI
-                typer.echo(f"[{index}/{total_videos}] Konvertiere '{video_file}' mit HandBrakeCLI...")
-                # Baue den HandBrakeCLI Befehl
-                cmd = [
-                    'HandBrakeCLI',
-                    '--preset-import-file', preset_file,
-                    '--preset', preset,
-                    '-i', file_path,
-                    '-o', output_path
-                ]
-
-                logger.debug(f"Führe HandBrakeCLI mit folgendem Befehl aus: {' '.join(cmd)}")
-
-                try:
-                    # Führe den HandBrakeCLI Prozess aus und gebe die Ausgaben aus
-                    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-
-                    for line in process.stdout:
-                        print(line, end='')
-
-                    process.wait()
-                    returncode = process.returncode
-
-                    if returncode != 0:
-                        skipped_videos += 1
-                        pending_videos -= 1
-                        progress.update(task, advance=1)
-                        continue
-
-                    converted_videos += 1
-                    pending_videos -= 1
-
-                    # Speichere die Dateien für spätere Aktionen
-                    original_files_to_delete.append(file_path)
-                    processed_files.append(output_path)
+    typer.secho(f"Insgesamt {total_videos} Videodatei(en) gefunden. Beginne mit der Vorabanalyse...", fg=typer.colors.BLUE)
+
+    # Persistente Warteschlange, damit ein abgebrochener Lauf genau dort fortgesetzt wird
+    job_queue = JobQueue(job_db, max_attempts=max_attempts)
+    preset_hashes = {
+        JOB_KIND_REMUX: compute_preset_hash(JOB_KIND_REMUX),
+        JOB_KIND_ENCODE: compute_preset_hash(JOB_KIND_ENCODE, preset_file, preset),
+    }
+
+    # Vorabanalyse: alle Dateien parallel (bzw. aus dem Cache) lesen und einordnen
+    file_paths = [os.path.join(directory, video_file) for video_file in video_files]
+    probe_cache = ProbeCache(job_db)
+    try:
+        probes = probe_videos(file_paths, cache=probe_cache, workers=probe_jobs)
+    finally:
+        probe_cache.close()
+
+    # Jobs planen: Remux (ffmpeg, I/O-gebunden) oder Encode (HandBrakeCLI, CPU-gebunden)
+    jobs: List[Dict[str, Any]] = []
+    decisions: List[Dict[str, Any]] = []
+    for file_path in file_paths:
+        probe = probes.get(file_path)
+        action, reason = classify_video(file_path, probe, force_remux_mp4_h264)
+        decision = {'file_path': file_path, 'action': action, 'reason': reason}
+        if probe:
+            decision.update(size=probe['size'], duration=probe['duration'])
+        decisions.append(decision)
+
+        if action == ACTION_SKIP:
+            continue
+
+        job = create_job(file_path, action, probe, postfix)
+
+        # Ausgabedateien ohne Eintrag in der Warteschlange stammen aus Läufen vor der Job-Datenbank
+        if job_queue.get_job(file_path) is None and os.path.exists(job['output_path']):
+            decision.update(action=ACTION_SKIP, reason="Ausgabedatei existiert bereits")
+            continue
+
+        # Abgeschlossene oder endgültig fehlgeschlagene Jobs überspringen, unterbrochene fortsetzen
+        if not job_queue.enqueue(job, preset_hashes[action]):
+            decision.update(action=ACTION_SKIP, reason="Laut Job-Datenbank abgeschlossen oder endgültig fehlgeschlagen")
+            continue
+
+        jobs.append(job)
+
+    skipped_videos = sum(1 for decision in decisions if decision['action'] == ACTION_SKIP)
+    print_preflight_summary(decisions)
+
+    if not jobs:
+        job_queue.close()
+        typer.secho("Keine Videodateien zu verarbeiten.", fg=typer.colors.YELLOW)
+        raise typer.Exit()
 
-                except KeyboardInterrupt:
-                    typer.secho("Abbruchsignal erhalten. Beende laufenden HandBrakeCLI-Prozess...", fg=typer.colors.RED)
-                    process.terminate()
-                    process.wait()
-                    raise typer.Exit()
+    # Segmentierte Kodierungen sind bereits parallel, deshalb standardmässig nur eine Datei gleichzeitig
+    encode_workers = encode_jobs or (1 if segments > 1 else default_encode_workers(threads_per_job))
+
+    reporter = ProgressReporter(jobs, log_path=progress_log)
+    runner = JobRunner(
+        job_queue,
+        preset_file,
+        preset,
+        reporter=reporter,
+        max_attempts=max_attempts,
+        retry_backoff=retry_backoff,
+        segments=segments,
+        segment_min_duration=segment_min_duration,
+        verify=verify,
+        verify_samples=verify_samples,
+        verify_sample_seconds=verify_sample_seconds,
+        min_ssim=min_ssim
+    )
 
-            # Fortschritt anzeigen nach jeder Datei
-            progress.update(task, advance=1)
+    def on_job_start(job: Dict[str, Any]):
+        reporter.start_job(job)
+
+    def on_job_done(job: Dict[str, Any], success: bool):
+        nonlocal converted_videos, remuxed_videos, skipped_videos
+        reporter.finish_job(job, success)
+        if not success:
+            skipped_videos += 1
+            return
+
+        if job['kind'] == JOB_KIND_REMUX:
+            remuxed_videos += 1
+        else:
+            converted_videos += 1
+        # Speichere die Dateien für spätere Aktionen
+        original_files_to_delete.append(job['input_path'])
+        processed_files.append(job['output_path'])
+
+    with reporter:
+        try:
+            run_jobs(
+                jobs,
+                runner.run,
+                on_job_start=on_job_start,
+                on_job_done=on_job_done,
+                encode_workers=encode_workers,
+                remux_workers=remux_jobs
+            )
+        except KeyboardInterrupt:
+            typer.secho("Abbruchsignal erhalten. Alle laufenden Prozesse wurden beendet.", fg=typer.colors.RED)
+            raise typer.Exit()
+        finally:
+            job_queue.close()
 
     # Nach der Verarbeitung: Entscheide, ob Originale gelöscht und Dateien umbenannt werden sollen
     if not keep_original and (converted_videos + remuxed_videos) > 0:
@@ -0,0 +1,158 @@
+# src/video_compressor/commands/estimate_savings.py
+
+import re
+import typer
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+import logging
+from rich.console import Console
+from rich.table import Table
+from metadata_manager.commands.get_recording_date import parse_date_from_string
+from video_compressor.file_utils import VIDEO_EXTENSIONS
+from video_compressor.estimation import (
+    estimate_output_size, heuristic_bitrate, read_preset_bitrate, sample_bitrate
+)
+from video_compressor.job_queue import DEFAULT_JOB_DB_PATH
+from video_compressor.job_runner import build_handbrake_command
+from video_compressor.preflight import classify_video
+from video_compressor.probe import DEFAULT_PROBE_WORKERS, ProbeCache, probe_videos
+from video_compressor.scheduler import JOB_KIND_ENCODE, default_encode_workers
+
+logger = logging.getLogger(__name__)
+console = Console()
+
+# Speicherkosten pro GB gemäss docs/archiving-costs.md
+DEFAULT_PRICE_PER_GB = 0.020875
+
+def recording_year(file_path: Path, directory: Path) -> str:
+    """
+    Bestimmt das Jahr einer Datei: Datum im relativen Pfad oder Dateinamen, Jahresverzeichnis,
+    sonst das Änderungsdatum der Datei.
+    """
+    relative_path = str(file_path.relative_to(directory))
+    date = parse_date_from_string(relative_path)
+    if date:
+        return str(date.year)
+    for part in file_path.relative_to(directory).parts[:-1]:
+        if re.fullmatch(r"\d{4}", part):
+            return part
+    return str(datetime.fromtimestamp(file_path.stat().st_mtime).year)
+
+def estimate_savings_command(
+    directory: Path = typer.Argument(..., help="Pfad zum Verzeichnis mit den Videodateien"),
+    preset_file: str = typer.Option(
+        '/Users/patrickkurmann/Library/Containers/fr.handbrake.HandBrake/Data/Library/Application Support/HandBrake/UserPresets.json',
+        help="Pfad zur Preset-Datei (JSON)"
+    ),
+    preset: str = typer.Option("YouTube", help="Name des HandBrakeCLI Presets"),
+    target_bitrate: float = typer.Option(0.0, "--target-bitrate", help="Zielbitrate in Mbit/s (überschreibt Preset und Schätzung)"),
+    sample: bool = typer.Option(False, "--sample", help="Kalibriert die Schätzung mit kurzen Probekodierungen pro Datei"),
+    sample_count: int = typer.Option(3, "--sample-count", help="Anzahl Probeabschnitte pro Datei"),
+    sample_seconds: float = typer.Option(10.0, "--sample-seconds", help="Länge eines Probeabschnitts in Sekunden"),
+    probe_jobs: int = typer.Option(DEFAULT_PROBE_WORKERS, "--probe-jobs", help="Anzahl paralleler ffprobe-Aufrufe"),
+    job_db: Path = typer.Option(DEFAULT_JOB_DB_PATH, "--job-db", help="Pfad zur SQLite-Datenbank mit dem ffprobe-Cache"),
+    price_per_gb: float = typer.Option(DEFAULT_PRICE_PER_GB, "--price-per-gb", help="Speicherkosten in CHF pro GB")
+):
+    """
+    Schätzt die Speicherersparnis einer Komprimierung aller Videos eines Verzeichnisbaums, ohne zu kodieren.
+
+    Dauer und Bitrate werden parallel mit ffprobe gelesen (mit Cache). Die Zielbitrate stammt aus
+    --target-bitrate, einem Preset mit durchschnittlicher Bitrate oder einem Erfahrungswert nach Auflösung.
+    Mit --sample werden pro Datei einige kurze Abschnitte probeweise kodiert, um die Schätzung zu kalibrieren.
+    Die Ersparnis wird pro Ordner und pro Jahr ausgewiesen.
+    """
+    if not directory.is_dir():
+        typer.secho(f"Das Verzeichnis '{directory}' existiert nicht.", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+    directory = directory.resolve()
+    file_paths = sorted(
+        str(path) for path in directory.rglob("*")
+        if path.is_file() and not path.name.startswith(".") and path.suffix.lower() in VIDEO_EXTENSIONS
+    )
+    if not file_paths:
+        typer.secho("Keine Videodateien gefunden.", fg=typer.colors.YELLOW)
+        raise typer.Exit()
+
+    typer.secho(f"Lese {len(file_paths)} Videodatei(en)...", fg=typer.colors.BLUE)
+    probe_cache = ProbeCache(job_db)
+    try:
+        probes = probe_videos(file_paths, cache=probe_cache, workers=probe_jobs)
+    finally:
+        probe_cache.close()
+
+    preset_bitrate = int(target_bitrate * 1_000_000) if target_bitrate else read_preset_bitrate(preset_file, preset)
+
+    entries: List[Dict[str, Any]] = []
+    for file_path in file_paths:
+        probe = probes.get(file_path)
+        if probe is None:
+            continue
+        action, _ = classify_video(file_path, probe)
+        entries.append({
+            'path': Path(file_path),
+            'probe': probe,
+            'encode': action == JOB_KIND_ENCODE,
+            'bitrate': preset_bitrate or heuristic_bitrate(probe['height']),
+        })
+
+    if sample:
+        encode_entries = [entry for entry in entries if entry['encode']]
+        typer.secho(f"Probekodierung von {len(encode_entries)} Datei(en)...", fg=typer.colors.BLUE)
+
+        def calibrate(entry: Dict[str, Any]):
+            measured = sample_bitrate(
+                str(entry['path']),
+                entry['probe']['duration'],
+                lambda source, target: build_handbrake_command(source, target, preset_file, preset),
+                sample_count,
+                sample_seconds
+            )
+            if measured:
+                entry['bitrate'] = measured
+
+        with ThreadPoolExecutor(max_workers=default_encode_workers()) as pool:
+            list(pool.map(calibrate, encode_entries))
+
+    by_folder: Dict[str, List[int]] = {}
+    by_year: Dict[str, List[int]] = {}
+    for entry in entries:
+        size = entry['probe']['size']
+        estimated = estimate_output_size(size, entry['probe']['duration'], entry['bitrate']) if entry['encode'] else size
+        folder = str(entry['path'].parent.relative_to(directory)) or "."
+        year = recording_year(entry['path'], directory)
+        for key, summary in ((folder, by_folder), (year, by_year)):
+            totals = summary.setdefault(key, [0, 0, 0])
+            totals[0] += 1
+            totals[1] += size
+            totals[2] += estimated
+
+    print_savings_table("Ersparnis pro Ordner", "Ordner", by_folder, price_per_gb)
+    print_savings_table("Ersparnis pro Jahr", "Jahr", by_year, price_per_gb)
+
+def print_savings_table(title: str, key_label: str, summary: Dict[str, List[int]], price_per_gb: float):
+    """Zeigt aktuelle und geschätzte Grösse sowie die Ersparnis pro Gruppe und gesamthaft an."""
+    table = Table(title=title, style="bright_green")
+    table.add_column(key_label, style="cyan")
+    table.add_column("Dateien", justify="right", style="green")
+    table.add_column("Aktuell (GB)", justify="right", style="yellow")
+    table.add_column("Geschätzt (GB)", justify="right", style="yellow")
+    table.add_column("Ersparnis (GB)", justify="right", style="magenta")
+    table.add_column("Ersparnis (%)", justify="right", style="magenta")
+    table.add_column("Ersparnis (CHF)", justify="right", style="blue")
+
+    def add_row(label: str, count: int, size: int, estimated: int, **kwargs):
+        saved = size - estimated
+        percent = saved / size * 100 if size else 0.0
+        table.add_row(
+            label, str(count), f"{size / 1e9:.2f}", f"{estimated / 1e9:.2f}",
+            f"{saved / 1e9:.2f}", f"{percent:.0f}", f"{saved / 1e9 * price_per_gb:.2f}", **kwargs
+        )
+
+    for key in sorted(summary):
+        add_row(key, *summary[key])
+    totals = [sum(values[i] for values in summary.values()) for i in range(3)]
+    add_row("Total", *totals, style="bold")
+    console.print(table)
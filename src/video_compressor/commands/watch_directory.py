@@ -0,0 +1,174 @@
+# src/video_compressor/commands/watch_directory.py
+
+import os
+import typer
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional
+import logging
+from video_compressor.commands.convert_with_handbrake import OUTPUT_EXTENSION, POSTFIX, create_job
+from video_compressor.file_utils import VIDEO_EXTENSIONS
+from video_compressor.job_queue import DEFAULT_JOB_DB_PATH, DEFAULT_MAX_ATTEMPTS, JobQueue, compute_preset_hash
+from video_compressor.job_runner import JobRunner
+from video_compressor.preflight import ACTION_SKIP, classify_video
+from video_compressor.probe import ProbeCache, probe_videos
+from video_compressor.progress import ProgressReporter
+from video_compressor.scheduler import (
+    JOB_KIND_ENCODE, JOB_KIND_REMUX, DEFAULT_REMUX_WORKERS, DEFAULT_THREADS_PER_JOB,
+    default_encode_workers, terminate_all_processes
+)
+from video_compressor.verification import DEFAULT_MIN_SSIM, DEFAULT_SAMPLE_COUNT, DEFAULT_SAMPLE_SECONDS
+from fs_watch.watcher import DEFAULT_POLL_INTERVAL, DEFAULT_SETTLE_SECONDS, StabilityTracker, create_watcher
+
+logger = logging.getLogger(__name__)
+
+# Wartezeit zwischen zwei Prüfungen, solange Dateien auf ihre Stabilität warten
+CHECK_INTERVAL = 1.0
+IDLE_TIMEOUT = 60.0
+
+def watch_directory_command(
+    directory: Path = typer.Argument(..., help="Pfad zum überwachten Verzeichnis"),
+    preset_file: str = typer.Option(
+        '/Users/patrickkurmann/Library/Containers/fr.handbrake.HandBrake/Data/Library/Application Support/HandBrake/UserPresets.json',
+        help="Pfad zur Preset-Datei (JSON)"
+    ),
+    preset: str = typer.Option("YouTube", help="Name des HandBrakeCLI Presets"),
+    postfix: str = typer.Option(POSTFIX, help="Postfix für die Ausgabedateien"),
+    delete_original: bool = typer.Option(False, "--delete-original", help="Geprüfte Originale löschen und die Ausgabedatei umbenennen"),
+    recursive: bool = typer.Option(False, "--recursive", help="Unterverzeichnisse ebenfalls überwachen"),
+    settle_seconds: float = typer.Option(DEFAULT_SETTLE_SECONDS, "--settle-seconds", help="Sekunden ohne Änderung, bis eine Datei als fertig gilt"),
+    poll_interval: float = typer.Option(DEFAULT_POLL_INTERVAL, "--poll-interval", help="Abfrageintervall in Sekunden, falls inotify nicht verfügbar ist"),
+    encode_jobs: int = typer.Option(0, "--encode-jobs", help="Anzahl paralleler HandBrakeCLI-Kodierungen (0 = CPU-Kerne / Threads pro Job)"),
+    threads_per_job: int = typer.Option(DEFAULT_THREADS_PER_JOB, "--threads-per-job", help="Geschätzte Threads pro Kodierung zur Berechnung der Parallelität"),
+    remux_jobs: int = typer.Option(DEFAULT_REMUX_WORKERS, "--remux-jobs", help="Anzahl paralleler Remux-Vorgänge mit FFmpeg"),
+    job_db: Path = typer.Option(DEFAULT_JOB_DB_PATH, "--job-db", help="Pfad zur SQLite-Datenbank mit dem Zustand der Jobs"),
+    max_attempts: int = typer.Option(DEFAULT_MAX_ATTEMPTS, "--max-attempts", help="Maximale Anzahl Versuche pro Datei"),
+    retry_backoff: float = typer.Option(30.0, "--retry-backoff", help="Wartezeit in Sekunden vor dem ersten erneuten Versuch (verdoppelt sich pro Versuch)"),
+    progress_log: Optional[Path] = typer.Option(None, "--progress-log", help="Schreibt den Fortschritt zusätzlich als JSON-Lines in diese Datei"),
+    verify: bool = typer.Option(True, "--verify/--no-verify", help="Prüft jede Ausgabedatei, bevor das Original gelöscht wird"),
+    verify_samples: int = typer.Option(DEFAULT_SAMPLE_COUNT, "--verify-samples", help="Anzahl dekodierter Stichproben pro Ausgabedatei"),
+    verify_sample_seconds: float = typer.Option(DEFAULT_SAMPLE_SECONDS, "--verify-sample-seconds", help="Länge einer Stichprobe in Sekunden"),
+    min_ssim: float = typer.Option(DEFAULT_MIN_SSIM, "--min-ssim", help="Minimaler SSIM-Wert pro Stichprobe bei Neukodierungen (0 = keine Qualitätsmessung)")
+):
+    """
+    Überwacht ein Verzeichnis und komprimiert neue Videos fortlaufend, bis der Dienst mit Ctrl+C beendet wird.
+
+    Unter Linux wird inotify verwendet, sonst wird das Verzeichnis regelmässig eingelesen. Eine Datei wird
+    erst verarbeitet, wenn sich ihre Grösse während --settle-seconds nicht verändert hat und keine .sb-*
+    Dateien mehr existieren. Die Jobs laufen wie bei `convert-to-hevc` über die Job-Datenbank und die
+    parallelen Remux- und Kodierungspools; Datenbank und ffprobe-Cache bleiben zwischen den Ereignissen geöffnet.
+    Bereits vorhandene Videos werden beim Start ebenfalls eingeplant.
+    """
+    if not directory.is_dir():
+        typer.secho(f"Das Verzeichnis '{directory}' existiert nicht.", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+    directory = directory.resolve()
+
+    job_queue = JobQueue(job_db, max_attempts=max_attempts)
+    probe_cache = ProbeCache(job_db)
+    preset_hashes = {
+        JOB_KIND_REMUX: compute_preset_hash(JOB_KIND_REMUX),
+        JOB_KIND_ENCODE: compute_preset_hash(JOB_KIND_ENCODE, preset_file, preset),
+    }
+    reporter = ProgressReporter([], log_path=progress_log)
+    runner = JobRunner(
+        job_queue,
+        preset_file,
+        preset,
+        reporter=reporter,
+        max_attempts=max_attempts,
+        retry_backoff=retry_backoff,
+        verify=verify,
+        verify_samples=verify_samples,
+        verify_sample_seconds=verify_sample_seconds,
+        min_ssim=min_ssim
+    )
+    encode_pool = ThreadPoolExecutor(
+        max_workers=encode_jobs or default_encode_workers(threads_per_job), thread_name_prefix="encode"
+    )
+    remux_pool = ThreadPoolExecutor(max_workers=max(1, remux_jobs), thread_name_prefix="remux")
+    futures: Dict[Future, Dict[str, Any]] = {}
+    output_suffix = f"{postfix}{OUTPUT_EXTENSION}".lower()
+
+    def is_candidate(file_path: str) -> bool:
+        name = os.path.basename(file_path)
+        return (
+            not name.startswith(".") and  # versteckte Dateien, u.a. temporäre Ausgaben ('.*.part.mp4')
+            os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS and
+            not name.lower().endswith(output_suffix)
+        )
+
+    def run(job: Dict[str, Any]) -> bool:
+        reporter.start_job(job)
+        try:
+            return runner.run(job)
+        except Exception as e:
+            logger.error(f"Fehler beim Ausführen des Jobs {job['input_path']}: {e}")
+            return False
+
+    def schedule(file_path: str):
+        probe = probe_videos([file_path], cache=probe_cache).get(file_path)
+        action, reason = classify_video(file_path, probe)
+        if action == ACTION_SKIP:
+            logger.info(f"Überspringe {file_path}: {reason}")
+            return
+
+        job = create_job(file_path, action, probe, postfix)
+        if job_queue.get_job(file_path) is None and os.path.exists(job['output_path']):
+            logger.info(f"Überspringe {file_path}: Ausgabedatei existiert bereits")
+            return
+        if not job_queue.enqueue(job, preset_hashes[action]):
+            logger.info(f"Überspringe {file_path}: Laut Job-Datenbank abgeschlossen oder endgültig fehlgeschlagen")
+            return
+
+        reporter.add_job(job)
+        pool = remux_pool if action == JOB_KIND_REMUX else encode_pool
+        futures[pool.submit(run, job)] = job
+
+    def finish(future: Future):
+        job = futures.pop(future)
+        success = future.result()
+        reporter.finish_job(job, success)
+        if not success or not delete_original:
+            return
+
+        try:
+            os.remove(job['input_path'])
+            base_name = os.path.splitext(os.path.basename(job['input_path']))[0]
+            final_path = os.path.join(os.path.dirname(job['output_path']), f"{base_name}{OUTPUT_EXTENSION}")
+            os.rename(job['output_path'], final_path)
+            logger.info(f"{job['input_path']} wurde durch {final_path} ersetzt.")
+        except OSError as e:
+            typer.secho(f"Fehler beim Ersetzen von '{os.path.basename(job['input_path'])}': {e}", fg=typer.colors.RED)
+
+    tracker = StabilityTracker(settle_seconds)
+    pattern = "**/*" if recursive else "*"
+    for path in directory.glob(pattern):
+        if path.is_file() and is_candidate(str(path)):
+            tracker.track(str(path))
+
+    watcher = create_watcher(str(directory), recursive, poll_interval)
+    typer.secho(f"Überwache '{directory}'. Beenden mit Ctrl+C.", fg=typer.colors.BLUE)
+
+    with reporter:
+        try:
+            while True:
+                timeout = CHECK_INTERVAL if len(tracker) or futures else IDLE_TIMEOUT
+                for file_path in watcher.poll(timeout):
+                    if is_candidate(file_path):
+                        tracker.track(file_path)
+                for file_path in tracker.pop_stable():
+                    schedule(file_path)
+                for future in [future for future in futures if future.done()]:
+                    finish(future)
+        except KeyboardInterrupt:
+            typer.secho("Abbruchsignal erhalten. Beende alle laufenden Prozesse...", fg=typer.colors.RED)
+            for future in futures:
+                future.cancel()
+            terminate_all_processes()
+        finally:
+            encode_pool.shutdown(wait=True)
+            remux_pool.shutdown(wait=True)
+            watcher.close()
+            probe_cache.close()
+            job_queue.close()
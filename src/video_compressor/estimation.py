@@ -0,0 +1,147 @@
+# src/video_compressor/estimation.py
+
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Callable, Dict, List, Optional
+import logging
+from video_compressor.scheduler import run_process
+from video_compressor.verification import sample_offsets
+
+logger = logging.getLogger(__name__)
+
+# Erfahrungswerte für HEVC mit konstanter Qualität (Bit pro Sekunde), nach Bildhöhe absteigend
+HEVC_BITRATE_BY_HEIGHT = [
+    (2160, 16_000_000),
+    (1440, 10_000_000),
+    (1080, 6_000_000),
+    (720, 3_000_000),
+    (0, 1_500_000),
+]
+DEFAULT_AUDIO_BITRATE = 160_000
+
+def _find_preset(presets: List[Dict[str, Any]], name: str) -> Optional[Dict[str, Any]]:
+    """Sucht ein Preset rekursiv, da HandBrake Presets in Ordnern ('ChildrenArray') ablegen kann."""
+    for preset in presets:
+        if preset.get("PresetName") == name:
+            return preset
+        found = _find_preset(preset.get("ChildrenArray", []), name)
+        if found:
+            return found
+    return None
+
+def _load_preset(preset_file: str, preset: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(preset_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Preset-Datei {preset_file} konnte nicht gelesen werden: {e}")
+        return None
+
+    entry = _find_preset(data.get("PresetList", []), preset)
+    if entry is None:
+        logger.warning(f"Preset '{preset}' nicht in {preset_file} gefunden.")
+    return entry
+
+def read_preset_bitrate(preset_file: str, preset: str) -> Optional[int]:
+    """
+    Liest die Zielbitrate (Video und Audio) aus einer HandBrake-Preset-Datei.
+
+    Returns:
+        int | None: Bitrate in Bit pro Sekunde, oder None, wenn das Preset mit konstanter Qualität
+        arbeitet oder nicht gefunden wurde.
+    """
+    entry = _load_preset(preset_file, preset)
+    if entry is None:
+        return None
+
+    # VideoQualityType 1 = durchschnittliche Bitrate, 2 = konstante Qualität
+    if entry.get("VideoQualityType") != 1 or not entry.get("VideoAvgBitrate"):
+        return None
+
+    audio_bitrate = sum(int(audio.get("AudioBitrate") or 0) * 1000 for audio in entry.get("AudioList", []))
+    return int(entry["VideoAvgBitrate"]) * 1000 + (audio_bitrate or DEFAULT_AUDIO_BITRATE)
+
+def read_preset_picture(preset_file: str, preset: str) -> Optional[Dict[str, Any]]:
+    """
+    Liest die Bildgrösse aus einer HandBrake-Preset-Datei.
+
+    Returns:
+        Dict | None: 'max_width' und 'max_height' (0 = unbegrenzt), 'upscale' (Hochskalieren erlaubt) und
+        'crop' (automatisches Zuschneiden aktiv), oder None, wenn das Preset nicht gefunden wurde.
+    """
+    entry = _load_preset(preset_file, preset)
+    if entry is None:
+        return None
+
+    # PictureCropMode (ab HandBrake 1.5): 0 = automatisch, 1 = konservativ, 2 = keines, 3 = benutzerdefiniert
+    if "PictureCropMode" in entry:
+        crop = entry["PictureCropMode"] != 2
+    else:
+        crop = bool(entry.get("PictureAutoCrop", True))
+    return {
+        "max_width": int(entry.get("PictureWidth") or 0),
+        "max_height": int(entry.get("PictureHeight") or 0),
+        "upscale": bool(entry.get("PictureAllowUpscaling", False)),
+        "crop": crop,
+    }
+
+def heuristic_bitrate(height: int) -> int:
+    """Schätzt die Bitrate einer HEVC-Kodierung mit konstanter Qualität anhand der Bildhöhe."""
+    for min_height, bitrate in HEVC_BITRATE_BY_HEIGHT:
+        if height >= min_height:
+            return bitrate + DEFAULT_AUDIO_BITRATE
+    return HEVC_BITRATE_BY_HEIGHT[-1][1] + DEFAULT_AUDIO_BITRATE
+
+def sample_bitrate(
+    file_path: str,
+    duration: float,
+    build_encode_command: Callable[[str, str], List[str]],
+    sample_count: int,
+    sample_seconds: float
+) -> Optional[int]:
+    """
+    Kodiert einige kurze Abschnitte probeweise und misst die resultierende Bitrate.
+
+    Args:
+        file_path (str): Pfad zur Quelldatei.
+        duration (float): Dauer der Quelldatei in Sekunden.
+        build_encode_command (Callable): Baut den Kodierungsbefehl für (Eingabe, Ausgabe) mit den gewählten Einstellungen.
+        sample_count (int): Anzahl Abschnitte.
+        sample_seconds (float): Länge eines Abschnitts in Sekunden.
+
+    Returns:
+        int | None: Gemessene Bitrate in Bit pro Sekunde, oder None, wenn keine Probe gelang.
+    """
+    work_dir = tempfile.mkdtemp(prefix="video-compressor-sample-")
+    total_bytes = 0
+    total_seconds = 0.0
+    try:
+        for index, offset in enumerate(sample_offsets(duration, sample_count, sample_seconds)):
+            length = min(sample_seconds, duration - offset) if duration else sample_seconds
+            sample_path = os.path.join(work_dir, f"sample_{index}.mp4")
+            cmd = build_encode_command(file_path, sample_path) + [
+                '--start-at', f"seconds:{int(offset)}",
+                '--stop-at', f"seconds:{max(1, int(length))}",
+            ]
+            if run_process(cmd) != 0 or not os.path.exists(sample_path):
+                logger.warning(f"Probekodierung von {file_path} bei {offset:.0f} s fehlgeschlagen.")
+                continue
+            total_bytes += os.path.getsize(sample_path)
+            total_seconds += max(1, int(length))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if not total_seconds:
+        return None
+    return int(total_bytes * 8 / total_seconds)
+
+def estimate_output_size(size: int, duration: float, bitrate: int) -> int:
+    """
+    Schätzt die Grösse nach der Kodierung. Die Schätzung übersteigt die aktuelle Grösse nicht,
+    da eine Kodierung mit höherer Bitrate als die Quelle keinen Sinn ergibt.
+    """
+    if not duration:
+        return size
+    return min(size, int(bitrate * duration / 8))
@@ -0,0 +1,8 @@
+# src/video_compressor/file_utils.py
+
+# Dateiendungen der Videodateien, die konvertiert, analysiert oder geschätzt werden
+VIDEO_EXTENSIONS = [
+    ".mp4", ".mov", ".avi", ".mkv", ".flv", ".wmv", ".webm", ".mpeg", ".mpg",
+    ".m4v", ".3gp", ".3g2", ".mts", ".m2ts", ".ts", ".vob", ".ogv", ".dv",
+    ".f4v", ".rm", ".rmvb"
+]
@@ -0,0 +1,190 @@
+# src/video_compressor/job_queue.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_DB_PATH = Path.home() / "Library/Application Support/Kurmann/Videoschnitt/video_compressor.sqlite"
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Zustände eines Jobs
+STATE_PENDING = "pending"
+STATE_RUNNING = "running"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+def file_identity(file_path: str) -> Tuple[int, int]:
+    """
+    Gibt die Identität einer Datei als (Grösse in Bytes, Änderungszeit in Nanosekunden) zurück.
+    """
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+def compute_preset_hash(kind: str, preset_file: Optional[str] = None, preset: Optional[str] = None) -> str:
+    """
+    Berechnet einen Hash über die Einstellungen eines Jobs, damit geänderte Presets eine erneute Verarbeitung auslösen.
+
+    Args:
+        kind (str): Die Jobart ('remux' oder 'encode').
+        preset_file (str | None): Pfad zur HandBrake-Preset-Datei. Deren Inhalt fliesst in den Hash ein.
+        preset (str | None): Name des HandBrake-Presets.
+
+    Returns:
+        str: SHA-256-Hash als Hex-String.
+    """
+    digest = hashlib.sha256(kind.encode("utf-8"))
+    if preset:
+        digest.update(preset.encode("utf-8"))
+    if preset_file and os.path.isfile(preset_file):
+        with open(preset_file, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def temporary_output_path(output_path: str) -> str:
+    """
+    Gibt den temporären Pfad zurück, in den während der Verarbeitung geschrieben wird.
+    Die Endung bleibt erhalten, damit FFmpeg und HandBrakeCLI den Container korrekt erkennen.
+    """
+    directory, filename = os.path.split(output_path)
+    base_name, extension = os.path.splitext(filename)
+    return os.path.join(directory, f".{base_name}.part{extension}")
+
+class JobQueue:
+    """
+    Persistente Warteschlange für Kompressionsjobs auf Basis von SQLite.
+
+    Jeder Job ist über den Pfad der Eingabedatei identifiziert und speichert Zustand, Dateiidentität,
+    Ausgabepfad, Preset-Hash und Anzahl Versuche. Zugriffe aus mehreren Worker-Threads werden serialisiert.
+    """
+
+    def __init__(self, db_path: Path = DEFAULT_JOB_DB_PATH, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    input_path TEXT PRIMARY KEY,
+                    input_size INTEGER NOT NULL,
+                    input_mtime_ns INTEGER NOT NULL,
+                    output_path TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    preset_hash TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+        logger.debug(f"Job-Datenbank geöffnet: {db_path}")
+
+    def close(self):
+        """Schliesst die Datenbankverbindung."""
+        with self._lock:
+            self._connection.close()
+
+    def get_job(self, input_path: str) -> Optional[Dict[str, Any]]:
+        """Gibt den gespeicherten Job zu einer Eingabedatei zurück, oder None."""
+        with self._lock:
+            row = self._connection.execute("SELECT * FROM jobs WHERE input_path = ?", (input_path,)).fetchone()
+        return dict(row) if row else None
+
+    def enqueue(self, job: Dict[str, Any], preset_hash: str) -> bool:
+        """
+        Gleicht einen geplanten Job mit der Warteschlange ab.
+
+        - Unbekannte Jobs sowie Jobs mit geänderter Eingabedatei oder geändertem Preset werden neu angelegt.
+        - Jobs im Zustand 'running' stammen aus einem abgebrochenen Lauf und werden wieder auf 'pending' gesetzt.
+        - Fehlgeschlagene Jobs werden erneut eingeplant, solange die maximale Anzahl Versuche nicht erreicht ist.
+
+        Args:
+            job (Dict): Job mit den Schlüsseln 'input_path', 'output_path' und 'kind'.
+            preset_hash (str): Hash der Einstellungen, siehe `compute_preset_hash`.
+
+        Returns:
+            bool: True, wenn der Job ausgeführt werden muss, sonst False.
+        """
+        input_path = job['input_path']
+        size, mtime_ns = file_identity(input_path)
+        existing = self.get_job(input_path)
+
+        if existing and existing['input_size'] == size and existing['input_mtime_ns'] == mtime_ns \
+                and existing['preset_hash'] == preset_hash and existing['output_path'] == job['output_path']:
+            state = existing['state']
+            if state == STATE_DONE and os.path.exists(job['output_path']):
+                logger.info(f"Job für {input_path} ist bereits abgeschlossen.")
+                return False
+            if state == STATE_FAILED and existing['attempts'] >= self.max_attempts:
+                logger.warning(f"Job für {input_path} ist {existing['attempts']} Mal fehlgeschlagen und wird übersprungen.")
+                return False
+            attempts = existing['attempts'] if state == STATE_FAILED else 0
+        else:
+            attempts = 0
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                INSERT OR REPLACE INTO jobs
+                    (input_path, input_size, input_mtime_ns, output_path, kind, preset_hash, state, attempts, last_error, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL, ?)
+                """,
+                (input_path, size, mtime_ns, job['output_path'], job['kind'], preset_hash, STATE_PENDING, attempts, time.time())
+            )
+        return True
+
+    def mark_running(self, input_path: str) -> int:
+        """Setzt einen Job auf 'running', erhöht die Anzahl Versuche und gibt diese zurück."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE jobs SET state = ?, attempts = attempts + 1, updated_at = ? WHERE input_path = ?",
+                (STATE_RUNNING, time.time(), input_path)
+            )
+            row = self._connection.execute("SELECT attempts FROM jobs WHERE input_path = ?", (input_path,)).fetchone()
+        return row['attempts'] if row else 1
+
+    def mark_done(self, input_path: str):
+        """Setzt einen Job auf 'done'."""
+        self._set_state(input_path, STATE_DONE, None)
+
+    def mark_failed(self, input_path: str, error: str, final: bool = False):
+        """
+        Setzt einen Job auf 'failed' und speichert die Fehlermeldung.
+
+        Mit `final` gilt der Job als endgültig fehlgeschlagen und wird auch in späteren Läufen nicht wiederholt,
+        bis sich die Eingabedatei oder das Preset ändert.
+        """
+        self._set_state(input_path, STATE_FAILED, error)
+        if final:
+            with self._lock, self._connection:
+                self._connection.execute(
+                    "UPDATE jobs SET attempts = MAX(attempts, ?) WHERE input_path = ?",
+                    (self.max_attempts, input_path)
+                )
+
+    def mark_interrupted(self, input_path: str):
+        """Setzt einen abgebrochenen Job zurück auf 'pending', ohne den Versuch zu zählen."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE jobs SET state = ?, attempts = MAX(attempts - 1, 0), updated_at = ? WHERE input_path = ?",
+                (STATE_PENDING, time.time(), input_path)
+            )
+
+    def _set_state(self, input_path: str, state: str, error: Optional[str]):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE jobs SET state = ?, last_error = ?, updated_at = ? WHERE input_path = ?",
+                (state, error, time.time(), input_path)
+            )
@@ -0,0 +1,189 @@
+# src/video_compressor/job_runner.py
+
+import os
+import typer
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+import logging
+from video_compressor.estimation import read_preset_picture
+from video_compressor.job_queue import DEFAULT_MAX_ATTEMPTS, JobQueue, temporary_output_path
+from video_compressor.progress import FfmpegProgressParser, HandBrakeProgressParser, ProgressReporter
+from video_compressor.scheduler import JOB_KIND_ENCODE, JOB_KIND_REMUX, is_cancelled, run_process, sleep_unless_cancelled
+from video_compressor.segmented_encode import encode_segmented
+from video_compressor.verification import (
+    DEFAULT_MIN_SSIM, DEFAULT_SAMPLE_COUNT, DEFAULT_SAMPLE_SECONDS, verify_output
+)
+
+logger = logging.getLogger(__name__)
+
+def build_remux_command(input_path: str, output_path: str) -> List[str]:
+    """Baut den FFmpeg-Befehl zum Remuxen ohne Neukodierung."""
+    return [
+        'ffmpeg',
+        '-y',  # Überschreibt bestehende Dateien ohne Nachfrage
+        '-loglevel', 'error',
+        '-nostats',
+        '-progress', 'pipe:1',  # Fortschritt als Schlüssel-Wert-Paare auf stdout
+        '-i', input_path,
+        '-c', 'copy',
+        '-movflags', 'faststart',  # Optional für bessere Streaming-Performance
+        output_path
+    ]
+
+def build_handbrake_command(input_path: str, output_path: str, preset_file: str, preset: str) -> List[str]:
+    """Baut den HandBrakeCLI-Befehl für die Kodierung nach HEVC."""
+    return [
+        'HandBrakeCLI',
+        '--preset-import-file', preset_file,
+        '--preset', preset,
+        '--json',  # Fortschritt als JSON-Blöcke
+        '-i', input_path,
+        '-o', output_path
+    ]
+
+def remove_file_if_exists(file_path: str):
+    """Entfernt eine Datei, falls sie existiert (z.B. eine unvollständige temporäre Ausgabe)."""
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Datei {file_path} konnte nicht entfernt werden: {e}")
+
+class JobRunner:
+    """
+    Führt einzelne Remux- und Kodierungsjobs aus, wird von `convert-to-hevc` und `watch` gemeinsam genutzt.
+
+    Jeder Job schreibt in eine temporäre Datei, die erst nach bestandener Prüfung atomar umbenannt wird.
+    Abgestürzte Prozesse werden mit zunehmender Wartezeit wiederholt; der Zustand liegt in der `JobQueue`.
+    Eine fehlgeschlagene Prüfung ist endgültig, da eine erneute Kodierung dasselbe Ergebnis liefern würde.
+    """
+
+    def __init__(
+        self,
+        job_queue: JobQueue,
+        preset_file: str,
+        preset: str,
+        reporter: Optional[ProgressReporter] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_backoff: float = 30.0,
+        segments: int = 0,
+        segment_min_duration: float = 600.0,
+        verify: bool = True,
+        verify_samples: int = DEFAULT_SAMPLE_COUNT,
+        verify_sample_seconds: float = DEFAULT_SAMPLE_SECONDS,
+        min_ssim: float = DEFAULT_MIN_SSIM
+    ):
+        self.job_queue = job_queue
+        self.preset_file = preset_file
+        self.preset = preset
+        self.reporter = reporter
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.segments = segments
+        self.segment_min_duration = segment_min_duration
+        self.verify = verify
+        self.verify_samples = verify_samples
+        self.verify_sample_seconds = verify_sample_seconds
+        self.min_ssim = min_ssim
+        # Erwartete Auflösung der Kodierungen, einmal aus dem Preset gelesen
+        self.picture = read_preset_picture(preset_file, preset) if verify else None
+
+    def _report(self, job: Dict[str, Any], event: Dict[str, Any]):
+        if self.reporter:
+            self.reporter.update_job(job, event)
+
+    def execute(self, job: Dict[str, Any], target_path: str) -> int:
+        """
+        Führt FFmpeg bzw. HandBrakeCLI für einen Job aus und schreibt nach `target_path`.
+
+        Returns:
+            int: Rückgabewert des Prozesses (0 bei Erfolg).
+        """
+        if job['kind'] == JOB_KIND_REMUX:
+            cmd = build_remux_command(job['input_path'], target_path)
+            parser = FfmpegProgressParser(job['duration'])
+            logger.debug(f"Führe FFmpeg mit folgendem Befehl aus: {' '.join(cmd)}")
+        elif self.segments > 1 and job['duration'] >= self.segment_min_duration:
+            logger.info(f"Kodiere {job['input_path']} in {self.segments} parallelen Segmenten.")
+            success = encode_segmented(
+                job['input_path'],
+                target_path,
+                job['duration'],
+                job['fps'],
+                self.segments,
+                lambda segment_input, segment_output: build_handbrake_command(segment_input, segment_output, self.preset_file, self.preset),
+                on_progress=lambda event: self._report(job, event)
+            )
+            return 0 if success else 1
+        else:
+            cmd = build_handbrake_command(job['input_path'], target_path, self.preset_file, self.preset)
+            parser = HandBrakeProgressParser(job['fps'])
+            logger.debug(f"Führe HandBrakeCLI mit folgendem Befehl aus: {' '.join(cmd)}")
+
+        # Nur die letzten Meldungen aufbewahren, um sie im Fehlerfall zu protokollieren
+        output_tail: Deque[str] = deque(maxlen=20)
+
+        def on_output(line: str):
+            event = parser.feed(line)
+            if event:
+                self._report(job, event)
+            elif line.strip():
+                output_tail.append(line.rstrip())
+
+        returncode = run_process(cmd, on_output=on_output)
+        if returncode != 0 and not is_cancelled():
+            logger.error(f"Verarbeitung von {job['input_path']} fehlgeschlagen:\n" + "\n".join(output_tail))
+        return returncode
+
+    def run(self, job: Dict[str, Any]) -> bool:
+        """
+        Führt einen Job inklusive Prüfung und Wiederholungen aus.
+
+        Returns:
+            bool: True, wenn die geprüfte Ausgabedatei unter ihrem endgültigen Namen liegt.
+        """
+        # In eine temporäre Datei schreiben und erst nach Erfolg atomar umbenennen
+        temp_path = temporary_output_path(job['output_path'])
+        while True:
+            attempt = self.job_queue.mark_running(job['input_path'])
+            returncode = self.execute(job, temp_path)
+
+            # Nur geprüfte Ausgaben erhalten den endgültigen Namen und geben das Original zum Löschen frei
+            if returncode == 0 and self.verify:
+                verified, reason = verify_output(
+                    job['input_path'],
+                    temp_path,
+                    picture=self.picture if job['kind'] == JOB_KIND_ENCODE else None,
+                    compare_quality=job['kind'] == JOB_KIND_ENCODE,
+                    sample_count=self.verify_samples,
+                    sample_seconds=self.verify_sample_seconds,
+                    min_ssim=self.min_ssim
+                )
+                logger.info(f"Prüfung von {job['output_path']}: {reason}")
+                if not verified:
+                    # Gleiche Quelle und gleiche Einstellungen ergeben bei jedem Versuch dieselbe Ausgabe
+                    typer.secho(f"Prüfung von '{os.path.basename(job['output_path'])}' fehlgeschlagen, wird nicht wiederholt: {reason}", fg=typer.colors.RED)
+                    remove_file_if_exists(temp_path)
+                    self.job_queue.mark_failed(job['input_path'], f"Prüfung fehlgeschlagen: {reason}", final=True)
+                    return False
+
+            if returncode == 0:
+                os.replace(temp_path, job['output_path'])
+                self.job_queue.mark_done(job['input_path'])
+                return True
+
+            remove_file_if_exists(temp_path)
+            if is_cancelled():
+                self.job_queue.mark_interrupted(job['input_path'])
+                return False
+
+            self.job_queue.mark_failed(job['input_path'], f"Rückgabewert {returncode}")
+            if attempt >= self.max_attempts:
+                typer.secho(f"'{os.path.basename(job['input_path'])}' ist nach {attempt} Versuch(en) fehlgeschlagen.", fg=typer.colors.RED)
+                return False
+
+            delay = self.retry_backoff * 2 ** (attempt - 1)
+            typer.secho(f"'{os.path.basename(job['input_path'])}' fehlgeschlagen. Neuer Versuch in {delay:.0f} Sekunden...", fg=typer.colors.YELLOW)
+            if sleep_unless_cancelled(delay):
+                return False
@@ -0,0 +1,117 @@
+# src/video_compressor/mediainfo.py
+
+import json
+import shutil
+import subprocess
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=1)
+def is_mediainfo_installed() -> bool:
+    """Prüft einmalig pro Prozess, ob MediaInfo im PATH verfügbar ist."""
+    return shutil.which("mediainfo") is not None
+
+@dataclass
+class MediaInfoRecord:
+    """Die für die Kapazitätsplanung relevanten Eigenschaften einer Mediendatei laut MediaInfo."""
+    path: str
+    container: Optional[str] = None
+    size: int = 0
+    duration: float = 0.0
+    overall_bitrate: int = 0
+    video_codec: Optional[str] = None
+    video_profile: Optional[str] = None
+    width: int = 0
+    height: int = 0
+    frame_rate: float = 0.0
+    bit_depth: int = 0
+    hdr_format: Optional[str] = None
+    color_primaries: Optional[str] = None
+    audio_codecs: List[str] = field(default_factory=list)
+    subtitle_count: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Gibt den Datensatz als Dictionary zurück, z.B. für JSON-Ausgaben."""
+        return asdict(self)
+
+def _to_int(value: Any) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+def parse_media(media: Dict[str, Any]) -> MediaInfoRecord:
+    """
+    Wandelt den `media`-Abschnitt der JSON-Ausgabe von MediaInfo in einen Datensatz um.
+
+    Args:
+        media (Dict): Ein Eintrag mit '@ref' (Dateipfad) und 'track' (Liste der Tracks).
+
+    Returns:
+        MediaInfoRecord: Der Datensatz. Nur der erste Videotrack wird berücksichtigt.
+    """
+    record = MediaInfoRecord(path=media.get("@ref", ""))
+    for track in media.get("track", []):
+        track_type = track.get("@type")
+        if track_type == "General":
+            record.container = track.get("Format")
+            record.size = _to_int(track.get("FileSize"))
+            record.duration = _to_float(track.get("Duration"))
+            record.overall_bitrate = _to_int(track.get("OverallBitRate"))
+        elif track_type == "Video" and record.video_codec is None:
+            record.video_codec = track.get("Format")
+            record.video_profile = track.get("Format_Profile")
+            record.width = _to_int(track.get("Width"))
+            record.height = _to_int(track.get("Height"))
+            record.frame_rate = _to_float(track.get("FrameRate"))
+            record.bit_depth = _to_int(track.get("BitDepth"))
+            record.hdr_format = track.get("HDR_Format")
+            record.color_primaries = track.get("colour_primaries")
+        elif track_type == "Audio":
+            record.audio_codecs.append(track.get("Format", "N/A"))
+        elif track_type == "Text":
+            record.subtitle_count += 1
+    return record
+
+def analyze_files(file_paths: List[str]) -> List[MediaInfoRecord]:
+    """
+    Analysiert mehrere Dateien mit einem einzigen Aufruf von `mediainfo --Output=JSON`.
+
+    Args:
+        file_paths (List[str]): Die zu analysierenden Dateien.
+
+    Returns:
+        List[MediaInfoRecord]: Ein Datensatz pro lesbarer Datei. Kann MediaInfo einzelne Dateien nicht lesen,
+        endet es mit einem Fehlercode, liefert die übrigen aber trotzdem; diese werden übernommen.
+    """
+    if not file_paths:
+        return []
+
+    cmd = ["mediainfo", "--Output=JSON", *file_paths]
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    except OSError as e:
+        logger.error(f"Fehler beim Ausführen von MediaInfo: {e}")
+        return []
+
+    if result.stderr.strip():
+        logger.warning(f"MediaInfo meldet: {result.stderr.strip()}")
+    try:
+        output = json.loads(result.stdout)
+    except json.JSONDecodeError as e:
+        logger.error(f"MediaInfo lieferte kein gültiges JSON (Exit-Code {result.returncode}): {e}")
+        return []
+
+    # Bei einer einzelnen Datei liefert MediaInfo ein Objekt, bei mehreren eine Liste
+    entries = output if isinstance(output, list) else [output]
+    return [parse_media(entry["media"]) for entry in entries if isinstance(entry, dict) and entry.get("media")]
@@ -0,0 +1,76 @@
+# src/video_compressor/preflight.py
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+from rich.console import Console
+from rich.table import Table
+from video_compressor.scheduler import JOB_KIND_ENCODE, JOB_KIND_REMUX
+
+logger = logging.getLogger(__name__)
+console = Console()
+
+# Aktion für Dateien, die nicht verarbeitet werden
+ACTION_SKIP = "skip"
+
+def classify_video(
+    file_path: str,
+    probe: Optional[Dict[str, Any]],
+    force_remux_mp4_h264: bool = False
+) -> Tuple[str, str]:
+    """
+    Entscheidet anhand der ffprobe-Ergebnisse, wie eine Videodatei verarbeitet wird.
+
+    - WebM-Dateien mit H.264 oder HEVC werden ohne Neukodierung remuxt.
+    - MP4-Dateien mit H.264 werden nur mit `force_remux_mp4_h264` remuxt, sonst wie HEVC-MP4s übersprungen.
+    - Alle anderen Videos werden mit HandBrakeCLI kodiert.
+
+    Args:
+        file_path (str): Pfad zur Videodatei.
+        probe (Dict | None): Ergebnis von `probe_video`, None wenn die Datei nicht gelesen werden konnte.
+        force_remux_mp4_h264 (bool): Erzwingt das Remuxing von MP4-Dateien mit H.264.
+
+    Returns:
+        Tuple[str, str]: Aktion ('remux', 'encode' oder 'skip') und Begründung.
+    """
+    if probe is None:
+        return ACTION_SKIP, "Videocodec konnte nicht ermittelt werden"
+
+    extension = os.path.splitext(file_path)[1].lower()
+    codec = probe['codec'].lower()
+
+    if extension == '.webm' and codec in ['hevc', 'h264']:
+        return JOB_KIND_REMUX, f"WebM mit {codec}"
+    if extension == '.mp4' and codec == 'h264' and force_remux_mp4_h264:
+        return JOB_KIND_REMUX, "MP4-H264 (erzwingt)"
+    if extension == '.mp4' and codec in ['hevc', 'h264']:
+        return ACTION_SKIP, f"Bereits kompatibel (MP4 mit {codec})"
+    return JOB_KIND_ENCODE, f"{codec} nach HEVC"
+
+def print_preflight_summary(decisions: List[Dict[str, Any]]):
+    """
+    Zeigt die geplanten Aktionen mit dem geschätzten Aufwand (Bytes und Sekunden Videomaterial)
+    sowie die Gründe für übersprungene Dateien an.
+
+    Args:
+        decisions (List[Dict]): Einträge mit 'file_path', 'action', 'reason' und optional 'size' und 'duration'.
+    """
+    table = Table(title="Vorabanalyse", style="bright_blue")
+    table.add_column("Aktion", style="cyan")
+    table.add_column("Dateien", justify="right", style="green")
+    table.add_column("Grösse (GB)", justify="right", style="yellow")
+    table.add_column("Dauer (h)", justify="right", style="magenta")
+
+    for action in [JOB_KIND_ENCODE, JOB_KIND_REMUX, ACTION_SKIP]:
+        entries = [d for d in decisions if d['action'] == action]
+        size = sum(d.get('size') or 0 for d in entries)
+        duration = sum(d.get('duration') or 0 for d in entries)
+        table.add_row(action, str(len(entries)), f"{size / 1e9:.2f}", f"{duration / 3600:.2f}")
+    console.print(table)
+
+    reasons: Dict[str, int] = {}
+    for decision in decisions:
+        if decision['action'] == ACTION_SKIP:
+            reasons[decision['reason']] = reasons.get(decision['reason'], 0) + 1
+    for reason, count in sorted(reasons.items(), key=lambda item: -item[1]):
+        console.print(f"  [yellow]übersprungen[/yellow]: {count} × {reason}")
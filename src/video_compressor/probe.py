@@ -0,0 +1,251 @@
+# src/video_compressor/probe.py
+
+import subprocess
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROBE_WORKERS = 8
+
+def parse_frame_rate(value: Optional[str]) -> float:
+    """
+    Wandelt eine Bildrate im ffprobe-Format (z.B. '30000/1001') in eine Gleitkommazahl um.
+    Gibt 0.0 zurück, wenn die Bildrate unbekannt ist.
+    """
+    if not value:
+        return 0.0
+    try:
+        if '/' in value:
+            numerator, denominator = value.split('/', 1)
+            return float(numerator) / float(denominator) if float(denominator) else 0.0
+        return float(value)
+    except ValueError:
+        return 0.0
+
+def probe_video(file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Liest Codec, Dauer, Auflösung, Bitrate und Grösse einer Videodatei mit einem einzigen ffprobe-Aufruf aus.
+
+    Args:
+        file_path (str): Der Pfad zur Videodatei.
+
+    Returns:
+        Dict[str, Any] | None: Dictionary mit den Schlüsseln 'codec', 'duration' (Sekunden), 'fps', 'width', 'height',
+        'bit_rate' (Bit pro Sekunde), 'nb_streams' und 'size' (Bytes), oder None, wenn die Datei nicht gelesen werden konnte.
+    """
+    if not os.path.isfile(file_path):
+        logger.error(f"Die Datei '{file_path}' existiert nicht.")
+        return None
+
+    cmd = [
+        'ffprobe',
+        '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries', 'stream=codec_name,avg_frame_rate,width,height:format=duration,bit_rate,nb_streams',
+        '-of', 'json',
+        file_path
+    ]
+    logger.debug(f"Führe ffprobe mit folgendem Befehl aus: {' '.join(cmd)}")
+
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if result.returncode != 0:
+            logger.error(f"ffprobe Fehler für {file_path}: {result.stderr.strip()}")
+            return None
+
+        probe = json.loads(result.stdout)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"Fehler beim Ausführen von ffprobe für {file_path}: {e}")
+        return None
+
+    streams = probe.get('streams') or [{}]
+    codec = streams[0].get('codec_name')
+    if not codec:
+        logger.error(f"Kein Videostream gefunden in {file_path}.")
+        return None
+
+    format_info = probe.get('format', {})
+    return {
+        'codec': codec,
+        'duration': _to_number(format_info.get('duration'), float),
+        'fps': parse_frame_rate(streams[0].get('avg_frame_rate')),
+        'width': _to_number(streams[0].get('width'), int),
+        'height': _to_number(streams[0].get('height'), int),
+        'bit_rate': _to_number(format_info.get('bit_rate'), int),
+        'nb_streams': _to_number(format_info.get('nb_streams'), int),
+        'size': os.path.getsize(file_path),
+    }
+
+def _to_number(value: Any, number_type: type) -> Any:
+    """Wandelt einen ffprobe-Wert in eine Zahl um, 0 wenn er fehlt oder ungültig ist."""
+    try:
+        return number_type(value)
+    except (TypeError, ValueError):
+        return number_type(0)
+
+def probe_streams(file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Liest Dauer und alle Streams einer Datei mit einem einzigen ffprobe-Aufruf aus. Es werden nur die Header
+    gelesen, die Datei wird nicht demuxt.
+
+    Args:
+        file_path (str): Der Pfad zur Datei.
+
+    Returns:
+        Dict[str, Any] | None: Dictionary mit 'duration' (Sekunden) und 'streams' (Liste mit 'codec_type',
+        'codec_name', 'width', 'height', 'fps' und 'nb_frames' pro Stream), oder None bei einem Fehler.
+    """
+    cmd = [
+        'ffprobe',
+        '-v', 'error',
+        '-show_entries', 'stream=codec_type,codec_name,width,height,avg_frame_rate,nb_frames:format=duration',
+        '-of', 'json',
+        file_path
+    ]
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if result.returncode != 0:
+            logger.error(f"ffprobe Fehler für {file_path}: {result.stderr.strip()}")
+            return None
+        probe = json.loads(result.stdout)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"Fehler beim Ausführen von ffprobe für {file_path}: {e}")
+        return None
+
+    return {
+        'duration': _to_number(probe.get('format', {}).get('duration'), float),
+        'streams': [
+            {
+                'codec_type': stream.get('codec_type', 'unknown'),
+                'codec_name': stream.get('codec_name'),
+                'width': _to_number(stream.get('width'), int),
+                'height': _to_number(stream.get('height'), int),
+                'fps': parse_frame_rate(stream.get('avg_frame_rate')),
+                'nb_frames': _to_number(stream.get('nb_frames'), int),
+            }
+            for stream in probe.get('streams', [])
+        ],
+    }
+
+def video_frame_count(info: Dict[str, Any]) -> Optional[int]:
+    """
+    Anzahl Bilder des ersten Videostreams laut Container (`nb_frames`), sonst geschätzt aus Dauer und Bildrate.
+
+    Args:
+        info (Dict): Ergebnis von `probe_streams`.
+
+    Returns:
+        int | None: Anzahl Bilder, oder None ohne Videostream bzw. Bildrate.
+    """
+    video = next((stream for stream in info['streams'] if stream['codec_type'] == 'video'), None)
+    if video is None:
+        return None
+    if video['nb_frames']:
+        return video['nb_frames']
+    if video['fps'] and info['duration']:
+        return round(info['duration'] * video['fps'])
+    return None
+
+class ProbeCache:
+    """
+    Persistenter Cache für ffprobe-Ergebnisse, abgelegt in einer SQLite-Datenbank.
+
+    Einträge sind über Pfad, Grösse und Änderungszeit einer Datei identifiziert. Ändert sich die Datei,
+    ist der Eintrag automatisch ungültig. Zugriffe aus mehreren Worker-Threads werden serialisiert.
+    """
+
+    # Wird erhöht, wenn sich die Felder von `probe_video` ändern, damit alte Einträge verworfen werden
+    SCHEMA_VERSION = 1
+
+    def __init__(self, db_path: Path):
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(db_path), check_same_thread=False)
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS probe_cache (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    version INTEGER NOT NULL,
+                    probe TEXT NOT NULL
+                )
+                """
+            )
+
+    def close(self):
+        """Schliesst die Datenbankverbindung."""
+        with self._lock:
+            self._connection.close()
+
+    def get(self, file_path: str, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        """Gibt das gespeicherte Ergebnis zurück, sofern es zur aktuellen Dateiidentität passt."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT probe FROM probe_cache WHERE path = ? AND size = ? AND mtime_ns = ? AND version = ?",
+                (file_path, stat.st_size, stat.st_mtime_ns, self.SCHEMA_VERSION)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, file_path: str, stat: os.stat_result, probe: Dict[str, Any]):
+        """Speichert ein Ergebnis für die aktuelle Dateiidentität."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO probe_cache (path, size, mtime_ns, version, probe) VALUES (?, ?, ?, ?, ?)",
+                (file_path, stat.st_size, stat.st_mtime_ns, self.SCHEMA_VERSION, json.dumps(probe))
+            )
+
+def probe_videos(
+    file_paths: List[str],
+    cache: Optional[ProbeCache] = None,
+    workers: int = DEFAULT_PROBE_WORKERS
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Liest die Eigenschaften mehrerer Videodateien parallel aus. Bereits bekannte Dateien werden aus dem Cache gelesen.
+
+    Args:
+        file_paths (List[str]): Pfade der Videodateien.
+        cache (ProbeCache | None): Optionaler Cache für die Ergebnisse.
+        workers (int): Anzahl gleichzeitiger ffprobe-Prozesse.
+
+    Returns:
+        Dict[str, Dict | None]: Ergebnis von `probe_video` pro Pfad.
+    """
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    pending: List[Tuple[str, os.stat_result]] = []
+
+    for file_path in file_paths:
+        try:
+            stat = os.stat(file_path)
+        except OSError as e:
+            logger.error(f"Datei {file_path} kann nicht gelesen werden: {e}")
+            results[file_path] = None
+            continue
+        cached = cache.get(file_path, stat) if cache else None
+        if cached is not None:
+            results[file_path] = cached
+        else:
+            pending.append((file_path, stat))
+
+    logger.info(f"{len(results)} Datei(en) aus dem Cache, {len(pending)} Datei(en) werden mit ffprobe gelesen.")
+    if not pending:
+        return results
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="probe") as pool:
+        probes = pool.map(lambda item: probe_video(item[0]), pending)
+        for (file_path, stat), probe in zip(pending, probes):
+            results[file_path] = probe
+            if probe is not None and cache:
+                cache.put(file_path, stat, probe)
+
+    return results
@@ -0,0 +1,262 @@
+# src/video_compressor/progress.py
+
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import logging
+from rich.progress import (
+    Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn, TimeRemainingColumn
+)
+
+logger = logging.getLogger(__name__)
+
+# Mindestabstand in Sekunden zwischen zwei Einträgen pro Job im Fortschrittsprotokoll
+LOG_INTERVAL = 1.0
+
+def format_seconds(seconds: Optional[float]) -> str:
+    """Formatiert Sekunden als H:MM:SS, oder '-:--:--', wenn unbekannt."""
+    if seconds is None or seconds < 0:
+        return "-:--:--"
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
+
+class HandBrakeProgressParser:
+    """
+    Parser für die Ausgabe von `HandBrakeCLI --json`.
+
+    HandBrakeCLI gibt Fortschrittsblöcke in der Form `Progress: { ... }` über mehrere Zeilen aus.
+    Der Parser sammelt die Zeilen eines Blocks und liefert nach dessen Ende ein Fortschrittsereignis.
+    """
+
+    def __init__(self, source_fps: float = 0.0):
+        self.source_fps = source_fps
+        self._buffer: List[str] = []
+        self._depth = 0
+
+    def feed(self, line: str) -> Optional[Dict[str, Any]]:
+        """
+        Verarbeitet eine Ausgabezeile.
+
+        Returns:
+            Dict | None: Ein Fortschrittsereignis mit 'progress' (0..1), 'fps', 'speed' und 'eta',
+            oder None, wenn die Zeile kein vollständiger Fortschrittsblock abschliesst.
+        """
+        stripped = line.strip()
+        if not self._buffer:
+            if not stripped.startswith("Progress:"):
+                return None
+            stripped = stripped[len("Progress:"):].strip()
+
+        self._buffer.append(stripped)
+        self._depth += stripped.count("{") - stripped.count("}")
+        if self._depth > 0:
+            return None
+
+        block = "".join(self._buffer)
+        self._buffer = []
+        self._depth = 0
+        try:
+            data = json.loads(block)
+        except json.JSONDecodeError:
+            logger.debug(f"Ungültiger HandBrake-Fortschrittsblock: {block}")
+            return None
+        return self._to_event(data)
+
+    def _to_event(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        state = data.get("State")
+        if state == "WORKDONE":
+            return {'progress': 1.0, 'fps': 0.0, 'speed': 0.0, 'eta': 0.0, 'done': True}
+        if state != "WORKING":
+            return None
+
+        working = data.get("Working", {})
+        pass_count = max(1, working.get("PassCount", 1))
+        pass_index = max(1, working.get("Pass", 1))
+        progress = ((pass_index - 1) + working.get("Progress", 0.0)) / pass_count
+        fps = float(working.get("RateAvg") or working.get("Rate") or 0.0)
+        speed = fps / self.source_fps if self.source_fps else 0.0
+        eta = working.get("ETASeconds")
+        return {'progress': min(progress, 1.0), 'fps': fps, 'speed': speed, 'eta': eta, 'done': False}
+
+class FfmpegProgressParser:
+    """
+    Parser für die Ausgabe von `ffmpeg -progress pipe:1`.
+
+    FFmpeg gibt Schlüssel-Wert-Paare zeilenweise aus. Jeder Block endet mit `progress=continue`
+    bzw. `progress=end` und ergibt ein Fortschrittsereignis.
+    """
+
+    def __init__(self, duration: float = 0.0):
+        self.duration = duration
+        self._values: Dict[str, str] = {}
+
+    def feed(self, line: str) -> Optional[Dict[str, Any]]:
+        """
+        Verarbeitet eine Ausgabezeile.
+
+        Returns:
+            Dict | None: Ein Fortschrittsereignis mit 'progress' (0..1), 'fps', 'speed' und 'eta',
+            oder None, wenn die Zeile keinen Block abschliesst.
+        """
+        if "=" not in line:
+            return None
+        key, value = line.strip().split("=", 1)
+        if key != "progress":
+            self._values[key] = value
+            return None
+
+        values = self._values
+        self._values = {}
+        done = value == "end"
+
+        # out_time_us ist in Mikrosekunden; out_time_ms enthält aus historischen Gründen ebenfalls Mikrosekunden
+        out_time_raw = values.get("out_time_us") or values.get("out_time_ms") or "0"
+        try:
+            out_time = max(0.0, int(out_time_raw) / 1_000_000)
+        except ValueError:
+            out_time = 0.0
+        try:
+            fps = float(values.get("fps", 0) or 0)
+        except ValueError:
+            fps = 0.0
+        try:
+            speed = float(values.get("speed", "0").rstrip("x") or 0)
+        except ValueError:
+            speed = 0.0
+
+        if done:
+            progress = 1.0
+        elif self.duration:
+            progress = min(out_time / self.duration, 1.0)
+        else:
+            progress = 0.0
+        eta = (self.duration - out_time) / speed if speed and self.duration else None
+        return {'progress': progress, 'fps': fps, 'speed': speed, 'eta': eta, 'done': done}
+
+class ProgressReporter:
+    """
+    Zeigt den Fortschritt pro Job und gesamthaft als rich-Fortschrittsbalken an und schreibt
+    optional ein JSON-Lines-Protokoll, das von anderen Werkzeugen mitgelesen werden kann.
+
+    Der Gesamtfortschritt wird in Sekunden Videomaterial gemessen, damit lange Videos entsprechend gewichtet werden.
+    """
+
+    def __init__(self, jobs: List[Dict[str, Any]], log_path: Optional[Path] = None):
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, Any] = {}
+        self._completed: Dict[str, float] = {}
+        self._last_logged: Dict[str, float] = {}
+        self._weights = {job['input_path']: max(job.get('duration') or 0.0, 1.0) for job in jobs}
+        self._log_file = None
+        if log_path:
+            Path(log_path).parent.mkdir(parents=True, exist_ok=True)
+            self._log_file = open(log_path, "a", encoding="utf-8")
+
+        self.progress = Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TextColumn("{task.percentage:>3.0f}%"),
+            TextColumn("{task.fields[stats]}"),
+            TimeRemainingColumn(),
+            TimeElapsedColumn()
+        )
+        self._total_task = self.progress.add_task(
+            "[green]Gesamt", total=sum(self._weights.values()) or 1.0, stats=f"0/{len(jobs)} Jobs"
+        )
+        self._finished_jobs = 0
+        self._job_count = len(jobs)
+
+    def __enter__(self) -> "ProgressReporter":
+        self.progress.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.progress.stop()
+        if self._log_file:
+            self._log_file.close()
+
+    def add_job(self, job: Dict[str, Any]):
+        """Nimmt einen nachträglich eingeplanten Job in den Gesamtfortschritt auf (z.B. im Überwachungsmodus)."""
+        with self._lock:
+            if job['input_path'] in self._weights:
+                return
+            weight = max(job.get('duration') or 0.0, 1.0)
+            self._weights[job['input_path']] = weight
+            self._job_count += 1
+            self.progress.update(
+                self._total_task,
+                total=sum(self._weights.values()),
+                stats=f"{self._finished_jobs}/{self._job_count} Jobs"
+            )
+
+    def start_job(self, job: Dict[str, Any]):
+        """Legt den Fortschrittsbalken für einen Job an."""
+        name = Path(job['input_path']).name
+        with self._lock:
+            self._tasks[job['input_path']] = self.progress.add_task(f"{job['kind']}: {name}", total=1.0, stats="")
+            self._completed[job['input_path']] = 0.0
+        self._log(job, "started", {})
+
+    def update_job(self, job: Dict[str, Any], event: Dict[str, Any]):
+        """Aktualisiert den Fortschritt eines Jobs mit einem Ereignis eines Parsers."""
+        input_path = job['input_path']
+        stats = []
+        if event.get('fps'):
+            stats.append(f"{event['fps']:.1f} fps")
+        if event.get('speed'):
+            stats.append(f"{event['speed']:.2f}x")
+        if event.get('eta') is not None:
+            stats.append(f"ETA {format_seconds(event['eta'])}")
+
+        with self._lock:
+            task = self._tasks.get(input_path)
+            if task is None:
+                return
+            self.progress.update(task, completed=event['progress'], stats=" · ".join(stats))
+            self._set_job_completed(input_path, event['progress'])
+
+        now = time.monotonic()
+        if event.get('done') or now - self._last_logged.get(input_path, 0.0) >= LOG_INTERVAL:
+            self._last_logged[input_path] = now
+            self._log(job, "progress", event)
+
+    def finish_job(self, job: Dict[str, Any], success: bool):
+        """Schliesst den Fortschrittsbalken eines Jobs ab."""
+        input_path = job['input_path']
+        with self._lock:
+            task = self._tasks.pop(input_path, None)
+            if task is not None:
+                self.progress.remove_task(task)
+            self._set_job_completed(input_path, 1.0)
+            self._finished_jobs += 1
+            self.progress.update(self._total_task, stats=f"{self._finished_jobs}/{self._job_count} Jobs")
+        self._log(job, "done" if success else "failed", {})
+
+    def _set_job_completed(self, input_path: str, fraction: float):
+        weight = self._weights.get(input_path, 1.0)
+        previous = self._completed.get(input_path, 0.0)
+        self._completed[input_path] = fraction
+        self.progress.advance(self._total_task, (fraction - previous) * weight)
+
+    def _log(self, job: Dict[str, Any], state: str, event: Dict[str, Any]):
+        if not self._log_file:
+            return
+        total = sum(self._weights.values()) or 1.0
+        entry = {
+            'time': datetime.now().astimezone().isoformat(),
+            'job': job['input_path'],
+            'kind': job['kind'],
+            'state': state,
+            'progress': event.get('progress'),
+            'fps': event.get('fps'),
+            'speed': event.get('speed'),
+            'eta': event.get('eta'),
+            'total_progress': sum(self._completed.get(path, 0.0) * weight for path, weight in self._weights.items()) / total,
+        }
+        with self._lock:
+            self._log_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._log_file.flush()
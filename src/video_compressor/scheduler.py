@@ -0,0 +1,184 @@
+# src/video_compressor/scheduler.py
+
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Jobarten: Remux-Jobs sind I/O-gebunden, Encode-Jobs CPU-gebunden
+JOB_KIND_REMUX = "remux"
+JOB_KIND_ENCODE = "encode"
+
+DEFAULT_THREADS_PER_JOB = 8
+DEFAULT_REMUX_WORKERS = 2
+
+# Laufende Kindprozesse, damit sie bei einem Abbruch gemeinsam beendet werden können
+_active_processes: Set[subprocess.Popen] = set()
+_active_processes_lock = threading.Lock()
+_cancel_event = threading.Event()
+
+def default_encode_workers(threads_per_job: int = DEFAULT_THREADS_PER_JOB) -> int:
+    """
+    Berechnet die Anzahl paralleler Encode-Jobs aus der Anzahl CPU-Kerne.
+
+    Args:
+        threads_per_job (int): Anzahl Threads, die ein einzelner Encoder sinnvoll auslasten kann.
+
+    Returns:
+        int: Anzahl paralleler Encode-Jobs (mindestens 1).
+    """
+    cores = os.cpu_count() or 1
+    return max(1, cores // max(1, threads_per_job))
+
+def job_weight(job: Dict[str, Any]) -> float:
+    """
+    Gewichtet einen Job nach Dateigrösse × Dauer. Jobs ohne bekannte Dauer werden nur nach Grösse gewichtet.
+    """
+    size = job.get('size') or 0
+    duration = job.get('duration') or 0
+    return float(size) * float(duration) if duration else float(size)
+
+def is_cancelled() -> bool:
+    """Gibt zurück, ob ein Abbruch angefordert wurde."""
+    return _cancel_event.is_set()
+
+def sleep_unless_cancelled(seconds: float) -> bool:
+    """
+    Wartet die angegebene Zeit, bricht aber sofort ab, wenn ein Abbruch angefordert wird.
+
+    Returns:
+        bool: True, wenn ein Abbruch angefordert wurde.
+    """
+    return _cancel_event.wait(seconds)
+
+def run_process(cmd: List[str], on_output: Optional[Callable[[str], None]] = None) -> int:
+    """
+    Führt einen Kindprozess aus und registriert ihn, damit er bei einem Abbruch beendet werden kann.
+
+    Der Prozess läuft in einer eigenen Prozessgruppe, damit Ctrl+C nur den Hauptprozess erreicht
+    und dieser die Kindprozesse kontrolliert beenden kann.
+
+    Args:
+        cmd (List[str]): Der auszuführende Befehl.
+        on_output (Callable[[str], None] | None): Wird für jede Ausgabezeile (stdout und stderr) aufgerufen.
+
+    Returns:
+        int: Der Rückgabewert des Prozesses, oder -1, wenn bereits ein Abbruch angefordert wurde.
+    """
+    if _cancel_event.is_set():
+        return -1
+
+    logger.debug(f"Starte Prozess: {' '.join(cmd)}")
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        start_new_session=True
+    )
+    with _active_processes_lock:
+        _active_processes.add(process)
+
+    try:
+        for line in process.stdout:
+            if on_output:
+                on_output(line)
+        process.wait()
+    finally:
+        with _active_processes_lock:
+            _active_processes.discard(process)
+
+    return process.returncode
+
+def terminate_all_processes(timeout: float = 10.0):
+    """
+    Beendet alle laufenden Kindprozesse. Prozesse, die nach `timeout` Sekunden noch laufen, werden hart beendet.
+    """
+    _cancel_event.set()
+    with _active_processes_lock:
+        processes = list(_active_processes)
+
+    for process in processes:
+        if process.poll() is None:
+            logger.info(f"Beende Prozess {process.pid}...")
+            process.terminate()
+
+    for process in processes:
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            logger.warning(f"Prozess {process.pid} reagiert nicht, wird hart beendet.")
+            process.kill()
+            process.wait()
+
+def run_jobs(
+    jobs: List[Dict[str, Any]],
+    run_job: Callable[[Dict[str, Any]], bool],
+    on_job_start: Optional[Callable[[Dict[str, Any]], None]] = None,
+    on_job_done: Optional[Callable[[Dict[str, Any], bool], None]] = None,
+    encode_workers: Optional[int] = None,
+    remux_workers: int = DEFAULT_REMUX_WORKERS
+) -> List[Dict[str, Any]]:
+    """
+    Führt Jobs in getrennten Pools für Remux- (I/O) und Encode-Jobs (CPU) aus.
+
+    Die Jobs werden nach absteigendem Gewicht (Grösse × Dauer) eingeplant, damit die längsten
+    Jobs zuerst starten und am Ende keine einzelne lange Kodierung allein übrig bleibt.
+
+    Args:
+        jobs (List[Dict]): Jobs mit mindestens dem Schlüssel 'kind' ('remux' oder 'encode').
+        run_job (Callable): Führt einen Job aus und gibt True bei Erfolg zurück. Läuft in einem Worker-Thread.
+        on_job_start (Callable | None): Wird im Worker-Thread unmittelbar vor dem Start eines Jobs aufgerufen.
+        on_job_done (Callable | None): Wird im aufrufenden Thread nach jedem Job mit dem Ergebnis aufgerufen.
+        encode_workers (int | None): Anzahl paralleler Encode-Jobs. Standard: aus der Anzahl CPU-Kerne berechnet.
+        remux_workers (int): Anzahl paralleler Remux-Jobs.
+
+    Returns:
+        List[Dict]: Die Jobs, jeweils ergänzt um den Schlüssel 'success'.
+    """
+    if encode_workers is None or encode_workers < 1:
+        encode_workers = default_encode_workers()
+
+    _cancel_event.clear()
+    ordered_jobs = sorted(jobs, key=job_weight, reverse=True)
+    logger.info(f"Plane {len(ordered_jobs)} Job(s) mit {encode_workers} Encode- und {remux_workers} Remux-Worker(n) ein.")
+
+    def _run(job: Dict[str, Any]) -> bool:
+        if _cancel_event.is_set():
+            return False
+        if on_job_start:
+            on_job_start(job)
+        try:
+            return run_job(job)
+        except Exception as e:
+            logger.error(f"Fehler beim Ausführen des Jobs {job.get('input_path')}: {e}")
+            return False
+
+    encode_pool = ThreadPoolExecutor(max_workers=encode_workers, thread_name_prefix="encode")
+    remux_pool = ThreadPoolExecutor(max_workers=max(1, remux_workers), thread_name_prefix="remux")
+    futures = {}
+    try:
+        for job in ordered_jobs:
+            pool = remux_pool if job['kind'] == JOB_KIND_REMUX else encode_pool
+            futures[pool.submit(_run, job)] = job
+
+        for future in as_completed(futures):
+            job = futures[future]
+            job['success'] = future.result()
+            if on_job_done:
+                on_job_done(job, job['success'])
+    except KeyboardInterrupt:
+        logger.warning("Abbruchsignal erhalten. Beende alle laufenden Prozesse...")
+        for future in futures:
+            future.cancel()
+        terminate_all_processes()
+        raise
+    finally:
+        encode_pool.shutdown(wait=True)
+        remux_pool.shutdown(wait=True)
+
+    return ordered_jobs
@@ -0,0 +1,251 @@
+# src/video_compressor/segmented_encode.py
+
+import math
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+import logging
+from video_compressor.probe import probe_streams, probe_video, video_frame_count
+from video_compressor.progress import HandBrakeProgressParser
+from video_compressor.scheduler import is_cancelled, run_process
+from video_compressor.verification import durations_match, frames_match
+
+logger = logging.getLogger(__name__)
+
+# Audio-Codecs, die unverändert in einen MP4/MOV-Container übernommen werden können
+CONTAINER_AUDIO_CODECS = {'aac', 'ac3', 'eac3', 'alac', 'mp3'}
+AUDIO_BITRATE = '160k'
+
+def split_at_keyframes(input_path: str, work_dir: str, segment_count: int, duration: float) -> List[str]:
+    """
+    Teilt den Videostream einer Datei ohne Neukodierung in etwa gleich lange Segmente.
+    Da der Stream kopiert wird, schneidet FFmpeg jeweils am nächsten Keyframe.
+
+    Audio wird nicht aufgeteilt: jedes separat kodierte Audiosegment brächte eigenes Encoder-Priming und
+    Padding mit, was an jeder Schnittstelle Lücken und Versatz gegenüber dem Video erzeugt.
+
+    Args:
+        input_path (str): Pfad zur Quelldatei.
+        work_dir (str): Verzeichnis für die Segmente.
+        segment_count (int): Gewünschte Anzahl Segmente.
+        duration (float): Dauer der Quelldatei in Sekunden.
+
+    Returns:
+        List[str]: Sortierte Pfade der erzeugten Segmente, oder eine leere Liste bei einem Fehler.
+    """
+    segment_time = math.ceil(duration / segment_count)
+    extension = os.path.splitext(input_path)[1]
+    pattern = os.path.join(work_dir, f"segment_%03d{extension}")
+    cmd = [
+        'ffmpeg',
+        '-y',
+        '-loglevel', 'error',
+        '-i', input_path,
+        '-map', '0:v:0',
+        '-an',
+        '-c', 'copy',
+        '-f', 'segment',
+        '-segment_time', str(segment_time),
+        '-reset_timestamps', '1',
+        pattern
+    ]
+    logger.debug(f"Teile {input_path} in Segmente: {' '.join(cmd)}")
+    if run_process(cmd) != 0:
+        logger.error(f"Aufteilen von {input_path} in Segmente fehlgeschlagen.")
+        return []
+
+    return sorted(
+        os.path.join(work_dir, name) for name in os.listdir(work_dir)
+        if name.startswith("segment_") and name.endswith(extension)
+    )
+
+def audio_codec_args(source_info: Dict[str, Any], output_path: str) -> List[str]:
+    """
+    Baut die FFmpeg-Argumente, um die Audiostreams der Quelle (zweite Eingabe) in einem Durchgang zu übernehmen.
+    Streams, die der Zielcontainer aufnehmen kann, werden kopiert, alle anderen einmal nach AAC kodiert.
+    """
+    audio_streams = [stream for stream in source_info['streams'] if stream['codec_type'] == 'audio']
+    if not audio_streams:
+        return []
+    copy_any = os.path.splitext(output_path)[1].lower() == '.mkv'
+    args = ['-map', '1:a']
+    for index, stream in enumerate(audio_streams):
+        if copy_any or stream['codec_name'] in CONTAINER_AUDIO_CODECS:
+            args += [f'-c:a:{index}', 'copy']
+        else:
+            args += [f'-c:a:{index}', 'aac', f'-b:a:{index}', AUDIO_BITRATE]
+    return args
+
+def concat_segments(
+    segment_paths: List[str],
+    output_path: str,
+    work_dir: str,
+    audio_source: Optional[str] = None,
+    audio_args: Optional[List[str]] = None
+) -> bool:
+    """
+    Fügt die kodierten Videosegmente mit dem concat-Demuxer von FFmpeg verlustfrei zusammen und muxt
+    dabei die Audiostreams aus `audio_source` als durchgehende Spur hinzu.
+    """
+    list_path = os.path.join(work_dir, "segments.txt")
+    with open(list_path, "w", encoding="utf-8") as f:
+        for segment_path in segment_paths:
+            escaped = segment_path.replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+    cmd = [
+        'ffmpeg',
+        '-y',
+        '-loglevel', 'error',
+        '-f', 'concat',
+        '-safe', '0',
+        '-i', list_path,
+    ]
+    if audio_source and audio_args:
+        cmd += ['-i', audio_source, '-map', '0:v:0'] + audio_args
+    cmd += [
+        '-c:v', 'copy',
+        '-movflags', 'faststart',
+        output_path
+    ]
+    logger.debug(f"Füge Segmente zusammen: {' '.join(cmd)}")
+    return run_process(cmd) == 0
+
+def _has_audio(info: Dict[str, Any]) -> bool:
+    return any(stream['codec_type'] == 'audio' for stream in info['streams'])
+
+def verify_concatenation(output_path: str, source_info: Dict[str, Any]) -> bool:
+    """
+    Prüft das zusammengefügte Video gegen die Quelle auf Lücken oder doppelte Bilder an den Schnittstellen.
+
+    - Die Dauer muss innerhalb der Toleranz der Dauer der Quelldatei liegen.
+    - Die Anzahl Bilder muss der Anzahl Bilder der Quelle entsprechen, umgerechnet mit dem Verhältnis der Bildraten.
+    - Hat die Quelle Audio, muss auch die Ausgabe Audio enthalten.
+    """
+    output_info = probe_streams(output_path)
+    if output_info is None:
+        return False
+
+    if not durations_match(output_info['duration'], source_info['duration']):
+        logger.error(f"Dauer von {output_path} ({output_info['duration']:.2f} s) weicht von der Quelle ({source_info['duration']:.2f} s) ab.")
+        return False
+
+    source_video = next((stream for stream in source_info['streams'] if stream['codec_type'] == 'video'), None)
+    output_video = next((stream for stream in output_info['streams'] if stream['codec_type'] == 'video'), None)
+    source_frames = video_frame_count(source_info)
+    output_frames = video_frame_count(output_info)
+    if source_video and output_video and source_frames and output_frames:
+        if not frames_match(output_frames, source_frames, source_video['fps'], output_video['fps']):
+            logger.error(f"Anzahl Bilder von {output_path} ({output_frames}) passt nicht zur Quelle ({source_frames}).")
+            return False
+
+    if _has_audio(source_info) and not _has_audio(output_info):
+        logger.error(f"Audiostreams fehlen in {output_path}.")
+        return False
+
+    return True
+
+def encode_segmented(
+    input_path: str,
+    output_path: str,
+    duration: float,
+    source_fps: float,
+    segment_count: int,
+    build_encode_command: Callable[[str, str], List[str]],
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> bool:
+    """
+    Kodiert ein langes Video in parallel verarbeiteten Segmenten mit identischen Einstellungen.
+
+    Ablauf: Aufteilen des Videostreams an Keyframes, paralleles Kodieren der Segmente, verlustfreies
+    Zusammenfügen mit dem concat-Demuxer, wobei das Audio einmal aus der ganzen Quelle übernommen wird,
+    und Prüfung von Dauer und Anzahl Bilder gegen die Quelle. Die Zwischendateien liegen in einem
+    versteckten Verzeichnis neben der Ausgabedatei und werden am Ende entfernt.
+
+    Args:
+        input_path (str): Pfad zur Quelldatei.
+        output_path (str): Pfad zur Ausgabedatei.
+        duration (float): Dauer der Quelldatei in Sekunden.
+        source_fps (float): Bildrate der Quelldatei, für die Berechnung des Geschwindigkeitsfaktors.
+        segment_count (int): Anzahl Segmente und gleichzeitig Anzahl paralleler Kodierungen.
+        build_encode_command (Callable): Baut den Kodierungsbefehl für (Eingabe, Ausgabe).
+        on_progress (Callable | None): Erhält zusammengefasste Fortschrittsereignisse über alle Segmente.
+
+    Returns:
+        bool: True, wenn die Ausgabedatei erfolgreich erstellt und geprüft wurde.
+    """
+    output_dir = os.path.dirname(output_path) or "."
+    base_name = os.path.splitext(os.path.basename(input_path))[0]
+    work_dir = tempfile.mkdtemp(prefix=f".{base_name}-segments-", dir=output_dir)
+
+    try:
+        source_info = probe_streams(input_path)
+        if source_info is None:
+            return False
+
+        segments = split_at_keyframes(input_path, work_dir, segment_count, duration)
+        if not segments:
+            return False
+        logger.info(f"{input_path} wurde in {len(segments)} Segmente aufgeteilt.")
+
+        segment_durations = []
+        for segment in segments:
+            probe = probe_video(segment)
+            segment_durations.append(probe['duration'] if probe else duration / len(segments))
+        total_duration = sum(segment_durations) or 1.0
+
+        lock = threading.Lock()
+        segment_events: Dict[int, Dict[str, Any]] = {}
+
+        def report(index: int, event: Dict[str, Any]):
+            if not on_progress:
+                return
+            with lock:
+                segment_events[index] = event
+                progress = sum(
+                    segment_events.get(i, {}).get('progress', 0.0) * segment_durations[i]
+                    for i in range(len(segments))
+                ) / total_duration
+                fps = sum(e.get('fps') or 0.0 for e in segment_events.values() if not e.get('done'))
+            speed = fps / source_fps if source_fps else 0.0
+            eta = (1.0 - progress) * duration / speed if speed else None
+            on_progress({'progress': progress, 'fps': fps, 'speed': speed, 'eta': eta, 'done': False})
+
+        def encode_segment(index: int) -> Optional[str]:
+            segment = segments[index]
+            encoded = os.path.join(work_dir, f"encoded_{index:03d}.mp4")
+            parser = HandBrakeProgressParser(source_fps)
+
+            def on_output(line: str):
+                event = parser.feed(line)
+                if event:
+                    report(index, event)
+
+            returncode = run_process(build_encode_command(segment, encoded), on_output=on_output)
+            if returncode != 0:
+                logger.error(f"Kodierung von Segment {index} ({segment}) fehlgeschlagen: Rückgabewert {returncode}")
+                return None
+            return encoded
+
+        with ThreadPoolExecutor(max_workers=len(segments), thread_name_prefix="segment") as pool:
+            encoded_segments = list(pool.map(encode_segment, range(len(segments))))
+
+        if is_cancelled() or any(segment is None for segment in encoded_segments):
+            return False
+
+        audio_args = audio_codec_args(source_info, output_path)
+        if not concat_segments(encoded_segments, output_path, work_dir, input_path, audio_args):
+            logger.error(f"Zusammenfügen der Segmente für {input_path} fehlgeschlagen.")
+            return False
+
+        if not verify_concatenation(output_path, source_info):
+            return False
+
+        if on_progress:
+            on_progress({'progress': 1.0, 'fps': 0.0, 'speed': 0.0, 'eta': 0.0, 'done': True})
+        return True
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,184 @@
+# src/video_compressor/verification.py
+
+import re
+import subprocess
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+from video_compressor.probe import probe_streams, video_frame_count
+
+logger = logging.getLogger(__name__)
+
+# Abweichung der Dauer, die toleriert wird
+DURATION_TOLERANCE_SECONDS = 0.5
+DURATION_TOLERANCE_RATIO = 0.005
+
+# Abweichung der Anzahl Bilder, die toleriert wird (z.B. durch Bildratenumwandlung)
+FRAME_TOLERANCE_RATIO = 0.01
+FRAME_TOLERANCE_MIN = 2
+
+# Abweichung der Auflösung in Pixeln, die toleriert wird (Rundung auf den Modulus des Encoders)
+RESOLUTION_TOLERANCE = 4
+
+DEFAULT_SAMPLE_COUNT = 3
+DEFAULT_SAMPLE_SECONDS = 5.0
+DEFAULT_MIN_SSIM = 0.95
+
+def durations_match(duration: float, reference: float) -> bool:
+    """Prüft, ob zwei Dauern innerhalb der Toleranz übereinstimmen."""
+    tolerance = max(DURATION_TOLERANCE_SECONDS, reference * DURATION_TOLERANCE_RATIO)
+    return abs(duration - reference) <= tolerance
+
+def frames_match(output_frames: int, source_frames: int, source_fps: float, output_fps: float) -> bool:
+    """
+    Prüft, ob die Anzahl Bilder der Ausgabe zur Quelle passt. Bei abweichender Bildrate wird die erwartete
+    Anzahl im Verhältnis der Bildraten umgerechnet.
+    """
+    expected_frames = source_frames * output_fps / source_fps if source_fps and output_fps else source_frames
+    tolerance = max(FRAME_TOLERANCE_MIN, expected_frames * FRAME_TOLERANCE_RATIO)
+    return abs(output_frames - expected_frames) <= tolerance
+
+def expected_output_size(width: int, height: int, max_width: int = 0, max_height: int = 0, upscale: bool = False) -> Tuple[int, int]:
+    """
+    Berechnet die Auflösung, die HandBrake aus der Quelle erzeugt: Einpassen in die maximale Grösse des Presets
+    unter Beibehaltung des Seitenverhältnisses, gerundet auf gerade Werte.
+    """
+    scales = [limit / size for limit, size in ((max_width, width), (max_height, height)) if limit and size]
+    scale = min(scales) if scales else 1.0
+    if not upscale:
+        scale = min(scale, 1.0)
+    return int(round(width * scale / 2)) * 2, int(round(height * scale / 2)) * 2
+
+def _first_stream(info: Dict[str, Any], codec_type: str) -> Optional[Dict[str, Any]]:
+    return next((stream for stream in info['streams'] if stream['codec_type'] == codec_type), None)
+
+def _count_streams(info: Dict[str, Any], codec_type: str) -> int:
+    return sum(1 for stream in info['streams'] if stream['codec_type'] == codec_type)
+
+def sample_offsets(duration: float, sample_count: int, sample_seconds: float) -> List[float]:
+    """
+    Verteilt die Startzeiten der Stichproben gleichmässig über die Dauer, ohne Anfang und Ende.
+    """
+    if duration <= sample_seconds:
+        return [0.0]
+    usable = duration - sample_seconds
+    return [usable * (index + 1) / (sample_count + 1) for index in range(sample_count)]
+
+def decode_sample(file_path: str, offset: float, sample_seconds: float) -> bool:
+    """
+    Dekodiert einen Abschnitt einer Datei ohne Ausgabe und prüft, ob dabei Fehler auftreten.
+    """
+    cmd = [
+        'ffmpeg', '-v', 'error',
+        '-ss', f"{offset:.3f}", '-t', f"{sample_seconds:.3f}",
+        '-i', file_path,
+        '-f', 'null', '-'
+    ]
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0 or result.stderr.strip():
+        logger.error(f"Dekodierfehler in {file_path} bei {offset:.1f} s: {result.stderr.strip()}")
+        return False
+    return True
+
+def measure_sample_ssim(output_path: str, source_path: str, offset: float, sample_seconds: float) -> Optional[float]:
+    """
+    Berechnet den SSIM-Wert (0..1) zwischen Ausgabe und Quelle für einen Abschnitt.
+    Die Ausgabe wird bei abweichender Auflösung auf die Grösse der Quelle skaliert.
+    """
+    cmd = [
+        'ffmpeg', '-hide_banner', '-nostats',
+        '-ss', f"{offset:.3f}", '-t', f"{sample_seconds:.3f}", '-i', output_path,
+        '-ss', f"{offset:.3f}", '-t', f"{sample_seconds:.3f}", '-i', source_path,
+        '-lavfi', '[0:v][1:v]scale2ref=flags=bicubic[dist][ref];[dist][ref]ssim',
+        '-f', 'null', '-'
+    ]
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    match = re.search(r"SSIM .*All:([0-9.]+)", result.stderr)
+    if result.returncode != 0 or not match:
+        logger.error(f"SSIM konnte für {output_path} bei {offset:.1f} s nicht berechnet werden.")
+        return None
+    return float(match.group(1))
+
+def verify_output(
+    source_path: str,
+    output_path: str,
+    picture: Optional[Dict[str, Any]] = None,
+    compare_quality: bool = True,
+    sample_count: int = DEFAULT_SAMPLE_COUNT,
+    sample_seconds: float = DEFAULT_SAMPLE_SECONDS,
+    min_ssim: float = DEFAULT_MIN_SSIM
+) -> Tuple[bool, str]:
+    """
+    Prüft eine erzeugte Datei gegen die Quelle, ohne die ganze Datei zu lesen oder zu dekodieren.
+
+    - Beide Dateien werden mit je einem ffprobe-Aufruf gelesen (nur Header). Verglichen werden Dauer, Video- und
+      Audiostreams, Auflösung und Anzahl Bilder (`nb_frames`, sonst Dauer × Bildrate).
+    - Einige über die Datei verteilte Abschnitte werden dekodiert.
+    - Optional wird auf diesen Abschnitten der SSIM-Wert gegenüber der Quelle berechnet.
+
+    Args:
+        source_path (str): Pfad zur Quelldatei.
+        output_path (str): Pfad zur erzeugten Datei.
+        picture (Dict | None): Bildgrösse des Presets (`read_preset_picture`); None, wenn die Auflösung der Quelle
+            erhalten bleibt (z.B. beim Remuxen).
+        compare_quality (bool): SSIM berechnen (für Neukodierungen; beim Remuxen sind die Streams identisch).
+        sample_count (int): Anzahl Stichproben.
+        sample_seconds (float): Länge einer Stichprobe in Sekunden.
+        min_ssim (float): Minimaler SSIM-Wert pro Stichprobe.
+
+    Returns:
+        Tuple[bool, str]: Ergebnis der Prüfung und Begründung.
+    """
+    source_info = probe_streams(source_path)
+    output_info = probe_streams(output_path)
+    if source_info is None:
+        return False, "Quelldatei kann nicht gelesen werden"
+    if output_info is None:
+        return False, "Ausgabedatei kann nicht gelesen werden"
+
+    if not durations_match(output_info['duration'], source_info['duration']):
+        return False, f"Dauer {output_info['duration']:.2f} s statt {source_info['duration']:.2f} s"
+
+    source_video = _first_stream(source_info, 'video')
+    output_video = _first_stream(output_info, 'video')
+    if output_video is None:
+        return False, "Kein Videostream in der Ausgabedatei"
+    if _count_streams(source_info, 'audio') > 0 and _count_streams(output_info, 'audio') == 0:
+        return False, "Audiostreams fehlen in der Ausgabedatei"
+
+    if source_video and source_video['width'] and source_video['height']:
+        picture = picture or {}
+        expected_width, expected_height = expected_output_size(
+            source_video['width'], source_video['height'],
+            picture.get('max_width', 0), picture.get('max_height', 0), picture.get('upscale', False)
+        )
+        width, height = output_video['width'], output_video['height']
+        if picture.get('crop'):
+            # Automatisches Zuschneiden entfernt schwarze Ränder, die Ausgabe darf also nur kleiner sein
+            size_ok = width <= expected_width + RESOLUTION_TOLERANCE and height <= expected_height + RESOLUTION_TOLERANCE
+        else:
+            size_ok = abs(width - expected_width) <= RESOLUTION_TOLERANCE and abs(height - expected_height) <= RESOLUTION_TOLERANCE
+        if not size_ok:
+            return False, f"Auflösung {width}x{height} statt erwarteter {expected_width}x{expected_height}"
+
+    source_frames = video_frame_count(source_info)
+    output_frames = video_frame_count(output_info)
+    if source_video and source_frames and output_frames and source_video['fps'] and output_video['fps']:
+        if not frames_match(output_frames, source_frames, source_video['fps'], output_video['fps']):
+            expected_frames = source_frames * output_video['fps'] / source_video['fps']
+            return False, f"{output_frames} Bilder statt erwarteter {expected_frames:.0f}"
+
+    ssim_values = []
+    for offset in sample_offsets(output_info['duration'], sample_count, sample_seconds):
+        if not decode_sample(output_path, offset, sample_seconds):
+            return False, f"Dekodierfehler bei {offset:.1f} s"
+        if compare_quality and min_ssim > 0:
+            ssim = measure_sample_ssim(output_path, source_path, offset, sample_seconds)
+            if ssim is None:
+                return False, f"SSIM bei {offset:.1f} s nicht messbar"
+            if ssim < min_ssim:
+                return False, f"SSIM {ssim:.3f} bei {offset:.1f} s unter {min_ssim:.3f}"
+            ssim_values.append(ssim)
+
+    if ssim_values:
+        return True, f"Geprüft, SSIM min. {min(ssim_values):.3f}"
+    return True, "Geprüft"